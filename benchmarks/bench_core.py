@@ -0,0 +1,127 @@
+"""Micro-benchmarks for speed_util, ColorExt and the sensor maths
+
+Runs under CPython (using the simulated backend) and MicroPython. The sensor
+methods are called with fake readings so no hardware is needed. Run it from
+the root of the repository.
+
+    python3 benchmarks/bench_core.py          compare against the baseline
+    python3 benchmarks/bench_core.py --save   store the results as the baseline
+"""
+import io
+import os
+import sys
+
+import harness
+
+harness.setup_path()
+
+from pybricks.parameters import Color
+
+import speed_util
+from display_util import COPY, Bitmap, Canvas, Framebuffer
+from ev3devices_ext import ColorSensorExt, GyroSensorExt
+from parameters_ext import ColorExt, ColorSet
+from telemetry_util import TelemetryLogger
+
+BASELINE = 'benchmarks/baseline.json'
+
+class FakeColorSensor(ColorSensorExt):
+    """
+    Real extension class with only the device reading faked, so the SampledExt
+    lookup is measured as well
+    """
+
+    def __init__(self):
+        pass
+
+    def rgb(self):
+        return (62, 35, 18)
+
+class FakeGyroSensor(GyroSensorExt):
+    """
+    Real extension class with only the device reading faked
+    """
+
+    def __init__(self):
+        pass
+
+    def angle(self):
+        return 1234
+
+class Animation():
+
+    def __init__(self, bpp):
+        self.canvas = Canvas(Framebuffer(io.BytesIO(bytes(128 * 712)), bpp=bpp, line_length=712))
+        self.frames = []
+        for frame in range(2):
+            bitmap = Bitmap(178, 128)
+            bitmap.fill_rect(40 + frame * 20, 40, 40, 40)
+            bitmap.fill_rect(110 - frame * 20, 40, 40, 40)
+            self.frames.append(bitmap)
+        self.index = 0
+
+    def frame(self):
+        self.index ^= 1
+        self.canvas.draw(self.frames[self.index], mode=COPY)
+        self.canvas.show()
+
+class Recording():
+
+    def __init__(self, color_sensor, gyro_sensor):
+        self.logger = TelemetryLogger(os.devnull, block_records=256)
+        self.logger.add_channel(gyro_sensor, 'angle')
+        self.logger.add_channel(gyro_sensor, 'bearing')
+        self.logger.add_channel(color_sensor, 'hue')
+        self.logger.add_channel(color_sensor, 'rgb', index=0)
+        self.logger.open()
+
+    def sample(self):
+        self.logger.sample()
+        if self.logger.records % 256 == 0:
+            self.logger.write()
+
+def main():
+    color_sensor = FakeColorSensor()
+    gyro_sensor = FakeGyroSensor()
+    results = [
+        harness.bench('get_ratio flat', speed_util.get_ratio, ((12, 36, 60),)),
+        harness.bench('get_ratio depth', speed_util.get_ratio, ((12, 36, 60), 1)),
+        harness.bench('float_percent', speed_util.float_percent, (55,)),
+        harness.bench('speed_deg', speed_util.speed_deg, (55,)),
+        harness.bench('speed_mm', speed_util.speed_mm, (55,)),
+        harness.bench('ColorExt.compare Color', ColorExt.compare, (Color.RED, Color.RED)),
+        harness.bench('ColorExt.compare number', ColorExt.compare, (5, Color.RED)),
+        harness.bench('ColorExt.compare set', ColorExt.compare,
+                      ((Color.RED, Color.BLUE, Color.GREEN), Color.GREEN)),
+        harness.bench('ColorExt.compare ColorSet', ColorExt.compare,
+                      (ColorSet((Color.RED, Color.BLUE, Color.GREEN)), Color.GREEN)),
+        harness.bench('ColorSet contains', ColorSet.__contains__,
+                      (ColorSet((Color.RED, Color.BLUE, Color.GREEN)), Color.GREEN)),
+        harness.bench('ColorExt.to_number', ColorExt.to_number, (Color.RED,)),
+        harness.bench('ColorExt.from_number', ColorExt.from_number, (5,)),
+        harness.bench('ColorSensorExt.hsv', ColorSensorExt.hsv, (color_sensor,)),
+        harness.bench('ColorSensorExt.hsv_float', ColorSensorExt.hsv_float, (color_sensor,)),
+        harness.bench('ColorSensorExt.hue', ColorSensorExt.hue, (color_sensor,)),
+        harness.bench('ColorSensorExt.saturation', ColorSensorExt.saturation, (color_sensor,)),
+        harness.bench('ColorSensorExt.hex', ColorSensorExt.hex, (color_sensor,)),
+        harness.bench('ColorSensorExt.rgb_255', ColorSensorExt.rgb_255, (color_sensor,)),
+        harness.bench('GyroSensorExt.bearing', GyroSensorExt.bearing, (gyro_sensor,)),
+    ]
+    sprite = Bitmap(32, 32)
+    sprite.fill_rect(4, 4, 24, 24)
+    screen = Bitmap(178, 128)
+    results += [
+        harness.bench('Bitmap.blit sprite', screen.blit, (sprite, 37, 50)),
+        harness.bench('Canvas frame 1bpp', Animation(1).frame),
+        harness.bench('Canvas frame 32bpp', Animation(32).frame),
+        harness.bench('TelemetryLogger.sample 4 channels', Recording(color_sensor, gyro_sensor).sample),
+    ]
+    if '--save' in sys.argv:
+        harness.save_baseline(BASELINE, results)
+        harness.report(results, {})
+        return
+    regressions = harness.report(results, harness.load_baseline(BASELINE))
+    if len(regressions) > 0:
+        sys.exit(1)
+
+main()
@@ -0,0 +1,98 @@
+"""Startup benchmark: the time and memory taken to import each module
+
+Every module is imported from scratch (with everything loaded after the
+benchmark started unloaded first), so each time includes the modules it
+depends on, standard library modules included. Runs under
+CPython (using the simulated backend) and MicroPython. Run it from the root of
+the repository.
+
+    python3 benchmarks/bench_import.py          compare against the baseline
+    python3 benchmarks/bench_import.py --save   store the results as the baseline
+"""
+import sys
+
+import harness
+
+harness.setup_path()
+
+BASELINE = 'benchmarks/import_baseline.json'
+REPEAT = 5
+
+MODULES = ['parameters_ext', 'files_ext', 'speed_util', 'timing_util', 'wait_util', 'sample_util',
+           'motion_util', 'beacon_util', 'heading_util', 'async_util', 'ev3devices_ext',
+           'sound_util', 'display_util', 'ev3brick_ext', 'tools_ext', 'control_util',
+           'classify_util', 'instrument_util', 'telemetry_util']
+
+_LOADED = set(sys.modules)
+
+def _unload():
+    for module in list(sys.modules):
+        if module not in _LOADED:
+            del sys.modules[module]
+
+def _import(module):
+    _unload()
+    __import__(module)
+
+def measure(module):
+    """Measures the time and memory taken to import a module from scratch
+
+    :param module: Name of the module
+    :type module: str
+    :return: Result in the form (name, microseconds, bytes) or (name, None, error)
+    :rtype: tuple
+    """
+    try:
+        _import(module)
+    except Exception as error:
+        return (module, None, type(error).__name__)
+    best = None
+    for _ in range(REPEAT):
+        _unload()
+        start = harness.ticks_us()
+        __import__(module)
+        elapsed = harness.ticks_diff(harness.ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return (module, best, harness._allocated(_import, (module,)))
+
+def report(results, baseline, tolerance=0.3):
+    """Prints the results next to the baseline and flags regressions
+
+    :param results: Results from measure
+    :type results: list
+    :param baseline: Baseline results keyed by module
+    :type baseline: dict
+    :param tolerance: Fraction slower than the baseline that counts as a regression,
+                      defaults to 0.3
+    :type tolerance: float, optional
+    :return: Names of the regressed modules
+    :rtype: list
+    """
+    regressions = []
+    print('%-36s %14s %12s %10s' % ('module', 'import ms', 'bytes', 'baseline'))
+    for module, elapsed, allocated in results:
+        if elapsed is None:
+            print('%-36s %14s %12s' % (module, 'error', allocated))
+            continue
+        change = ''
+        if module in baseline and baseline[module][0] > 0:
+            ratio = elapsed / baseline[module][0]
+            change = '%.2fx' % ratio
+            if ratio > 1 + tolerance:
+                change += ' SLOWER'
+                regressions.append(module)
+        print('%-36s %14.2f %12s %10s' % (module, elapsed / 1000, allocated, change))
+    return regressions
+
+def main():
+    results = [measure(module) for module in MODULES]
+    if '--save' in sys.argv:
+        harness.save_baseline(BASELINE, results)
+        report(results, {})
+        return
+    regressions = report(results, harness.load_baseline(BASELINE))
+    if len(regressions) > 0:
+        sys.exit(1)
+
+main()
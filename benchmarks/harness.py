@@ -0,0 +1,149 @@
+import gc
+import sys
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+IMPLEMENTATION = sys.implementation.name
+
+def setup_path():
+    """
+    Adds pybricks_ext to the import path and installs the simulated backend
+    when the real pybricks modules are not available
+    """
+    for path in ('pybricks_ext', '../pybricks_ext'):
+        if path not in sys.path:
+            sys.path.append(path)
+    try:
+        import pybricks.ev3devices
+    except ImportError:
+        import sim_backend
+        sim_backend.install()
+
+def _allocated(function, args):
+    """
+    Bytes allocated by a single call, measured with gc.mem_alloc on MicroPython
+    and as the tracemalloc peak on CPython
+    """
+    if hasattr(gc, 'mem_alloc'):
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        function(*args)
+        allocated = gc.mem_alloc() - before
+        gc.enable()
+        return allocated
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    function(*args)
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return allocated
+
+def _rate(function, args, duration):
+    calls = 0
+    batch = 1
+    start = ticks_us()
+    elapsed = 0
+    while elapsed < duration:
+        for _ in range(batch):
+            function(*args)
+        calls += batch
+        batch *= 2
+        elapsed = ticks_diff(ticks_us(), start)
+    return calls * 1000000 / elapsed
+
+def bench(name, function, args=(), duration=200000, repeat=5):
+    """Measures the calls per second and bytes allocated per call of a function
+
+    The best rate of several runs is used to reduce noise from the host.
+
+    :param name: Name to report the result under
+    :type name: str
+    :param function: Function to call
+    :type function: callable
+    :param args: Arguments to call the function with, defaults to ()
+    :type args: tuple, optional
+    :param duration: Time (microseconds) to run the function for in each run,
+                     defaults to 200000
+    :type duration: int, optional
+    :param repeat: Number of runs, defaults to 5
+    :type repeat: int, optional
+    :return: Result in the form (name, ops/sec, bytes/call) or (name, None, error)
+    :rtype: tuple
+    """
+    try:
+        function(*args)
+    except Exception as error:
+        return (name, None, type(error).__name__)
+    rate = max(_rate(function, args, duration) for _ in range(repeat))
+    return (name, rate, _allocated(function, args))
+
+def load_baseline(path):
+    try:
+        with open(path) as baseline_file:
+            return json.load(baseline_file).get(IMPLEMENTATION, {})
+    except (OSError, ValueError):
+        return {}
+
+def save_baseline(path, results):
+    try:
+        with open(path) as baseline_file:
+            baselines = json.load(baseline_file)
+    except (OSError, ValueError):
+        baselines = {}
+    current = {}
+    for name, ops, allocated in results:
+        if ops is not None:
+            current[name] = [round(ops), allocated]
+    baselines[IMPLEMENTATION] = current
+    with open(path, 'w') as baseline_file:
+        baseline_file.write(json.dumps(baselines, sort_keys=True, indent=2) + '\n')
+
+def report(results, baseline, tolerance=0.3):
+    """Prints the results next to the baseline and flags regressions
+
+    :param results: Results from bench
+    :type results: list
+    :param baseline: Baseline results keyed by name
+    :type baseline: dict
+    :param tolerance: Fraction slower than the baseline that counts as a regression,
+                      defaults to 0.3
+    :type tolerance: float, optional
+    :return: Names of the regressed benchmarks
+    :rtype: list
+    """
+    regressions = []
+    print('%-36s %14s %12s %10s' % ('name', 'ops/sec', 'bytes/call', 'baseline'))
+    for name, ops, allocated in results:
+        if ops is None:
+            print('%-36s %14s %12s' % (name, 'error', allocated))
+            continue
+        change = ''
+        if name in baseline:
+            ratio = ops / baseline[name][0]
+            change = '%.2fx' % ratio
+            if ratio < 1 - tolerance:
+                change += ' SLOWER'
+                regressions.append(name)
+        print('%-36s %14.0f %12s %10s' % (name, ops, allocated, change))
+    return regressions
@@ -1 +1,25 @@
+import sys
+
 name = 'lego-mp-extension'
+
+_MODULES = ('async_util', 'beacon_util', 'classify_util', 'control_util', 'display_util',
+            'ev3brick_ext', 'ev3devices_ext', 'files_ext', 'heading_util', 'instrument_util',
+            'motion_util', 'parameters_ext', 'sample_util', 'sim_backend', 'sound_util',
+            'speed_util', 'telemetry_reader', 'telemetry_util', 'timing_util', 'tools_ext',
+            'wait_util')
+
+def __getattr__(attribute):
+    """
+    Imports a submodule the first time it is used (e.g. pybricks_ext.ev3devices_ext),
+    so importing the package costs nothing until something is actually needed.
+    MicroPython only calls this from 1.12 in builds with MICROPY_MODULE_GETATTR
+    enabled, on older firmware import the modules directly
+    """
+    if attribute not in _MODULES:
+        raise AttributeError("module 'pybricks_ext' has no attribute '%s'" % attribute)
+    path = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+    if path not in sys.path:
+        sys.path.append(path)
+    module = __import__(attribute)
+    globals()[attribute] = module
+    return module
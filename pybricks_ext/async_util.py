@@ -0,0 +1,275 @@
+from pybricks.tools import StopWatch
+
+from wait_util import _as_condition, engine
+
+_watch = StopWatch()
+_readings = {}
+_asyncio = None
+
+def _event_loop_module():
+    """
+    Imports uasyncio (or asyncio) the first time it is needed, so that importing
+    the extension classes doesn't pay for it
+    """
+    global _asyncio
+    if _asyncio is None:
+        try:
+            import uasyncio as module
+        except ImportError:
+            import asyncio as module
+        _asyncio = module
+    return _asyncio
+
+def sleep(time):
+    """Cooperatively sleeps, letting other tasks run in the meantime
+
+    :param time: Time to sleep (milliseconds)
+    :type time: int
+    :return: Awaitable that finishes after the time has passed
+    :rtype: coroutine
+    """
+    asyncio = _event_loop_module()
+    if hasattr(asyncio, 'sleep_ms'):
+        return asyncio.sleep_ms(int(time))
+    return asyncio.sleep(time / 1000)
+
+def _register(conditions):
+    """
+    Counts the waiter as a user of each reading it needs, readings are kept in the
+    form [users, time, value] until their last user has finished
+    """
+    keys = []
+    for condition in conditions:
+        key = condition.key()
+        if key in keys:
+            continue
+        keys.append(key)
+        reading = _readings.get(key)
+        if reading is None:
+            reading = [0, None, None]
+            _readings[key] = reading
+        reading[0] += 1
+    return keys
+
+def _unregister(keys):
+    for key in keys:
+        reading = _readings[key]
+        reading[0] -= 1
+        if reading[0] <= 0:
+            del _readings[key]
+
+def _read(condition, now):
+    reading = _readings[condition.key()]
+    if reading[1] is None or now - reading[1] >= engine.poll_interval(condition.device):
+        reading[2] = getattr(condition.device, condition.reading)(*condition.args)
+        reading[1] = now
+    return reading[2]
+
+def _evaluate(conditions, wait_all, now):
+    for condition in conditions:
+        if condition.evaluate(_read(condition, now)):
+            if not wait_all:
+                return condition
+        elif wait_all:
+            return None
+    if wait_all:
+        return conditions
+    return None
+
+async def _wait(conditions, wait_all, timeout):
+    deadline = None
+    if timeout is not None:
+        deadline = _watch.time() + timeout
+    delay = engine.interval
+    for condition in conditions:
+        delay = min(delay, engine.poll_interval(condition.device))
+    keys = _register(conditions)
+    try:
+        while True:
+            now = _watch.time()
+            result = _evaluate(conditions, wait_all, now)
+            if result is not None:
+                return result
+            if deadline is not None:
+                if now >= deadline:
+                    return None
+                await sleep(min(delay, deadline - now))
+            else:
+                await sleep(delay)
+    finally:
+        _unregister(keys)
+
+async def until(condition, timeout=None):
+    """Waits until a condition holds without blocking other tasks
+
+    Readings are shared with every other task waiting on the same device reading,
+    so each one is taken at most once per poll interval (see WaitEngine.set_poll_interval).
+
+    :param condition: Condition to wait for
+    :type condition: Condition
+    :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+    :type timeout: int, optional
+    :return: True if the condition holds, False if the timeout expired
+    :rtype: bool
+    """
+    return await _wait((_as_condition(condition),), False, timeout) is not None
+
+async def until_any(conditions, timeout=None):
+    """Waits until any one of several conditions holds without blocking other tasks
+
+    :param conditions: Conditions to wait for, either Condition objects or tuples of
+                       Condition arguments (device, reading, operator, value)
+    :type conditions: list, tuple
+    :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+    :type timeout: int, optional
+    :return: The condition that fired, None if the timeout expired or there are no conditions
+    :rtype: Condition
+    """
+    conditions = tuple(_as_condition(c) for c in conditions)
+    if len(conditions) == 0:
+        return None
+    return await _wait(conditions, False, timeout)
+
+async def until_all(conditions, timeout=None):
+    """Waits until all of several conditions hold at the same time without blocking other tasks
+
+    :param conditions: Conditions to wait for, either Condition objects or tuples of
+                       Condition arguments (device, reading, operator, value)
+    :type conditions: list, tuple
+    :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+    :type timeout: int, optional
+    :return: True if all of the conditions hold (or there are none), False if the timeout
+             expired
+    :rtype: bool
+    """
+    conditions = tuple(_as_condition(c) for c in conditions)
+    if len(conditions) == 0:
+        return True
+    return await _wait(conditions, True, timeout) is not None
+
+async def until_bumped(pressed, released, wait_timer=500):
+    """Waits until a press is followed by a release within a time limit without
+    blocking other tasks
+
+    :param pressed: Condition that holds while pressed
+    :type pressed: Condition
+    :param released: Condition that holds while released
+    :type released: Condition
+    :param wait_timer: Time to wait (milliseconds) to consider a press and release a bump,
+                       defaults to 500
+    :type wait_timer: int, float, optional
+    """
+    if not isinstance(wait_timer, (int, float)):
+        return
+    while True:
+        await until(pressed)
+        start = _watch.time()
+        await until(released)
+        if _watch.time() - start <= wait_timer:
+            return
+
+async def until_time_passes(watch, time, interval=10):
+    """Waits until the time of a StopWatch passes a value without blocking other tasks.
+    If the StopWatch is paused, it will be resumed
+
+    :param watch: StopWatch to check
+    :type watch: StopWatch
+    :param time: Time value to pass before continuing
+    :type time: int
+    :param interval: Longest time (milliseconds) to sleep between checks, defaults to 10
+    :type interval: int, optional
+    """
+    watch.resume()
+    while True:
+        remaining = time - watch.time()
+        if remaining <= 0:
+            return
+        await sleep(min(remaining, interval))
+
+async def _collect(coroutine, results, index, state):
+    try:
+        results[index] = await coroutine
+    except Exception as error:
+        state[1] = error
+    state[0] -= 1
+
+class Scheduler():
+    """Runs many cooperative tasks in a single thread
+
+    Tasks are coroutines, such as the ``*_async`` wait methods of the extension
+    classes or ``async def`` functions that await them, and are run on uasyncio
+    on the brick or asyncio elsewhere. Tasks can be spawned before or while the
+    scheduler is running.
+
+    :param interval: Time (milliseconds) between checks for finished tasks, defaults to 10
+    :type interval: int, optional
+    """
+
+    def __init__(self, interval=10):
+        """
+        Initiate the Scheduler Object
+        """
+        self.interval = interval
+        self.results = []
+        self._pending = []
+        self._state = [0, None]
+        self._loop = None
+
+    def spawn(self, coroutine):
+        """Adds a task to the scheduler
+
+        :param coroutine: Task to run
+        :type coroutine: coroutine
+        :return: Index of the task's result in results
+        :rtype: int
+        """
+        index = len(self.results)
+        self.results.append(None)
+        self._state[0] += 1
+        task = _collect(coroutine, self.results, index, self._state)
+        if self._loop is None:
+            self._pending.append(task)
+        else:
+            self._loop.create_task(task)
+        return index
+
+    async def _main(self):
+        self._loop = _event_loop_module().get_event_loop()
+        for task in self._pending:
+            self._loop.create_task(task)
+        self._pending = []
+        while self._state[0] > 0 and self._state[1] is None:
+            await sleep(self.interval)
+
+    def run(self):
+        """Runs every spawned task until they have all finished
+
+        :return: Result of every task in the order they were spawned
+        :rtype: list
+        """
+        asyncio = _event_loop_module()
+        try:
+            if hasattr(asyncio, 'run'):
+                asyncio.run(self._main())
+            else:
+                asyncio.get_event_loop().run_until_complete(self._main())
+        finally:
+            self._loop = None
+        error = self._state[1]
+        if error is not None:
+            self._state[1] = None
+            raise error
+        return self.results
+
+def run(*coroutines):
+    """Runs several tasks at the same time in the current thread
+
+    e.g. run(touch.wait_until_pressed_async(), motor.wait_until_motor_stop_async())
+
+    :return: Result of every task in the order they were given
+    :rtype: list
+    """
+    scheduler = Scheduler()
+    for coroutine in coroutines:
+        scheduler.spawn(coroutine)
+    return scheduler.run()
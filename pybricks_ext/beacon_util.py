@@ -0,0 +1,121 @@
+from sample_util import ExponentialFilter, MovingAverage
+
+class BeaconTracker():
+    """Tracks one or more remote beacons with a single sensor read per channel each update
+
+    The distance and angle of each channel come from the same beacon reading and
+    are smoothed, either with an exponential filter or, if a window is given, a
+    moving average. When a beacon can't be seen its filters are reset so stale
+    values don't leak into the next sighting.
+
+    :param sensor: Sensor to read the beacons with
+    :type sensor: InfraredSensor
+    :param channels: Channel numbers of the remotes to track, defaults to (1,)
+    :type channels: tuple, list, int, optional
+    :param alpha: Weight of each new reading from just over 0 (heavy smoothing)
+                  to 1 (no smoothing), defaults to 0.5
+    :type alpha: float, optional
+    :param window: Number of readings to average over instead of using the exponential
+                   filter, defaults to None
+    :type window: int, optional
+    """
+
+    def __init__(self, sensor, channels=(1,), alpha=0.5, window=None):
+        """
+        Initiate the BeaconTracker Object
+        """
+        if isinstance(channels, int):
+            channels = (channels,)
+        self.sensor = sensor
+        self.channels = tuple(channels)
+        self._filters = {}
+        self._readings = {}
+        for channel in self.channels:
+            if window is None:
+                self._filters[channel] = (ExponentialFilter(alpha), ExponentialFilter(alpha))
+            else:
+                self._filters[channel] = (MovingAverage(window), MovingAverage(window))
+            self._readings[channel] = (None, None)
+
+    def reset(self):
+        """
+        Forgets the smoothed readings of every channel
+        """
+        for channel in self.channels:
+            self._filters[channel][0].reset()
+            self._filters[channel][1].reset()
+            self._readings[channel] = (None, None)
+
+    def update(self):
+        """Reads every tracked channel once and updates the smoothed readings
+
+        Call this once per control cycle, then use the other methods to read the results.
+        """
+        for channel in self.channels:
+            distance, angle = self.sensor.beacon(channel)
+            distance_filter, angle_filter = self._filters[channel]
+            if distance is None or angle is None:
+                distance_filter.reset()
+                angle_filter.reset()
+                self._readings[channel] = (None, None)
+            else:
+                self._readings[channel] = (distance_filter.update(distance),
+                                           angle_filter.update(angle))
+
+    def reading(self, channel=None):
+        """Gets the smoothed reading of a channel
+
+        :param channel: Channel number of the remote, defaults to the first tracked channel
+        :type channel: int, optional
+        :return: Smoothed reading in the form (distance, angle), (None, None) if the
+                 beacon couldn't be seen
+        :rtype: tuple
+        """
+        if channel is None:
+            channel = self.channels[0]
+        return self._readings[channel]
+
+    def distance(self, channel=None):
+        """Gets the smoothed relative distance to a remote
+
+        :param channel: Channel number of the remote, defaults to the first tracked channel
+        :type channel: int, optional
+        :return: Smoothed distance, None if the beacon couldn't be seen
+        :rtype: float
+        """
+        return self.reading(channel)[0]
+
+    def angle(self, channel=None):
+        """Gets the smoothed relative angle to a remote
+
+        :param channel: Channel number of the remote, defaults to the first tracked channel
+        :type channel: int, optional
+        :return: Smoothed angle, None if the beacon couldn't be seen
+        :rtype: float
+        """
+        return self.reading(channel)[1]
+
+    def visible(self, channel=None):
+        """Checks if a remote was seen in the last update
+
+        :param channel: Channel number of the remote, defaults to the first tracked channel
+        :type channel: int, optional
+        :return: True if the beacon was seen
+        :rtype: bool
+        """
+        return self.reading(channel)[0] is not None
+
+    def nearest(self):
+        """Gets the closest tracked remote that was seen in the last update
+
+        :return: Channel number of the closest remote, None if none were seen
+        :rtype: int
+        """
+        best = None
+        best_distance = None
+        for channel in self.channels:
+            distance = self._readings[channel][0]
+            if distance is not None and (best_distance is None or distance < best_distance):
+                best = channel
+                best_distance = distance
+        return best
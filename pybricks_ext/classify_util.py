@@ -0,0 +1,175 @@
+from pybricks.tools import wait
+
+from parameters_ext import ColorExt
+
+_MAGIC = b'CCL1'
+
+class ColorClassifier():
+    """Calibrated color classifier using nearest centroids over ColorSensor.rgb readings
+
+    Labelled RGB samples are averaged into a centroid for each color, then every
+    cell of a quantised RGB cube is assigned the nearest centroid once. Classifying
+    a reading is then a table lookup with no floating point maths.
+
+    Colors are stored by their number (see ColorExt.to_number) and classify
+    returns the matching Color, so results can be passed straight to
+    ColorExt.compare, ColorSensorExt.equals and the color waits.
+
+    :param bits: Number of bits each channel is quantised to, defaults to 4
+    :type bits: int, optional
+    :param max_distance: Largest distance (in rgb percent) from a centroid that is
+                         still classified as that color, None for no limit, defaults to None
+    :type max_distance: int, float, optional
+    """
+
+    def __init__(self, bits=4, max_distance=None):
+        """
+        Initiate the ColorClassifier Object
+        """
+        self.bits = bits
+        self.max_distance = max_distance
+        self.samples = {}
+        self.centroids = {}
+        self._levels = bytes(min(value * (1 << bits) // 101, (1 << bits) - 1)
+                             for value in range(101))
+        self._table = None
+
+    def add_sample(self, color, rgb):
+        """Adds a labelled RGB sample
+
+        :param color: Color the sample belongs to
+        :type color: Color, ColorExt, int
+        :param rgb: Reading from ColorSensor.rgb
+        :type rgb: tuple
+        """
+        number = _to_number(color)
+        totals = self.samples.get(number)
+        if totals is None:
+            totals = [0, 0, 0, 0]
+            self.samples[number] = totals
+        totals[0] += rgb[0]
+        totals[1] += rgb[1]
+        totals[2] += rgb[2]
+        totals[3] += 1
+
+    def record(self, sensor, color, count=20, interval=10):
+        """Records labelled samples from a color sensor
+
+        :param sensor: Sensor held over a surface of the color
+        :type sensor: ColorSensor
+        :param color: Color the surface is
+        :type color: Color, ColorExt, int
+        :param count: Number of samples to take, defaults to 20
+        :type count: int, optional
+        :param interval: Time (milliseconds) between samples, defaults to 10
+        :type interval: int, optional
+        """
+        for _ in range(count):
+            self.add_sample(color, sensor.rgb())
+            wait(interval)
+
+    def build(self):
+        """
+        Calculates the centroids from the samples and builds the lookup table
+        """
+        self.centroids = {}
+        for number, totals in self.samples.items():
+            self.centroids[number] = (totals[0] / totals[3], totals[1] / totals[3],
+                                      totals[2] / totals[3])
+        self._build_table()
+
+    def _build_table(self):
+        levels = 1 << self.bits
+        step = 101 / levels
+        centres = [(index + 0.5) * step for index in range(levels)]
+        limit = None
+        if self.max_distance is not None:
+            limit = self.max_distance * self.max_distance
+        centroids = list(self.centroids.items())
+        table = bytearray(levels * levels * levels)
+        index = 0
+        for red in centres:
+            for green in centres:
+                for blue in centres:
+                    best = 0
+                    best_distance = None
+                    for number, centroid in centroids:
+                        distance = ((red - centroid[0]) ** 2 + (green - centroid[1]) ** 2
+                                    + (blue - centroid[2]) ** 2)
+                        if best_distance is None or distance < best_distance:
+                            best = number
+                            best_distance = distance
+                    if limit is not None and best_distance is not None and best_distance > limit:
+                        best = 0
+                    table[index] = best
+                    index += 1
+        self._table = table
+
+    def classify_number(self, rgb):
+        """Classifies a reading to a color number
+
+        :param rgb: Reading from ColorSensor.rgb
+        :type rgb: tuple
+        :return: Color number, 0 if no color matches
+        :rtype: int
+        """
+        levels = self._levels
+        bits = self.bits
+        red = levels[min(int(rgb[0]), 100)]
+        green = levels[min(int(rgb[1]), 100)]
+        blue = levels[min(int(rgb[2]), 100)]
+        return self._table[(((red << bits) | green) << bits) | blue]
+
+    def classify(self, rgb):
+        """Classifies a reading to a Color
+
+        :param rgb: Reading from ColorSensor.rgb
+        :type rgb: tuple
+        :return: Color of the reading, None if no color matches
+        :rtype: Color
+        """
+        return ColorExt.from_number(self.classify_number(rgb))
+
+    def save(self, path):
+        """Saves the centroids and lookup table to a compact binary file
+
+        :param path: Path of the file
+        :type path: str
+        """
+        data = bytearray(_MAGIC)
+        data.append(self.bits)
+        data.append(len(self.centroids))
+        for number, centroid in self.centroids.items():
+            data.append(number)
+            for value in centroid:
+                data.append(min(max(int(value + 0.5), 0), 255))
+        data.extend(self._table)
+        with open(path, 'wb') as classifier_file:
+            classifier_file.write(data)
+
+    @staticmethod
+    def load(path):
+        """Loads a classifier saved with save
+
+        :param path: Path of the file
+        :type path: str
+        :return: Loaded classifier
+        :rtype: ColorClassifier
+        """
+        with open(path, 'rb') as classifier_file:
+            data = classifier_file.read()
+        if data[:4] != _MAGIC:
+            raise ValueError('not a color classifier file')
+        classifier = ColorClassifier(bits=data[4])
+        offset = 6
+        for _ in range(data[5]):
+            classifier.centroids[data[offset]] = (data[offset + 1], data[offset + 2],
+                                                  data[offset + 3])
+            offset += 4
+        classifier._table = bytearray(data[offset:])
+        return classifier
+
+def _to_number(color):
+    if isinstance(color, int):
+        return color
+    return ColorExt.to_number(color)
@@ -0,0 +1,162 @@
+from pybricks.tools import StopWatch
+
+from timing_util import LoopStats, Ticker
+
+class PIDController():
+    """PID controller with anti-windup, derivative filtering and percent output clamping
+
+    The derivative is taken on the measurement rather than the error so that
+    setpoint changes don't kick the output, and is passed through a first order
+    low pass filter. The integral stops accumulating while the output is
+    saturated in the direction of the error.
+
+    :param kp: Proportional gain
+    :type kp: int, float
+    :param ki: Integral gain (per second), defaults to 0
+    :type ki: int, float, optional
+    :param kd: Derivative gain (seconds), defaults to 0
+    :type kd: int, float, optional
+    :param setpoint: Target value of the process variable, defaults to 0
+    :type setpoint: int, float, optional
+    :param min_output: Minimum output percentage, defaults to -100
+    :type min_output: int, float, optional
+    :param max_output: Maximum output percentage, defaults to 100
+    :type max_output: int, float, optional
+    :param derivative_filter: Weight of the previous derivative from 0 (no filtering)
+                              to just under 1 (heavy filtering), defaults to 0.5
+    :type derivative_filter: float, optional
+    """
+
+    def __init__(self, kp, ki=0, kd=0, setpoint=0, min_output=-100, max_output=100,
+                 derivative_filter=0.5):
+        """
+        Initiate the PIDController Object
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.setpoint = setpoint
+        self.min_output = min(min_output, max_output)
+        self.max_output = max(min_output, max_output)
+        self.derivative_filter = derivative_filter
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the integral, derivative and previous measurement
+        """
+        self.integral = 0
+        self.derivative = 0
+        self.output = 0
+        self._last_measurement = None
+
+    def update(self, measurement, elapsed):
+        """Calculates the output for a new measurement of the process variable
+
+        :param measurement: Current value of the process variable
+        :type measurement: int, float
+        :param elapsed: Time (milliseconds) since the previous update
+        :type elapsed: int, float
+        :return: Output percentage between the minimum and maximum output
+        :rtype: int, float
+        """
+        error = self.setpoint - measurement
+        seconds = elapsed / 1000
+        if self._last_measurement is not None and seconds > 0:
+            raw = -(measurement - self._last_measurement) / seconds
+            self.derivative = (self.derivative_filter * self.derivative
+                               + (1 - self.derivative_filter) * raw)
+        self._last_measurement = measurement
+        integral = self.integral + error * seconds
+        output = self.kp * error + self.ki * integral + self.kd * self.derivative
+        if output > self.max_output:
+            clamped = self.max_output
+            saturated = error > 0
+        elif output < self.min_output:
+            clamped = self.min_output
+            saturated = error < 0
+        else:
+            clamped = output
+            saturated = False
+        if not saturated:
+            self.integral = integral
+        self.output = clamped
+        return clamped
+
+class PIDLoop():
+    """Fixed rate closed loop that drives an output from a process variable
+
+    The process variable can be any reading method of the extension classes
+    (e.g. ColorSensorExt.reflection or GyroSensorExt.angle). The output is a
+    callable taking a percentage or any object with a percent_run method, such
+    as a MotorExt or MotorGroupExt. The real elapsed time of every iteration is
+    measured with a StopWatch and passed to the controller, so jitter in the
+    loop period doesn't change the gains.
+
+    :param controller: Controller to calculate the output with
+    :type controller: PIDController
+    :param process: Callable returning the process variable
+    :type process: callable
+    :param output: Callable or object with percent_run that receives the output percentage
+    :type output: callable, MotorExt, MotorGroupExt
+    :param period: Target loop period (milliseconds), defaults to 10
+    :type period: int, optional
+    """
+
+    def __init__(self, controller, process, output, period=10):
+        """
+        Initiate the PIDLoop Object
+        """
+        self.controller = controller
+        self.process = process
+        if callable(output):
+            self.output = output
+        else:
+            self.output = output.percent_run
+        self.period = period
+        self.stats = LoopStats()
+        self.stop = False
+        self._watch = StopWatch()
+        self._last = None
+
+    def step(self):
+        """Runs a single iteration of the loop straight away
+
+        :return: Output percentage
+        :rtype: int, float
+        """
+        now = self._watch.time()
+        elapsed = self.period
+        if self._last is not None:
+            elapsed = now - self._last
+            self.stats.add(elapsed, self.period)
+        self._last = now
+        value = self.controller.update(self.process(), elapsed)
+        self.output(value)
+        return value
+
+    def run(self, duration=None, condition=None):
+        """Runs the loop at the target period until stopped
+
+        Sleeps until the next absolute deadline with a Ticker rather than for a fixed
+        time, so time spent in the loop doesn't add to the period.
+
+        :param duration: Time (milliseconds) to run for, None runs until stopped,
+                         defaults to None
+        :type duration: int, optional
+        :param condition: Condition that stops the loop when it holds, defaults to None
+        :type condition: Condition, optional
+        """
+        self.stop = False
+        self._last = None
+        ticker = Ticker(self.period)
+        while not self.stop:
+            self.step()
+            if condition is not None and condition.check():
+                return
+            if duration is not None and ticker.deadline > duration:
+                return
+            ticker.wait()
+
+    def kill(self):
+        self.stop = True
@@ -0,0 +1,642 @@
+import struct
+import threading
+
+try:
+    import zlib
+except ImportError:
+    import uzlib as zlib
+
+WIDTH = 178
+HEIGHT = 128
+
+OR = 'or'
+COPY = 'copy'
+XOR = 'xor'
+ERASE = 'erase'
+
+_PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# 5x7 font for ASCII 32 to 126, five columns per character with the top row in bit 0
+_FONT = (
+         b'\x00\x00\x00\x00\x00\x00\x00\x5f\x00\x00\x00\x07\x00\x07\x00\x14'
+         b'\x7f\x14\x7f\x14\x24\x2a\x7f\x2a\x12\x23\x13\x08\x64\x62\x36\x49'
+         b'\x56\x20\x50\x00\x05\x03\x00\x00\x00\x1c\x22\x41\x00\x00\x41\x22'
+         b'\x1c\x00\x14\x08\x3e\x08\x14\x08\x08\x3e\x08\x08\x00\x50\x30\x00'
+         b'\x00\x08\x08\x08\x08\x08\x00\x60\x60\x00\x00\x20\x10\x08\x04\x02'
+         b'\x3e\x51\x49\x45\x3e\x00\x42\x7f\x40\x00\x42\x61\x51\x49\x46\x21'
+         b'\x41\x45\x4b\x31\x18\x14\x12\x7f\x10\x27\x45\x45\x45\x39\x3c\x4a'
+         b'\x49\x49\x30\x01\x71\x09\x05\x03\x36\x49\x49\x49\x36\x06\x49\x49'
+         b'\x29\x1e\x00\x36\x36\x00\x00\x00\x56\x36\x00\x00\x08\x14\x22\x41'
+         b'\x00\x14\x14\x14\x14\x14\x00\x41\x22\x14\x08\x02\x01\x51\x09\x06'
+         b'\x32\x49\x79\x41\x3e\x7e\x11\x11\x11\x7e\x7f\x49\x49\x49\x36\x3e'
+         b'\x41\x41\x41\x22\x7f\x41\x41\x22\x1c\x7f\x49\x49\x49\x41\x7f\x09'
+         b'\x09\x09\x01\x3e\x41\x49\x49\x7a\x7f\x08\x08\x08\x7f\x00\x41\x7f'
+         b'\x41\x00\x20\x40\x41\x3f\x01\x7f\x08\x14\x22\x41\x7f\x40\x40\x40'
+         b'\x40\x7f\x02\x0c\x02\x7f\x7f\x04\x08\x10\x7f\x3e\x41\x41\x41\x3e'
+         b'\x7f\x09\x09\x09\x06\x3e\x41\x51\x21\x5e\x7f\x09\x19\x29\x46\x46'
+         b'\x49\x49\x49\x31\x01\x01\x7f\x01\x01\x3f\x40\x40\x40\x3f\x1f\x20'
+         b'\x40\x20\x1f\x3f\x40\x38\x40\x3f\x63\x14\x08\x14\x63\x07\x08\x70'
+         b'\x08\x07\x61\x51\x49\x45\x43\x00\x7f\x41\x41\x00\x02\x04\x08\x10'
+         b'\x20\x00\x41\x41\x7f\x00\x04\x02\x01\x02\x04\x40\x40\x40\x40\x40'
+         b'\x00\x01\x02\x04\x00\x20\x54\x54\x54\x78\x7f\x48\x44\x44\x38\x38'
+         b'\x44\x44\x44\x20\x38\x44\x44\x48\x7f\x38\x54\x54\x54\x18\x08\x7e'
+         b'\x09\x01\x02\x0c\x52\x52\x52\x3e\x7f\x08\x04\x04\x78\x00\x44\x7d'
+         b'\x40\x00\x20\x40\x44\x3d\x00\x7f\x10\x28\x44\x00\x00\x41\x7f\x40'
+         b'\x00\x7c\x04\x18\x04\x78\x7c\x08\x04\x04\x78\x38\x44\x44\x44\x38'
+         b'\x7c\x14\x14\x14\x08\x08\x14\x14\x18\x7c\x7c\x08\x04\x04\x08\x48'
+         b'\x54\x54\x54\x20\x04\x3f\x44\x40\x20\x3c\x40\x40\x20\x7c\x1c\x20'
+         b'\x40\x20\x1c\x3c\x40\x30\x40\x3c\x44\x28\x10\x28\x44\x0c\x50\x50'
+         b'\x50\x3c\x44\x64\x54\x4c\x44\x00\x08\x36\x41\x00\x00\x00\x7f\x00'
+         b'\x00\x00\x41\x36\x08\x00\x08\x04\x08\x10\x08'
+)
+_FONT_WIDTH = 6
+_FONT_HEIGHT = 8
+
+def image_path(file_name):
+    """Gets the path of an image file
+
+    :param file_name: Image file
+    :type file_name: ImageFileExt, ImageFile, str
+    :return: Path of the image file
+    :rtype: str
+    """
+    return getattr(file_name, 'value', file_name)
+
+class Bitmap():
+    """Packed 1-bit image, 8 pixels to a byte with the leftmost pixel in the high bit
+
+    Set bits are black and every row starts on a new byte.
+
+    :param width: Width (pixels)
+    :type width: int
+    :param height: Height (pixels)
+    :type height: int
+    :param data: Packed pixels, defaults to a white image
+    :type data: bytearray, optional
+    """
+
+    def __init__(self, width, height, data=None):
+        """
+        Initiate the Bitmap Object
+        """
+        self.width = width
+        self.height = height
+        self.stride = (width + 7) // 8
+        if data is None:
+            data = bytearray(self.stride * height)
+        self.data = data
+
+    def get(self, x, y):
+        """Gets a pixel
+
+        :param x: Column of the pixel
+        :type x: int
+        :param y: Row of the pixel
+        :type y: int
+        :return: True if the pixel is black
+        :rtype: bool
+        """
+        return bool(self.data[y * self.stride + (x >> 3)] & (0x80 >> (x & 7)))
+
+    def set(self, x, y, value=True):
+        """Sets a pixel, pixels outside of the bitmap are ignored
+
+        :param x: Column of the pixel
+        :type x: int
+        :param y: Row of the pixel
+        :type y: int
+        :param value: True for black, False for white, defaults to True
+        :type value: bool, optional
+        """
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return
+        index = y * self.stride + (x >> 3)
+        if value:
+            self.data[index] |= 0x80 >> (x & 7)
+        else:
+            self.data[index] &= ~(0x80 >> (x & 7)) & 0xFF
+
+    def fill(self, value=False):
+        """Sets every pixel
+
+        :param value: True for black, False for white, defaults to False
+        :type value: bool, optional
+        """
+        byte = 0xFF if value else 0
+        for index in range(len(self.data)):
+            self.data[index] = byte
+
+    def fill_rect(self, x, y, width, height, value=True):
+        """Sets every pixel in a rectangle
+
+        :param x: Left column of the rectangle
+        :type x: int
+        :param y: Top row of the rectangle
+        :type y: int
+        :param width: Width of the rectangle
+        :type width: int
+        :param height: Height of the rectangle
+        :type height: int
+        :param value: True for black, False for white, defaults to True
+        :type value: bool, optional
+        """
+        bits = self.stride * 8
+        shift = bits - x - width
+        mask = (1 << max(0, width)) - 1
+        if shift >= 0:
+            mask <<= shift
+        else:
+            mask >>= -shift
+        mask &= ((1 << self.width) - 1) << (bits - self.width)
+        for row in range(max(0, y), min(self.height, y + height)):
+            if value:
+                self._set_row(row, self._row(row) | mask)
+            else:
+                self._set_row(row, self._row(row) & ~mask)
+
+    def _row(self, y):
+        start = y * self.stride
+        return int.from_bytes(self.data[start:start + self.stride], 'big')
+
+    def _set_row(self, y, value):
+        start = y * self.stride
+        self.data[start:start + self.stride] = value.to_bytes(self.stride, 'big')
+
+    def blit(self, source, x=0, y=0, mode=OR):
+        """Draws another bitmap onto this one, clipping anything outside of this bitmap
+
+        :param source: Bitmap to draw
+        :type source: Bitmap
+        :param x: Column of the left edge of the source, defaults to 0
+        :type x: int, optional
+        :param y: Row of the top edge of the source, defaults to 0
+        :type y: int, optional
+        :param mode: OR to only draw black pixels, COPY to draw every pixel, XOR to invert
+                     the pixels under black pixels or ERASE to clear the pixels under black
+                     pixels, defaults to OR
+        :type mode: str, optional
+        """
+        bits = self.stride * 8
+        shift = bits - source.stride * 8 - x
+        clip = ((1 << self.width) - 1) << (bits - self.width)
+        mask = ((1 << source.width) - 1) << (source.stride * 8 - source.width)
+        if shift >= 0:
+            mask = (mask << shift) & clip
+        else:
+            mask = (mask >> -shift) & clip
+        for row in range(max(0, -y), min(source.height, self.height - y)):
+            pixels = source._row(row)
+            if shift >= 0:
+                pixels = (pixels << shift) & mask
+            else:
+                pixels = (pixels >> -shift) & mask
+            current = self._row(row + y)
+            if mode == OR:
+                current |= pixels
+            elif mode == COPY:
+                current = (current & ~mask) | pixels
+            elif mode == XOR:
+                current ^= pixels
+            else:
+                current &= ~pixels
+            self._set_row(row + y, current)
+
+def _unfilter(row, previous, kind, step):
+    length = len(row)
+    if kind == 1:
+        for index in range(step, length):
+            row[index] = (row[index] + row[index - step]) & 0xFF
+    elif kind == 2:
+        for index in range(length):
+            row[index] = (row[index] + previous[index]) & 0xFF
+    elif kind == 3:
+        for index in range(length):
+            left = row[index - step] if index >= step else 0
+            row[index] = (row[index] + ((left + previous[index]) >> 1)) & 0xFF
+    elif kind == 4:
+        for index in range(length):
+            left = row[index - step] if index >= step else 0
+            upper_left = previous[index - step] if index >= step else 0
+            up = previous[index]
+            estimate = left + up - upper_left
+            left_distance = abs(estimate - left)
+            up_distance = abs(estimate - up)
+            upper_left_distance = abs(estimate - upper_left)
+            if left_distance <= up_distance and left_distance <= upper_left_distance:
+                predictor = left
+            elif up_distance <= upper_left_distance:
+                predictor = up
+            else:
+                predictor = upper_left
+            row[index] = (row[index] + predictor) & 0xFF
+
+def _raw(row, index, depth):
+    if depth == 8:
+        return row[index]
+    if depth == 16:
+        return row[index * 2]
+    bit = index * depth
+    return (row[bit >> 3] >> (8 - depth - (bit & 7))) & ((1 << depth) - 1)
+
+def _sample(row, index, depth):
+    if depth >= 8:
+        return _raw(row, index, depth)
+    return _raw(row, index, depth) * 255 // ((1 << depth) - 1)
+
+def decode_png(file_name, threshold=128):
+    """Decodes a non interlaced PNG image into a bitmap
+
+    Pixels darker than the threshold become black and transparent pixels become white.
+
+    :param file_name: Image file
+    :type file_name: ImageFileExt, ImageFile, str
+    :param threshold: Brightness (0 to 255) below which a pixel is black, defaults to 128
+    :type threshold: int, optional
+    :return: Decoded image
+    :rtype: Bitmap
+    """
+    with open(image_path(file_name), 'rb') as image_file:
+        data = image_file.read()
+    if data[:8] != _PNG_MAGIC:
+        raise ValueError('not a PNG image')
+    offset = 8
+    chunks = []
+    palette = None
+    header = None
+    while offset < len(data):
+        length = struct.unpack('>I', data[offset:offset + 4])[0]
+        kind = data[offset + 4:offset + 8]
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif kind == b'PLTE':
+            palette = chunk
+        elif kind == b'IDAT':
+            chunks.append(chunk)
+        elif kind == b'IEND':
+            break
+    width, height, depth, color_type, _, _, interlace = header
+    if interlace:
+        raise ValueError('interlaced PNG images are not supported')
+    channels = _CHANNELS[color_type]
+    stride = (width * depth * channels + 7) // 8
+    step = max(1, depth * channels // 8)
+    raw = zlib.decompress(b''.join(chunks))
+    bitmap = Bitmap(width, height)
+    previous = bytearray(stride)
+    position = 0
+    for y in range(height):
+        row = bytearray(raw[position + 1:position + 1 + stride])
+        _unfilter(row, previous, raw[position], step)
+        position += 1 + stride
+        previous = row
+        start = y * bitmap.stride
+        if color_type == 0 and depth == 1:
+            for index in range(stride):
+                bitmap.data[start + index] = ~row[index] & 0xFF
+            if width & 7:
+                bitmap.data[start + stride - 1] &= (0xFF00 >> (width & 7)) & 0xFF
+            continue
+        for x in range(width):
+            if color_type == 3:
+                entry = _raw(row, x, depth)
+                red = palette[entry * 3]
+                green = palette[entry * 3 + 1]
+                blue = palette[entry * 3 + 2]
+                brightness = (red * 77 + green * 150 + blue * 29) >> 8
+            elif color_type == 0 or color_type == 4:
+                brightness = _sample(row, x * channels, depth)
+            else:
+                red = _sample(row, x * channels, depth)
+                green = _sample(row, x * channels + 1, depth)
+                blue = _sample(row, x * channels + 2, depth)
+                brightness = (red * 77 + green * 150 + blue * 29) >> 8
+            if color_type == 4 or color_type == 6:
+                if _sample(row, x * channels + channels - 1, depth) < 128:
+                    continue
+            if brightness < threshold:
+                bitmap.data[start + (x >> 3)] |= 0x80 >> (x & 7)
+    return bitmap
+
+class ImageCache():
+    """Least recently used cache of decoded images
+
+    :param max_bytes: Maximum total size (bytes) of the decoded bitmaps, defaults to 32 KiB
+    :type max_bytes: int, optional
+    """
+
+    def __init__(self, max_bytes=32 * 1024):
+        """
+        Initiate the ImageCache Object
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = {}
+        self._order = []
+        self._lock = threading.Lock()
+
+    def __contains__(self, file_name):
+        return image_path(file_name) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, file_name):
+        """Gets a decoded image, decoding and caching it if it isn't already
+
+        :param file_name: Image file
+        :type file_name: ImageFileExt, ImageFile, str
+        :return: Decoded image
+        :rtype: Bitmap
+        """
+        path = image_path(file_name)
+        with self._lock:
+            bitmap = self._entries.get(path)
+            if bitmap is not None:
+                if self._order[-1] != path:
+                    self._order.remove(path)
+                    self._order.append(path)
+                return bitmap
+        bitmap = decode_png(path)
+        size = len(bitmap.data)
+        with self._lock:
+            if path in self._entries or size > self.max_bytes:
+                return bitmap
+            while self.size + size > self.max_bytes:
+                self._remove(self._order[0])
+            self._entries[path] = bitmap
+            self._order.append(path)
+            self.size += size
+        return bitmap
+
+    def preload(self, *file_names):
+        """
+        Decodes images into the cache ahead of time, most important first
+        """
+        for file_name in file_names:
+            self.get(file_name)
+
+    def evict(self, file_name=None):
+        """Removes an image from the cache
+
+        :param file_name: Image to remove, None removes every image, defaults to None
+        :type file_name: ImageFileExt, ImageFile, str, optional
+        """
+        with self._lock:
+            if file_name is None:
+                for path in list(self._order):
+                    self._remove(path)
+            elif image_path(file_name) in self._entries:
+                self._remove(image_path(file_name))
+
+    def _remove(self, path):
+        bitmap = self._entries.pop(path)
+        self._order.remove(path)
+        self.size -= len(bitmap.data)
+
+def _glyph(character):
+    code = ord(character)
+    if code < 32 or code > 126:
+        code = 63
+    offset = (code - 32) * 5
+    glyph = Bitmap(_FONT_WIDTH, _FONT_HEIGHT)
+    for column in range(5):
+        bits = _FONT[offset + column]
+        for row in range(7):
+            if bits & (1 << row):
+                glyph.set(column, row)
+    return glyph
+
+class Framebuffer():
+    """Writes rows of a bitmap to a Linux framebuffer device such as the EV3 LCD
+
+    The pixel format is read from sysfs where it is available, 1 bit per pixel
+    framebuffers take the packed rows as they are and deeper framebuffers have
+    each pixel expanded to black or white.
+
+    :param path: Path of the framebuffer device (or an open binary file), defaults to '/dev/fb0'
+    :type path: str, file, optional
+    :param width: Width (pixels), defaults to 178
+    :type width: int, optional
+    :param height: Height (pixels), defaults to 128
+    :type height: int, optional
+    :param bpp: Bits per pixel (1, 8, 16 or 32), defaults to the value in sysfs or 1
+    :type bpp: int, optional
+    :param line_length: Bytes per row, defaults to the value in sysfs or the packed row size
+    :type line_length: int, optional
+    """
+
+    def __init__(self, path='/dev/fb0', width=WIDTH, height=HEIGHT, bpp=None, line_length=None):
+        """
+        Initiate the Framebuffer Object
+        """
+        name = 'fb0'
+        if isinstance(path, str):
+            name = path.split('/')[-1]
+        if bpp is None:
+            bpp = _sysfs(name, 'bits_per_pixel', 1)
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        if line_length is None:
+            line_length = _sysfs(name, 'stride', (width * bpp + 7) // 8)
+        self.line_length = line_length
+        if isinstance(path, str):
+            self._file = open(path, 'r+b')
+        else:
+            self._file = path
+        self._table = None
+        if bpp > 1:
+            size = bpp // 8
+            black = bytes(size)
+            white = b'\xff' * size
+            self._table = [b''.join(black if byte & (0x80 >> bit) else white for bit in range(8))
+                           for byte in range(256)]
+
+    def write(self, bitmap, y, start, end):
+        """Writes part of a row of a bitmap to the device
+
+        :param bitmap: Bitmap the same size as the device
+        :type bitmap: Bitmap
+        :param y: Row to write
+        :type y: int
+        :param start: First byte of the packed row to write
+        :type start: int
+        :param end: Byte after the last byte of the packed row to write
+        :type end: int
+        """
+        offset = y * bitmap.stride
+        row = bitmap.data[offset + start:offset + end]
+        if self._table is None:
+            self._file.seek(y * self.line_length + start)
+            self._file.write(row)
+            return
+        table = self._table
+        data = b''.join(table[byte] for byte in row)
+        size = self.bpp // 8
+        pixels = min(end * 8, self.width) - start * 8
+        self._file.seek(y * self.line_length + start * 8 * size)
+        self._file.write(data[:pixels * size])
+
+    def flush(self):
+        """
+        Flushes any buffered writes to the device
+        """
+        self._file.flush()
+
+def _sysfs(name, attribute, default):
+    try:
+        with open('/sys/class/graphics/' + name + '/' + attribute) as attribute_file:
+            return int(attribute_file.read().split(',')[0])
+    except (OSError, ValueError):
+        return default
+
+class Canvas():
+    """Off-screen buffer that sprites and text are composited into before being shown
+
+    Drawing only changes the back buffer. show compares the changed area with
+    what is already on the screen and writes just the rows (and the bytes of
+    each row) that are different.
+
+    :param output: Device to show the canvas on, defaults to the EV3 LCD framebuffer
+    :type output: Framebuffer, optional
+    :param width: Width (pixels), defaults to 178
+    :type width: int, optional
+    :param height: Height (pixels), defaults to 128
+    :type height: int, optional
+    :param cache: Cache to get images from, defaults to a new ImageCache
+    :type cache: ImageCache, optional
+    """
+
+    def __init__(self, output=None, width=WIDTH, height=HEIGHT, cache=None):
+        """
+        Initiate the Canvas Object
+        """
+        if output is None:
+            output = Framebuffer(width=width, height=height)
+        if cache is None:
+            cache = ImageCache()
+        self.output = output
+        self.cache = cache
+        self.back = Bitmap(width, height)
+        self._front = Bitmap(width, height)
+        self._glyphs = {}
+        self._dirty = (0, 0, width, height)
+        self._shown = False
+        self._lock = threading.Lock()
+
+    def _mark(self, x, y, width, height):
+        left = max(0, x)
+        top = max(0, y)
+        right = min(self.back.width, x + width)
+        bottom = min(self.back.height, y + height)
+        if left >= right or top >= bottom:
+            return
+        if self._dirty is None:
+            self._dirty = (left, top, right, bottom)
+        else:
+            self._dirty = (min(left, self._dirty[0]), min(top, self._dirty[1]),
+                           max(right, self._dirty[2]), max(bottom, self._dirty[3]))
+
+    def clear(self):
+        """
+        Clears the canvas to white
+        """
+        with self._lock:
+            self.back.fill(False)
+            self._mark(0, 0, self.back.width, self.back.height)
+
+    def draw(self, image, x=0, y=0, mode=OR):
+        """Draws an image or bitmap onto the canvas
+
+        :param image: Image file or bitmap to draw
+        :type image: ImageFileExt, ImageFile, str, Bitmap
+        :param x: Column of the left edge of the image, defaults to 0
+        :type x: int, optional
+        :param y: Row of the top edge of the image, defaults to 0
+        :type y: int, optional
+        :param mode: How to combine the image with the canvas (see Bitmap.blit), defaults to OR
+        :type mode: str, optional
+        """
+        if not isinstance(image, Bitmap):
+            image = self.cache.get(image)
+        with self._lock:
+            self.back.blit(image, x, y, mode)
+            self._mark(x, y, image.width, image.height)
+
+    def fill_rect(self, x, y, width, height, value=True):
+        """Fills a rectangle of the canvas
+
+        :param x: Left column of the rectangle
+        :type x: int
+        :param y: Top row of the rectangle
+        :type y: int
+        :param width: Width of the rectangle
+        :type width: int
+        :param height: Height of the rectangle
+        :type height: int
+        :param value: True for black, False for white, defaults to True
+        :type value: bool, optional
+        """
+        with self._lock:
+            self.back.fill_rect(x, y, width, height, value)
+            self._mark(x, y, width, height)
+
+    def text(self, text, x=0, y=0, mode=OR):
+        """Draws text in the built in 5x7 font, each character takes up 6x8 pixels
+
+        :param text: Text to draw
+        :type text: str
+        :param x: Column of the left edge of the text, defaults to 0
+        :type x: int, optional
+        :param y: Row of the top edge of the text, defaults to 0
+        :type y: int, optional
+        :param mode: How to combine the text with the canvas (see Bitmap.blit), defaults to OR
+        :type mode: str, optional
+        """
+        with self._lock:
+            for index, character in enumerate(str(text)):
+                glyph = self._glyphs.get(character)
+                if glyph is None:
+                    glyph = _glyph(character)
+                    self._glyphs[character] = glyph
+                self.back.blit(glyph, x + index * _FONT_WIDTH, y, mode)
+            self._mark(x, y, len(str(text)) * _FONT_WIDTH, _FONT_HEIGHT)
+
+    def show(self):
+        """Writes the parts of the canvas that changed to the screen
+
+        :return: Number of rows written
+        :rtype: int
+        """
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = None
+            if dirty is None:
+                return 0
+            back = self.back.data
+            front = self._front.data
+            stride = self.back.stride
+            first = dirty[0] >> 3
+            last = (dirty[2] + 7) >> 3
+            written = 0
+            for y in range(dirty[1], dirty[3]):
+                offset = y * stride
+                start = offset + first
+                end = offset + last
+                if self._shown:
+                    if back[start:end] == front[start:end]:
+                        continue
+                    while back[start] == front[start]:
+                        start += 1
+                    while back[end - 1] == front[end - 1]:
+                        end -= 1
+                self.output.write(self.back, y, start - offset, end - offset)
+                front[start:end] = back[start:end]
+                written += 1
+            self._shown = True
+            if written > 0:
+                self.output.flush()
+            return written
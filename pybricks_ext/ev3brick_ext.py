@@ -1,85 +1,295 @@
 import threading
 
 from pybricks import ev3brick as brick
-from pybricks.parameters import Color
-from pybricks.tools import wait
+from pybricks.parameters import Align, Color
+from pybricks.tools import wait, StopWatch
 
+from display_util import Canvas, ImageCache, image_path
 from parameters_ext import ColorExt
+from sound_util import SoundCache, sound_path
 
-flashing_lock = None
+_FOREVER = None
+_SLICE = 20
 
-def light_pulse(color, short_pause=200, long_pause=800, on_pause=100):
-    """Set the brick light to pulse a color
-
-    :param color: Color of the light
-    :type color: ColorExt
-    :param short_pause: Duration of the short pause, defaults to 200
-    :type short_pause: int, optional
-    :param long_pause: Duration of the long pause, defaults to 800
-    :type long_pause: int, optional
-    :param on_pause: Duration of the light flashing on, defaults to 100
-    :type on_pause: int, optional
+class _Wakeup():
+    """
+    Sleeps a worker thread until a time passes or another thread calls set, using
+    threading.Event where it is available and checking every 20 milliseconds where it isn't
     """
-    global flashing_lock
-    if isinstance(flashing_lock, LightPulse):
-        flashing_lock.kill()
-        flashing_lock = None
-    if color is None or ColorExt.compare(color, Color.BLACK):
-        light(None)
-    else:
-        flashing_lock = LightPulse(color, short_pause, long_pause, on_pause)
-        flashing_lock.start()
 
-class LightPulse(threading.Thread):
+    def __init__(self):
+        self.changed = False
+        self._watch = StopWatch()
+        self._event = None
+        if hasattr(threading, 'Event'):
+            self._event = threading.Event()
 
-    def __init__(self, color, short_pause, long_pause, on_pause):
-        super(LightPulse, self).__init__()
-        self.color = color
-        self.short_pause = short_pause
-        self.long_pause = long_pause
-        self.on_pause = on_pause
-        self.stop = False
+    def set(self):
+        self.changed = True
+        if self._event is not None:
+            self._event.set()
 
-    def run(self):
-        while not self.stop:
-            brick.light(self.color)
-            wait(self.on_pause)
-            if self.stop:
-                return
-            brick.light(None)
-            wait(self.short_pause)
-            if self.stop:
-                return
-            brick.light(self.color)
-            wait(self.on_pause)
-            if self.stop:
+    def sleep(self, duration):
+        if self._event is not None:
+            if duration is None:
+                self._event.wait()
+            else:
+                self._event.wait(max(0, duration) / 1000)
+            self._event.clear()
+            return
+        end = None
+        if duration is not None:
+            end = self._watch.time() + duration
+        while not self.changed:
+            if end is None:
+                wait(_SLICE)
+                continue
+            remaining = end - self._watch.time()
+            if remaining <= 0:
                 return
-            brick.light(None)
-            wait(self.long_pause)
+            wait(min(remaining, _SLICE))
 
-    def kill(self):
-        self.stop = True
+class LightPattern():
+    """Keyframed brick light animation
+
+    Each frame is a color (None for off) and how long (milliseconds) to show it
+    for, a duration of None holds the frame forever. Shorter durations than 1
+    millisecond are raised to 1 millisecond.
+
+    :param frames: Frames in the form (color, duration)
+    :type frames: list, tuple
+    :param repeat: Whether to loop the frames, defaults to True
+    :type repeat: bool, optional
+    """
+
+    def __init__(self, frames, repeat=True):
+        """
+        Initiate the LightPattern Object
+        """
+        self.frames = tuple((color, None if duration is None else max(1, duration))
+                            for color, duration in frames)
+        self.repeat = repeat
+        self.cycle = None
+        if repeat and len(self.frames) > 0:
+            self.cycle = 0
+            for _, duration in self.frames:
+                if duration is None:
+                    self.cycle = None
+                    break
+                self.cycle += duration
+
+    @staticmethod
+    def pulse(color, short_pause=200, long_pause=800, on_pause=100):
+        """Creates a double pulse of a color
+
+        :param color: Color of the light
+        :type color: Color
+        :param short_pause: Duration of the short pause, defaults to 200
+        :type short_pause: int, optional
+        :param long_pause: Duration of the long pause, defaults to 800
+        :type long_pause: int, optional
+        :param on_pause: Duration of the light flashing on, defaults to 100
+        :type on_pause: int, optional
+        :return: Pulse pattern
+        :rtype: LightPattern
+        """
+        return LightPattern(((color, on_pause), (None, short_pause),
+                             (color, on_pause), (None, long_pause)))
+
+    @staticmethod
+    def flash(color, off_pause=500, on_pause=500):
+        """Creates an even flash of a color
+
+        :param color: Color of the light
+        :type color: Color
+        :param off_pause: Duration of the off pause, defaults to 500
+        :type off_pause: int, optional
+        :param on_pause: Duration of the on pause, defaults to 500
+        :type on_pause: int, optional
+        :return: Flash pattern
+        :rtype: LightPattern
+        """
+        return LightPattern(((color, on_pause), (None, off_pause)))
+
+    @staticmethod
+    def solid(color, duration=_FOREVER):
+        """Creates a single steady color
+
+        :param color: Color of the light
+        :type color: Color
+        :param duration: Time to show the color for, None for forever, defaults to None
+        :type duration: int, optional
+        :return: Solid pattern
+        :rtype: LightPattern
+        """
+        return LightPattern(((color, duration),), repeat=False)
+
+class _Playing():
 
-class LightFlash(threading.Thread):
+    def __init__(self, pattern, now):
+        self.pattern = pattern
+        self.index = 0
+        self.started = now
 
-    def __init__(self, color, off_pause, on_pause):
-        super().__init__()
-        self.color = color
-        self.off_pause = off_pause
-        self.on_pause = on_pause
+    def color(self):
+        return self.pattern.frames[self.index][0]
+
+    def deadline(self):
+        duration = self.pattern.frames[self.index][1]
+        if duration is None:
+            return None
+        return self.started + duration
+
+    def skip(self, now):
+        """
+        Skips whole cycles of a repeating pattern that has fallen more than a cycle behind
+        """
+        cycle = self.pattern.cycle
+        if cycle is not None and self.index == 0 and now - self.started > cycle:
+            self.started += (now - self.started) // cycle * cycle - cycle
+
+    def advance(self):
+        """
+        Moves to the next frame, returning False once a non repeating pattern has ended
+        """
+        self.started = self.deadline()
+        self.index += 1
+        if self.index >= len(self.pattern.frames):
+            if not self.pattern.repeat:
+                return False
+            self.index = 0
+        return True
+
+class LightScheduler(threading.Thread):
+    """Single background thread that plays light patterns
+
+    Patterns are played at a priority and the highest priority pattern is shown.
+    Hidden patterns keep time, so when a non repeating pattern ends the next
+    highest carries on in step. The thread only wakes when a frame ends or the
+    patterns change (where threading.Event is missing it checks for changes
+    every 20 milliseconds), and switching patterns never starts a new thread.
+    """
+
+    def __init__(self):
+        """
+        Initiate the LightScheduler Object
+        """
+        super(LightScheduler, self).__init__()
         self.stop = False
+        self._patterns = {}
+        self._lock = threading.Lock()
+        self._watch = StopWatch()
+        self._wakeup = _Wakeup()
+        self._shown = False
+        self._color = None
+
+    def play(self, pattern, priority=0):
+        """Plays a pattern, replacing any pattern playing at the same priority
+
+        :param pattern: Pattern to play
+        :type pattern: LightPattern
+        :param priority: Priority of the pattern, higher priorities are shown first, defaults to 0
+        :type priority: int, optional
+        """
+        with self._lock:
+            if len(pattern.frames) == 0:
+                self._patterns.pop(priority, None)
+            else:
+                self._patterns[priority] = _Playing(pattern, self._watch.time())
+        self._wakeup.set()
+
+    def cancel(self, priority=None):
+        """Stops playing a pattern
+
+        :param priority: Priority of the pattern to stop, None stops every pattern,
+                         defaults to None
+        :type priority: int, optional
+        """
+        with self._lock:
+            if priority is None:
+                self._patterns = {}
+            else:
+                self._patterns.pop(priority, None)
+        self._wakeup.set()
+
+    def show(self, color):
+        """Stops playing every pattern and shows a steady color
+
+        :param color: Color of the light, None for off
+        :type color: Color
+        """
+        with self._lock:
+            self._patterns = {}
+            self._shown = False
+            brick.light(color)
+        self._wakeup.set()
 
     def run(self):
         while not self.stop:
-            brick.light(self.color)
-            wait(self.on_pause)
-            if self.stop:
-                return
-            brick.light(None)
-            wait(self.off_pause)
+            with self._lock:
+                self._wakeup.changed = False
+                now = self._watch.time()
+                playing = None
+                for priority in sorted(self._patterns, reverse=True):
+                    current = self._patterns[priority]
+                    while current.deadline() is not None and current.deadline() <= now:
+                        if not current.advance():
+                            del self._patterns[priority]
+                            current = None
+                            break
+                        current.skip(now)
+                    if current is not None:
+                        playing = current
+                        break
+                deadline = None
+                if playing is not None:
+                    deadline = playing.deadline()
+                    if not self._shown or playing.color() != self._color:
+                        self._color = playing.color()
+                        brick.light(self._color)
+                        self._shown = True
+                elif self._shown:
+                    brick.light(None)
+                    self._shown = False
+            if deadline is None:
+                self._wakeup.sleep(None)
+            else:
+                self._wakeup.sleep(deadline - self._watch.time())
 
     def kill(self):
         self.stop = True
+        self._wakeup.set()
+
+_scheduler = None
+
+def lights():
+    """Gets the shared light scheduler, starting it if needed
+
+    :return: Running light scheduler
+    :rtype: LightScheduler
+    """
+    global _scheduler
+    if _scheduler is None or _scheduler.stop:
+        _scheduler = LightScheduler()
+        _scheduler.start()
+    return _scheduler
+
+def light_pulse(color, short_pause=200, long_pause=800, on_pause=100):
+    """Set the brick light to pulse a color
+
+    :param color: Color of the light
+    :type color: ColorExt
+    :param short_pause: Duration of the short pause, defaults to 200
+    :type short_pause: int, optional
+    :param long_pause: Duration of the long pause, defaults to 800
+    :type long_pause: int, optional
+    :param on_pause: Duration of the light flashing on, defaults to 100
+    :type on_pause: int, optional
+    """
+    if color is None or ColorExt.compare(color, Color.BLACK):
+        light(None)
+    else:
+        lights().play(LightPattern.pulse(color, short_pause, long_pause, on_pause))
 
 def light_flash(color, off_pause=500, on_pause=500):
     """Set the brick light to flash a color
@@ -91,29 +301,235 @@ def light_flash(color, off_pause=500, on_pause=500):
     :param on_pause: Duration of the on puase, defaults to 500
     :type on_pause: int, optional
     """
-    global flashing_lock
-    if isinstance(flashing_lock, LightPulse):
-        flashing_lock.kill()
-        flashing_lock = None
-    flashing_lock = LightFlash(color, off_pause, on_pause)
-    flashing_lock.start()
+    lights().play(LightPattern.flash(color, off_pause, on_pause))
 
 def light(color):
-    global flashing_lock
-    if isinstance(flashing_lock, (LightPulse, LightFlash)):
-        flashing_lock.kill()
-        flashing_lock = None
-    brick.light(color)
+    if _scheduler is None:
+        brick.light(color)
+    else:
+        _scheduler.show(color)
 
 def buttons():
     return brick.buttons()
 
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+
+class _SoundJob():
+
+    def __init__(self, kind, args, priority, sequence):
+        self.kind = kind
+        self.args = args
+        self.priority = priority
+        self.sequence = sequence
+
+    def play(self, cache):
+        if self.kind == 'file':
+            path = sound_path(self.args[0])
+            if cache is not None:
+                path = cache.path(path)
+            brick.sound.file(path, *self.args[1:])
+        else:
+            getattr(brick.sound, self.kind)(*self.args)
+
+class SoundQueue(threading.Thread):
+    """Single background thread that plays sounds from a bounded priority queue
+
+    Higher priority sounds are played first and sounds of the same priority are
+    played in the order they were queued. Submitting never blocks: when the queue
+    is full the new sound replaces the oldest sound of the lowest priority if that
+    is lower than its own, otherwise the policy decides which sound is dropped.
+    With coalescing on, a sound identical to one still waiting isn't queued again.
+    A sound that fails to play (e.g. a missing file) is counted in failed, with the
+    last error kept in error, and the queue carries on with the next sound.
+
+    :param size: Maximum number of waiting sounds, defaults to 8
+    :type size: int, optional
+    :param policy: What to drop when the queue is full and the new sound doesn't outrank
+                   anything, DROP_NEWEST or DROP_OLDEST, defaults to DROP_NEWEST
+    :type policy: str, optional
+    :param coalesce: Whether to skip sounds identical to one already waiting, defaults to True
+    :type coalesce: bool, optional
+    :param cache: Cache to play sound files from, defaults to None
+    :type cache: SoundCache, optional
+    """
+
+    def __init__(self, size=8, policy=DROP_NEWEST, coalesce=True, cache=None):
+        """
+        Initiate the SoundQueue Object
+        """
+        super(SoundQueue, self).__init__()
+        self.size = max(1, size)
+        self.policy = policy
+        self.coalesce = coalesce
+        self.cache = cache
+        self.stop = False
+        self.dropped = 0
+        self.failed = 0
+        self.error = None
+        self._jobs = []
+        self._sequence = 0
+        self._playing = None
+        self._lock = threading.Lock()
+        self._wakeup = _Wakeup()
+
+    def submit(self, kind, args=(), priority=0):
+        """Queues a sound without waiting for it to play
+
+        :param kind: Name of the brick.sound method to call ('beep', 'beeps' or 'file')
+        :type kind: str
+        :param args: Arguments passed to the method, defaults to ()
+        :type args: tuple, optional
+        :param priority: Priority of the sound, higher priorities are played first, defaults to 0
+        :type priority: int, optional
+        :return: Whether the sound was queued (or an identical sound is already waiting)
+        :rtype: bool
+        """
+        args = tuple(args)
+        with self._lock:
+            if self.coalesce:
+                for job in self._jobs:
+                    if job.kind == kind and job.args == args:
+                        job.priority = max(job.priority, priority)
+                        self._jobs.sort(key=_job_order)
+                        return True
+            if len(self._jobs) >= self.size:
+                lowest = self._jobs[-1].priority
+                if lowest < priority:
+                    index = self._first_of(lowest)
+                elif self.policy == DROP_OLDEST:
+                    index = self._first_of(lowest)
+                else:
+                    self.dropped += 1
+                    return False
+                del self._jobs[index]
+                self.dropped += 1
+            self._sequence += 1
+            self._jobs.append(_SoundJob(kind, args, priority, self._sequence))
+            self._jobs.sort(key=_job_order)
+        self._wakeup.set()
+        return True
+
+    def _first_of(self, priority):
+        for index, job in enumerate(self._jobs):
+            if job.priority == priority:
+                return index
+        return len(self._jobs) - 1
+
+    def cancel(self, kind=None, priority=None):
+        """Removes waiting sounds, the sound currently playing is left to finish
+
+        :param kind: Only remove sounds of this kind ('beep', 'beeps' or 'file'), defaults to None
+        :type kind: str, optional
+        :param priority: Only remove sounds of this priority, defaults to None
+        :type priority: int, optional
+        :return: Number of sounds removed
+        :rtype: int
+        """
+        with self._lock:
+            kept = [job for job in self._jobs
+                    if (kind is not None and job.kind != kind)
+                    or (priority is not None and job.priority != priority)]
+            removed = len(self._jobs) - len(kept)
+            self._jobs = kept
+        return removed
+
+    def flush(self, timeout=None):
+        """Waits until every queued sound has played
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+        :type timeout: int, optional
+        :return: True if the queue emptied, False if the timeout expired
+        :rtype: bool
+        """
+        watch = StopWatch()
+        while self.pending() > 0:
+            if timeout is not None and watch.time() >= timeout:
+                return False
+            wait(_SLICE)
+        return True
+
+    def pending(self):
+        """Gets the number of sounds waiting or playing
+
+        :return: Number of sounds
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._jobs) + (self._playing is not None)
+
+    def run(self):
+        while not self.stop:
+            with self._lock:
+                self._wakeup.changed = False
+                job = None
+                if len(self._jobs) > 0:
+                    job = self._jobs.pop(0)
+                self._playing = job
+            if job is None:
+                self._wakeup.sleep(None)
+                continue
+            try:
+                job.play(self.cache)
+            except Exception as error:
+                self.failed += 1
+                self.error = error
+            finally:
+                with self._lock:
+                    self._playing = None
+
+    def kill(self):
+        self.stop = True
+        self._wakeup.set()
+
+def _job_order(job):
+    return (-job.priority, job.sequence)
+
 class SpeakerExt():
     """
     Extension class for the Speaker Object
+
+    Sounds played without waiting go through a single shared SoundQueue, and
+    sound files are played from the SoundCache once they have been preloaded
     """
 
-    def beep(self, frequency=500, duration=100, volume=30, wait=False):
+    def __init__(self):
+        """
+        Initiate the SpeakerExt Object
+        """
+        self._queue = None
+        self.cache = None
+
+    def preload(self, *file_names, max_bytes=1 << 20):
+        """Loads sound files into memory so that they play without reading the SD card
+
+        Files are loaded most important first, once the cache is full the least
+        recently played files make room for new ones
+
+        :param max_bytes: Maximum total size (bytes) of the cached files, only used when
+                          the cache is created, defaults to 1 MiB
+        :type max_bytes: int, optional
+        :return: Number of files that fit in the cache
+        :rtype: int
+        """
+        if self.cache is None:
+            self.cache = SoundCache(max_bytes)
+            if self._queue is not None:
+                self._queue.cache = self.cache
+        return self.cache.preload(*file_names)
+
+    def queue(self):
+        """Gets the sound queue, starting it if needed
+
+        :return: Running sound queue
+        :rtype: SoundQueue
+        """
+        if self._queue is None or self._queue.stop:
+            self._queue = SoundQueue(cache=self.cache)
+            self._queue.start()
+        return self._queue
+
+    def beep(self, frequency=500, duration=100, volume=30, wait=False, priority=0):
         """Play a beep/tone
 
         :param frequency: Frequency of the beep, defaults to 500
@@ -124,29 +540,34 @@ class SpeakerExt():
         :type volume: int, optional
         :param wait: Whether to wait for the beep to finish before continuing, defaults to False
         :type wait: bool, optional
+        :param priority: Priority in the sound queue when not waiting, defaults to 0
+        :type priority: int, optional
+        :return: Whether the beep was played or queued
+        :rtype: bool
         """
         if wait:
-            brick.sound.beep(frequency=frequency, duration=duration, volume=volume)
-        else:
-            threading.Thread(target=brick.sound.beep, kwargs={
-                "frequency": frequency,
-                "duration": duration,
-                "volume": volume})
+            brick.sound.beep(frequency, duration, volume)
+            return True
+        return self.queue().submit('beep', (frequency, duration, volume), priority)
 
-    def beeps(self, number, wait=False):
+    def beeps(self, number, wait=False, priority=0):
         """Play a number of default beeps with a brief pause in between
 
         :param number: Number of beeps
         :type number: int
         :param wait: Whether to wait for the beeps to finish before continuing, defaults to False
         :type wait: bool, optional
+        :param priority: Priority in the sound queue when not waiting, defaults to 0
+        :type priority: int, optional
+        :return: Whether the beeps were played or queued
+        :rtype: bool
         """
         if wait:
             brick.sound.beeps(number)
-        else:
-            threading.Thread(target=brick.sound.beeps, args=(number))
+            return True
+        return self.queue().submit('beeps', (number,), priority)
 
-    def file(self, file_name, volume=100, wait=False):
+    def file(self, file_name, volume=100, wait=False, priority=0):
         """Play a sound file
 
         :param file_name: Path to the sound file, including extension
@@ -155,12 +576,93 @@ class SpeakerExt():
         :type volume: int, optional
         :param wait: Whether to wait for the sound to finish before continuing, defaults to False
         :type wait: bool, optional
+        :param priority: Priority in the sound queue when not waiting, defaults to 0
+        :type priority: int, optional
+        :return: Whether the sound was played or queued
+        :rtype: bool
         """
         if wait:
-            brick.sound.file(file_name, volume=volume)
-        else:
-            threading.Thread(target=brick.sound.file, args=(file_name), kwargs={"volume": volume})
+            _SoundJob('file', (file_name, volume), priority, 0).play(self.cache)
+            return True
+        return self.queue().submit('file', (sound_path(file_name), volume), priority)
+
+    def cancel(self):
+        """
+        Removes every sound waiting in the queue
+        """
+        if self._queue is not None:
+            self._queue.cancel()
+
+    def flush(self, timeout=None):
+        """Waits until every queued sound has played
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+        :type timeout: int, optional
+        :return: True if the queue emptied, False if the timeout expired
+        :rtype: bool
+        """
+        if self._queue is None:
+            return True
+        return self._queue.flush(timeout)
+
+class DisplayExt():
+    """
+    Extension class for the Display Object
+
+    Drawing through canvas composites into an off-screen buffer and only the
+    rows that changed are written to the screen, the other methods draw straight
+    to the screen the same as the core Lego functions
+    """
+
+    def __init__(self):
+        """
+        Initiate the DisplayExt Object
+        """
+        self.images = ImageCache()
+        self._canvas = None
+
+    def clear(self):
+        """
+        Clears everything on the display
+        """
+        brick.display.clear()
+
+    def text(self, text, coordinate=None):
+        """Display text
+
+        :param text: The text to display
+        :type text: str
+        :param coordinate: (x, y) coordinate of the left top of the text, defaults to
+                           the line below the previous text
+        :type coordinate: tuple, optional
+        """
+        brick.display.text(text, coordinate)
+
+    def image(self, file_name, alignment=Align.CENTER, coordinate=None, clear=True):
+        """Show an image file
+
+        :param file_name: Path to the image file, including extension
+        :type file_name: ImageFileExt, ImageFile, str
+        :param alignment: Where to place the image, defaults to Align.CENTER
+        :type alignment: Align, optional
+        :param coordinate: (x, y) coordinate of the left top of the image, used instead of
+                           alignment, defaults to None
+        :type coordinate: tuple, optional
+        :param clear: Whether to clear the display before showing the image, defaults to True
+        :type clear: bool, optional
+        """
+        brick.display.image(image_path(file_name), alignment, coordinate, clear)
+
+    def canvas(self):
+        """Gets the off-screen canvas of the display, creating it if needed
+
+        :return: Canvas that draws to the LCD
+        :rtype: Canvas
+        """
+        if self._canvas is None:
+            self._canvas = Canvas(cache=self.images)
+        return self._canvas
 
 sound = SpeakerExt()
-display = brick.display
+display = DisplayExt()
 battery = brick.battery
\ No newline at end of file
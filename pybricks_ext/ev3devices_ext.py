@@ -1,23 +1,68 @@
-from operator import eq, ge, gt, le, lt, ne
-
 from pybricks.ev3devices import (ColorSensor, GyroSensor, InfraredSensor,
                                  Motor, TouchSensor, UltrasonicSensor)
 from pybricks.parameters import Stop, Direction
-from pybricks.tools import wait, StopWatch
-
-from parameters_ext import ColorExt
+from pybricks.tools import StopWatch
+
+from async_util import until, until_all, until_bumped
+from beacon_util import BeaconTracker
+from heading_util import HeadingEstimator
+from motion_util import run_profile, s_curve, trapezoidal
+from parameters_ext import ColorExt, ColorSet
+from sample_util import SampledExt
 from speed_util import get_ratio, speed_deg
-
-def _operator_calc(val_a, val_b, operator):
-    operators = {'>': gt,
-                 '<': lt,
-                 '>=': ge,
-                 '<=': le,
-                 '==': eq,
-                 '!=': ne}
-    return operators[operator](val_a, val_b)
-
-class MotorExt(Motor):
+from wait_util import Condition, wait_all, wait_until
+
+def _color_in(reading, colors):
+    return reading in colors
+
+def _color_not_in(reading, colors):
+    return reading not in colors
+
+def _any_pressed(pressed, buttons):
+    for button in buttons:
+        if button in pressed:
+            return True
+    return False
+
+def _any_released(pressed, buttons):
+    for button in buttons:
+        if button not in pressed:
+            return True
+    return False
+
+def _button_tuple(button):
+    if isinstance(button, (list, tuple, dict)):
+        return tuple(button)
+    return (button,)
+
+def _first(values):
+    return values[0]
+
+def _second(values):
+    return values[1]
+
+def _rotations(value):
+    return value / 360
+
+def _bearing(angle):
+    return angle % 360
+
+def _int_hue(red, green, blue, high):
+    diff = high - min(red, green, blue)
+    if diff == 0:
+        return 0
+    if high == red:
+        return ((120 * (green - blue) + diff) // (2 * diff)) % 360
+    if high == green:
+        return (120 + (120 * (blue - red) + diff) // (2 * diff)) % 360
+    return (240 + (120 * (red - green) + diff) // (2 * diff)) % 360
+
+def _int_saturation(red, green, blue, high):
+    if high == 0:
+        return 0
+    return (200 * (high - min(red, green, blue)) + high) // (2 * high)
+
+class MotorExt(Motor, SampledExt):
     """
     Extension class for the Motor device with useful functions
     mainly relating to speed and specific gear targeting
@@ -37,6 +82,8 @@ class MotorExt(Motor):
     :param rpm: RPM of the Motor, defaults to 240
     :type rpm: int, optional
     """
+
+    sample_reading = 'angle'
     
     def __init__(self, port, direction=Direction.CLOCKWISE, gears=None, rpm=240):
         """
@@ -46,6 +93,41 @@ class MotorExt(Motor):
         self.rpm = 240
         if isinstance(rpm, int):
             self.rpm = abs(rpm)
+        self.invalidate_ratios()
+
+    def invalidate_ratios(self):
+        """Recalculates the cached gear ratios of the linked gears
+
+        The ratio for every depth of the gear train is calculated once and looked
+        up by the output methods, this must be called if the gears are reassigned.
+        Gear trains that can't be calculated are left to speed_util.get_ratio
+        """
+        gears = self.gears
+        try:
+            ratios = ()
+            if isinstance(gears, (list, tuple)):
+                ratios = tuple(get_ratio(gears, depth=depth) for depth in range(len(gears)))
+            self._default_ratio = get_ratio(gears)
+            self._ratios = ratios
+        except ZeroDivisionError:
+            self._default_ratio = None
+            self._ratios = None
+
+    def output_ratio(self, depth=None):
+        """
+        Get the cached gear ratio of the motor to its linked gears
+
+        :param depth: Depth of the gear in the link to get the ratio for, defaults to None
+        :type depth: int, optional
+        :return: Gear ratio
+        :rtype: int, float
+        """
+        ratios = self._ratios
+        if ratios is None:
+            return get_ratio(self.gears, depth=depth)
+        if isinstance(depth, int) and 0 <= depth < len(ratios):
+            return ratios[depth]
+        return self._default_ratio
 
     def output_angle(self, depth=None):
         """
@@ -57,7 +139,7 @@ class MotorExt(Motor):
         :return: Motor angle
         :rttype: int, float
         """
-        return super(MotorExt, self).angle() * get_ratio(self.gears, depth=depth)
+        return super(MotorExt, self).angle() * self.output_ratio(depth)
 
     def output_speed(self, depth=None):
         """
@@ -68,7 +150,7 @@ class MotorExt(Motor):
         :return: Rotational speed in deg/s
         :rtype: int, float
         """
-        return super(MotorExt, self).speed() * get_ratio(self.gears, depth=depth)
+        return super(MotorExt, self).speed() * self.output_ratio(depth)
 
     def output_run(self, speed, depth=None):
         """
@@ -81,7 +163,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             super(MotorExt, self).run(speed)
-        super(MotorExt, self).run(speed / get_ratio(self.gears, depth=depth))
+        super(MotorExt, self).run(speed / self.output_ratio(depth))
 
     def output_percent_run(self, speed, depth=None):
         """Keep the motor or linked gears running at a constant speed (percentage)
@@ -93,7 +175,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             self.percent_run(speed)
-        super(MotorExt, self).run(speed_deg(speed, rpm=self.rpm) / get_ratio(self.gears, depth=depth))
+        super(MotorExt, self).run(speed_deg(speed, rpm=self.rpm) / self.output_ratio(depth))
 
     def percent_run(self, speed):
         """Keep the motor running at a constant speed (percentage)
@@ -122,7 +204,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             super(MotorExt, self).run_time(speed, time, stop_type=stop_type, wait=wait)
-        super(MotorExt, self).run_time(speed / get_ratio(self.gears, depth=depth),
+        super(MotorExt, self).run_time(speed / self.output_ratio(depth),
                                        time,
                                        stop_type=stop_type,
                                        wait=wait)
@@ -147,7 +229,7 @@ class MotorExt(Motor):
         if depth is None:
             self.percent_run_time(speed, time, stop_type=stop_type, wait=wait)
         super(MotorExt, self).run_time(
-            speed_deg(speed, rpm=self.rpm) / get_ratio(self.gears, depth=depth),
+            speed_deg(speed, rpm=self.rpm) / self.output_ratio(depth),
             time, stop_type=stop_type, wait=wait)
 
     def percent_run_time(self, speed, time, stop_type=Stop.COAST, wait=True):
@@ -186,7 +268,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             super(MotorExt, self).run_angle(speed, rotation_angle, stop_type=stop_type, wait=wait)
-        ratio = get_ratio(self.gears, depth=depth)
+        ratio = self.output_ratio(depth)
         super(MotorExt, self).run_angle(speed / ratio,
                                         rotation_angle / ratio,
                                         stop_type=stop_type,
@@ -212,7 +294,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             self.percent_run_angle(speed, rotation_angle, stop_type=stop_type, wait=wait)
-        ratio = get_ratio(self.gears, depth=depth)
+        ratio = self.output_ratio(depth)
         super(MotorExt, self).run_angle(speed_deg(speed, rpm=self.rpm) / ratio,
                                         rotation_angle / ratio, stop_type=stop_type, wait=wait)
 
@@ -254,7 +336,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             super(MotorExt, self).run_target(speed, target_angle, stop_type=stop_type, wait=wait)
-        ratio = get_ratio(self.gears, depth=depth)
+        ratio = self.output_ratio(depth)
         super(MotorExt, self).run_target(speed / ratio, target_angle / ratio,
                                          stop_type=stop_type, wait=wait)
 
@@ -279,7 +361,7 @@ class MotorExt(Motor):
         """
         if depth is None:
             self.percent_run_target(speed, target_angle, stop_type=stop_type, wait=wait)
-        ratio = get_ratio(self.gears, depth=depth)
+        ratio = self.output_ratio(depth)
         super(MotorExt, self).run_target(speed_deg(speed, rpm=self.rpm) / ratio,
                                          target_angle / ratio, stop_type=stop_type, wait=wait)
 
@@ -318,7 +400,7 @@ class MotorExt(Motor):
         if depth is None:
             super(MotorExt, self).run_until_stalled(speed, stop_type=stop_type,
                                                     duty_limit=duty_limit)
-        super(MotorExt, self).run_until_stalled(speed / get_ratio(self.gears, depth=depth),
+        super(MotorExt, self).run_until_stalled(speed / self.output_ratio(depth),
                                                 stop_type=stop_type, duty_limit=duty_limit)
 
     def output_percent_run_until_stalled(self, speed, stop_type=Stop.COAST,
@@ -339,7 +421,7 @@ class MotorExt(Motor):
             self.percent_run_until_stalled(speed, stop_type=stop_type,
                                            duty_limit=duty_limit)
         super(MotorExt, self).run_until_stalled(
-            speed_deg(speed, rpm=self.rpm) * get_ratio(self.gears, depth=depth),
+            speed_deg(speed, rpm=self.rpm) * self.output_ratio(depth),
             stop_type=stop_type, duty_limit=duty_limit)
 
     def percent_run_until_stalled(self, speed, stop_type=Stop.COAST, duty_limit=100):
@@ -356,35 +438,400 @@ class MotorExt(Motor):
         super(MotorExt, self).run_until_stalled(speed_deg(speed, rpm=self.rpm),
                                                 stop_type=stop_type, duty_limit=duty_limit)
 
-    def wait_until_motor_stop(self):
+    def output_profile(self, speed, rotation_angle, acceleration, jerk=None,
+                       period=10, depth=None):
+        """Precompute an acceleration limited velocity profile for the motor or linked gears
+
+        The profile is built in output gear units, with the speed limited to the top
+        speed of the motor (rpm) at that gear, and returned in motor units ready to run.
+        A trapezoidal profile is used unless a jerk is given, then an S-curve is used.
+
+        :param speed: Maximum speed (deg/s) of the Motor or Gear
+        :type speed: int, float
+        :param rotation_angle: Angle (degrees) by which the Motor or Gear should run
+        :type rotation_angle: int, float
+        :param acceleration: Acceleration (deg/s/s) of the Motor or Gear
+        :type acceleration: int, float
+        :param jerk: Jerk (deg/s/s/s) of the Motor or Gear, defaults to None
+        :type jerk: int, float, optional
+        :param period: Control period (milliseconds), defaults to 10
+        :type period: int, optional
+        :param depth: Depth of the gear in the link to set the speed for, defaults to None
+        :type depth: int, optional
+        :return: Velocity profile in motor units
+        :rtype: MotionProfile
         """
-        Waits until the motor stops
+        ratio = self.output_ratio(depth)
+        speed = min(abs(speed), abs(speed_deg(100, rpm=self.rpm) * ratio))
+        if jerk is None:
+            profile = trapezoidal(rotation_angle, speed, acceleration, period=period)
+        else:
+            profile = s_curve(rotation_angle, speed, acceleration, jerk, period=period)
+        return profile.scaled(1 / ratio)
+
+    def run_profile(self, profile, stop_type=Stop.COAST):
+        """Run a precomputed velocity profile then stop the motor
+
+        :param profile: Velocity profile in motor units
+        :type profile: MotionProfile
+        :param stop_type: Whether to coast, brake, or hold after coming to a standstill,
+                          defaults to Stop.COAST
+        :type stop_type: Stop, optional
+        """
+        run_profile(self, profile)
+        super(MotorExt, self).stop(stop_type)
+
+    def output_profile_run_angle(self, speed, rotation_angle, acceleration, jerk=None,
+                                 stop_type=Stop.COAST, period=10, depth=None):
+        """Run the motor or linked gears by a specified amount of degrees using an
+        acceleration limited (trapezoidal or S-curve) velocity profile
+
+        :param speed: Maximum speed (deg/s) of the Motor or Gear
+        :type speed: int, float
+        :param rotation_angle: Angle (degrees) by which the Motor or Gear should run
+        :type rotation_angle: int, float
+        :param acceleration: Acceleration (deg/s/s) of the Motor or Gear
+        :type acceleration: int, float
+        :param jerk: Jerk (deg/s/s/s) of the Motor or Gear, uses a trapezoidal profile
+                     if None, defaults to None
+        :type jerk: int, float, optional
+        :param stop_type: Whether to coast, brake, or hold after coming to a standstill,
+                          defaults to Stop.COAST
+        :type stop_type: Stop, optional
+        :param period: Control period (milliseconds), defaults to 10
+        :type period: int, optional
+        :param depth: Depth of the gear in the link to set the speed for, defaults to None
+        :type depth: int, optional
         """
-        while super(MotorExt, self).speed() != 0:
-            wait(10)
-        return
+        self.run_profile(self.output_profile(speed, rotation_angle, acceleration, jerk=jerk,
+                                             period=period, depth=depth),
+                         stop_type=stop_type)
 
-    def wait_until_motor_start(self):
+    def wait_until_motor_stop(self, timeout=None):
+        """Waits until the motor stops
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
+        """
+        return wait_until(Condition(self, 'speed', '==', 0), timeout=timeout)
+
+    def wait_until_motor_stop_async(self, timeout=None):
+        """Waits until the motor stops
+
+        Awaitable version of wait_until_motor_stop that doesn't block other tasks, see async_util
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        Waits until the motor starts
+        return until(Condition(self, 'speed', '==', 0), timeout=timeout)
+
+    def wait_until_motor_start(self, timeout=None):
+        """Waits until the motor starts
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
+        """
+        return wait_until(Condition(self, 'speed', '!=', 0), timeout=timeout)
+
+    def wait_until_motor_start_async(self, timeout=None):
+        """Waits until the motor starts
+
+        Awaitable version of wait_until_motor_start that doesn't block other tasks, see async_util
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        while super(MotorExt, self).speed() == 0:
-            wait(10)
-        return
+        return until(Condition(self, 'speed', '!=', 0), timeout=timeout)
 
-    def wait_until_motor_speed(self, operator, speed):
+    def wait_until_motor_speed(self, operator, speed, timeout=None):
         """Waits until the motor speed matches certain conditions
 
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param speed: Speed to calculate against (Motor.speed <OP> speed)
         :type speed: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(super(MotorExt, self).speed(), speed, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'speed', operator, speed), timeout=timeout)
+
+    def wait_until_motor_speed_async(self, operator, speed, timeout=None):
+        """Waits until the motor speed matches certain conditions
+
+        Awaitable version of wait_until_motor_speed that doesn't block other tasks, see async_util
 
-class TouchSensorExt(TouchSensor):
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param speed: Speed to calculate against (Motor.speed <OP> speed)
+        :type speed: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'speed', operator, speed), timeout=timeout)
+
+def _per_motor(value, count):
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,) * count
+
+def _angle_reached(progress, target):
+    angle, speed, stalled = progress
+    if stalled or target[1] * (angle - target[0]) >= -target[2]:
+        return True
+    return speed == 0 and abs(angle - target[3]) > target[2]
+
+class MotorGroupExt():
+    """
+    Group of MotorExt objects that are commanded together and share a
+    single poll loop to wait for their maneuvers to complete
+
+    Speeds and angles can be given as a single value for every motor or as a
+    list or tuple with a value for each motor, in the same order as the motors.
+
+    :param motors: Motors in the group
+    :type motors: list, tuple
+    :param depths: Depth of the gear in the link to target for each motor, defaults to None
+    :type depths: int, list, tuple, optional
+    :param tolerance: Angle (motor degrees) from the target to consider a maneuver
+                      complete, defaults to 2
+    :type tolerance: int, float, optional
+    """
+
+    def __init__(self, motors, depths=None, tolerance=2):
+        """
+        Initiate the MotorGroupExt Object
+        """
+        self.motors = tuple(motors)
+        self.depths = _per_motor(depths, len(self.motors))
+        self.tolerance = tolerance
+        self._pending = ()
+
+    def output_ratios(self):
+        """Get the cached gear ratio of each motor to its targeted gear
+
+        :return: Gear ratio for each motor
+        :rtype: tuple
+        """
+        return tuple(motor.output_ratio(depth) for motor, depth in zip(self.motors, self.depths))
+
+    def output_angles(self):
+        """Get the rotation angle of each motor's targeted gear
+
+        :return: Angle for each motor
+        :rtype: tuple
+        """
+        return tuple(motor.output_angle(depth) for motor, depth in zip(self.motors, self.depths))
+
+    def output_run(self, speed):
+        """Keep every motor's targeted gear running at a constant speed
+
+        :param speed: Speed of the Gears
+        :type speed: int, float, list, tuple
+        """
+        ratios = self.output_ratios()
+        speeds = _per_motor(speed, len(self.motors))
+        for index, motor in enumerate(self.motors):
+            Motor.run(motor, speeds[index] / ratios[index])
+        self._pending = ()
+
+    def percent_run(self, speed):
+        """Keep every motor running at a constant speed (percentage)
+
+        :param speed: Speed of the Motors (percentage)
+        :type speed: int, float, list, tuple
+        """
+        speeds = _per_motor(speed, len(self.motors))
+        for index, motor in enumerate(self.motors):
+            Motor.run(motor, speed_deg(speeds[index], rpm=motor.rpm))
+        self._pending = ()
+
+    def output_run_time(self, speed, time, stop_type=Stop.COAST, wait=True):
+        """Keep every motor's targeted gear running at a constant speed for a
+        specified amount of time
+
+        :param speed: Speed of the Gears
+        :type speed: int, float, list, tuple
+        :param time: Duration (milliseconds) of the maneuver
+        :type time: int
+        :param stop_type: Whether to coast, brake or hold after coming to a stand still,
+                          defaults to Stop.COAST
+        :type stop_type: Stop, optional
+        :param wait: Whether to wait for the maneuver to complete before continuing with the rest of
+                     the program, defaults to True
+        :type wait: bool, optional
+        """
+        ratios = self.output_ratios()
+        speeds = _per_motor(speed, len(self.motors))
+        watch = StopWatch()
+        for index, motor in enumerate(self.motors):
+            Motor.run_time(motor, speeds[index] / ratios[index], time,
+                           stop_type=stop_type, wait=False)
+        self._pending = (Condition(watch, 'time', '>=', time),)
+        if wait:
+            self.wait_until_done()
+
+    def output_run_angle(self, speed, rotation_angle, stop_type=Stop.COAST, wait=True, sync=True):
+        """Keep every motor's targeted gear running at a constant speed for a
+        specified amount of degrees
+
+        :param speed: Speed of the Gears
+        :type speed: int, float, list, tuple
+        :param rotation_angle: Angle (degrees) by which the Gears should run
+        :type rotation_angle: int, float, list, tuple
+        :param stop_type: Whether to coast, brake, or hold after coming to a standstill,
+                          defaults to Stop.COAST
+        :type stop_type: Stop, optional
+        :param wait: Whether to wait for the maneuver to complete before continuing with the rest of
+                     the program, defaults to True
+        :type wait: bool, optional
+        :param sync: Whether to scale the speeds down so that every motor finishes at the
+                     same time, defaults to True
+        :type sync: bool, optional
+        """
+        self._run_angles(_per_motor(speed, len(self.motors)),
+                         _per_motor(rotation_angle, len(self.motors)), stop_type, wait, sync)
+
+    def output_run_target(self, speed, target_angle, stop_type=Stop.COAST, wait=True, sync=True):
+        """Keep every motor's targeted gear running at a constant speed towards a
+        specified target degree
+
+        :param speed: Speed of the Gears
+        :type speed: int, float, list, tuple
+        :param target_angle: Target angle that the Gears should rotate to,
+                             regardless of their current angle
+        :type target_angle: int, float, list, tuple
+        :param stop_type: Whether to coast, brake, or hold after coming to a standstill,
+                          defaults to Stop.COAST
+        :type stop_type: Stop, optional
+        :param wait: Whether to wait for the maneuver to complete before continuing with the rest of
+                     the program, defaults to True
+        :type wait: bool, optional
+        :param sync: Whether to scale the speeds down so that every motor finishes at the
+                     same time, defaults to True
+        :type sync: bool, optional
+        """
+        targets = _per_motor(target_angle, len(self.motors))
+        angles = self.output_angles()
+        self._run_angles(_per_motor(speed, len(self.motors)),
+                         tuple(target - angle for target, angle in zip(targets, angles)),
+                         stop_type, wait, sync)
+
+    def _run_angles(self, speeds, rotation_angles, stop_type, wait, sync):
+        speeds = [abs(speed) for speed in speeds]
+        if sync:
+            duration = 0
+            for speed, rotation_angle in zip(speeds, rotation_angles):
+                if speed != 0:
+                    duration = max(duration, abs(rotation_angle) / speed)
+            if duration > 0:
+                speeds = [abs(rotation_angle) / duration if speed != 0 else 0
+                          for speed, rotation_angle in zip(speeds, rotation_angles)]
+        ratios = self.output_ratios()
+        pending = []
+        for index, motor in enumerate(self.motors):
+            ratio = ratios[index]
+            motor_angle = rotation_angles[index] / ratio
+            if speeds[index] == 0 or motor_angle == 0:
+                continue
+            direction = 1 if motor_angle > 0 else -1
+            start = Motor.angle(motor)
+            pending.append(Condition(self, '_progress', _angle_reached,
+                                     (start + motor_angle, direction, self.tolerance, start),
+                                     (motor,)))
+            Motor.run_angle(motor, speeds[index] / abs(ratio), motor_angle,
+                            stop_type=stop_type, wait=False)
+        self._pending = tuple(pending)
+        if wait:
+            self.wait_until_done()
+
+    def stop(self, stop_type=Stop.COAST):
+        """Stop every motor in the group
+
+        :param stop_type: Whether to coast, brake, or hold, defaults to Stop.COAST
+        :type stop_type: Stop, optional
+        """
+        for motor in self.motors:
+            Motor.stop(motor, stop_type)
+        self._pending = ()
+
+    def _progress(self, motor):
+        return (Motor.angle(motor), Motor.speed(motor), Motor.stalled(motor))
+
+    def wait_until_done(self, timeout=None):
+        """Waits until the last maneuver of every motor completes, using a single poll loop
+
+        A motor that stalls, or stops after it started moving, is treated as done so
+        that a blocked motor can't keep the group waiting forever.
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the maneuver completed, False if the timeout expired
+        :rtype: bool
+        """
+        if len(self._pending) == 0:
+            return True
+        return wait_all(self._pending, timeout=timeout)
+
+    def wait_until_done_async(self, timeout=None):
+        """Waits until the last maneuver of every motor completes, using a single poll loop
+
+        Awaitable version of wait_until_done that doesn't block other tasks, see async_util.
+        A motor that stalls, or stops after it started moving, is treated as done
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the maneuver completed, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until_all(self._pending, timeout=timeout)
+
+    def wait_until_motors_stop(self, timeout=None):
+        """Waits until every motor stops, using a single poll loop
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
+        """
+        return wait_all([Condition(motor, 'speed', '==', 0) for motor in self.motors],
+                        timeout=timeout)
+
+    def wait_until_motors_stop_async(self, timeout=None):
+        """Waits until every motor stops, using a single poll loop
+
+        Awaitable version of wait_until_motors_stop that doesn't block other tasks, see async_util
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until_all([Condition(motor, 'speed', '==', 0) for motor in self.motors],
+                         timeout=timeout)
+
+class TouchSensorExt(TouchSensor, SampledExt):
     """
     Extension class for the TouchSensor with helpful
     methods mainly relating to wait functions
@@ -396,21 +843,55 @@ class TouchSensorExt(TouchSensor):
     :type port: Port
     """
 
-    def wait_until_pressed(self):
+    sample_reading = 'pressed'
+
+    def wait_until_pressed(self, timeout=None):
+        """Wait until the TouchSensor is pressed
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        Wait until the TouchSensor is pressed
+        return wait_until(Condition(self, 'pressed', '==', True), timeout=timeout)
+
+    def wait_until_pressed_async(self, timeout=None):
+        """Wait until the TouchSensor is pressed
+
+        Awaitable version of wait_until_pressed that doesn't block other tasks, see async_util
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        while not super(TouchSensorExt, self).pressed():
-            wait(10)
-        return
+        return until(Condition(self, 'pressed', '==', True), timeout=timeout)
 
-    def wait_until_released(self):
+    def wait_until_released(self, timeout=None):
+        """Wait until the TouchSensor is released
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        Wait until the TouchSensor is released
+        return wait_until(Condition(self, 'pressed', '==', False), timeout=timeout)
+
+    def wait_until_released_async(self, timeout=None):
+        """Wait until the TouchSensor is released
+
+        Awaitable version of wait_until_released that doesn't block other tasks, see async_util
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        while super(TouchSensorExt, self).pressed():
-            wait(10)
-        return
+        return until(Condition(self, 'pressed', '==', False), timeout=timeout)
 
     def wait_until_bumped(self, wait_timer=500):
         """Wait until the TouchSensor is bumped
@@ -432,7 +913,20 @@ class TouchSensorExt(TouchSensor):
                 continue
             return
 
-class ColorSensorExt(ColorSensor):
+    def wait_until_bumped_async(self, wait_timer=500):
+        """Wait until the TouchSensor is bumped
+
+        Awaitable version of wait_until_bumped that doesn't block other tasks, see async_util
+
+        :param wait_timer: Time to wait (milliseconds) to consider a press and release a bump,
+                           defaults to 500
+        :type wait_timer: int, float, optional
+        :rtype: coroutine
+        """
+        return until_bumped(Condition(self, 'pressed', '==', True),
+                            Condition(self, 'pressed', '==', False), wait_timer)
+
+class ColorSensorExt(ColorSensor, SampledExt):
     """Extension class for the ColorSensor with helpful methods
 
     Further documentation for the ColorSensor class can be found
@@ -442,80 +936,212 @@ class ColorSensorExt(ColorSensor):
     :type port: Port
     """
 
-    def equals(self, color):
+    sample_reading = 'rgb'
+
+    def equals(self, color, classifier=None):
         """Checks whether the color equals a Color or a set of Colors
 
         See ColorExt for color values
         list, tuple or dict must have values of instance Color
 
         :param color: Color to compare sensor color to
-        :type color: Color, int, float, list, tuple, dict
+        :type color: Color, int, float, list, tuple, dict, ColorSet
+        :param classifier: Calibrated classifier to measure the color with instead of
+                           ColorSensor.color, defaults to None
+        :type classifier: ColorClassifier, optional
         :return: Whether or not the color is equal or is contained
         :rtype: bool
         """
+        if classifier is not None:
+            return ColorExt.compare(color, classifier.classify(self.latest('rgb')))
         return ColorExt.compare(color, super(ColorSensorExt, self).color())
 
-    def wait_until_color_is(self, color):
+    def classify(self, classifier):
+        """Measure the color of a surface using a calibrated classifier
+
+        :param classifier: Calibrated classifier to classify the rgb reading with
+        :type classifier: ColorClassifier
+        :return: Color of the surface, None if no color matches
+        :rtype: Color
+        """
+        return classifier.classify(self.latest('rgb'))
+
+    def wait_until_color_is(self, color, timeout=None, classifier=None):
+        """Waits until the color equals a Color or a set of Colors
+
+        See ColorExt for color values
+        list, tuple or dict must have values of instance Color
+        The colors are compiled into a ColorSet once before waiting
+
+        :param color: Color to compare sensor color to
+        :type color: Color, int, float, list, tuple, dict, ColorSet
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :param classifier: Calibrated classifier to measure the color with instead of
+                           ColorSensor.color, defaults to None
+        :type classifier: ColorClassifier, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
+        """
+        return wait_until(self._color_condition(_color_in, color, classifier), timeout=timeout)
+
+    def wait_until_color_is_async(self, color, timeout=None, classifier=None):
         """Waits until the color equals a Color or a set of Colors
 
         See ColorExt for color values
         list, tuple or dict must have values of instance Color
+        The colors are compiled into a ColorSet once before waiting
+
+        Awaitable version of wait_until_color_is that doesn't block other tasks, see async_util
+
+        :param color: Color to compare sensor color to
+        :type color: Color, int, float, list, tuple, dict, ColorSet
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :param classifier: Calibrated classifier to measure the color with instead of
+                           ColorSensor.color, defaults to None
+        :type classifier: ColorClassifier, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(self._color_condition(_color_in, color, classifier), timeout=timeout)
+
+    def wait_until_color_not(self, color, timeout=None, classifier=None):
+        """Waits until the color does not equal a Color or a set of Colors
+
+        See ColorExt for color values
+        list, tuple or dict must have values of instance Color
+        The colors are compiled into a ColorSet once before waiting
 
         :param color: Color to compare sensor color to
-        :type color: Color, int, float, list, tuple, dict
+        :type color: Color, int, float, list, tuple, dict, ColorSet
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :param classifier: Calibrated classifier to measure the color with instead of
+                           ColorSensor.color, defaults to None
+        :type classifier: ColorClassifier, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not self.equals(color):
-            wait(10)
-        return
+        return wait_until(self._color_condition(_color_not_in, color, classifier),
+                          timeout=timeout)
 
-    def wait_until_color_not(self, color):
+    def wait_until_color_not_async(self, color, timeout=None, classifier=None):
         """Waits until the color does not equal a Color or a set of Colors
 
         See ColorExt for color values
         list, tuple or dict must have values of instance Color
+        The colors are compiled into a ColorSet once before waiting
+
+        Awaitable version of wait_until_color_not that doesn't block other tasks, see async_util
 
         :param color: Color to compare sensor color to
-        :type color: Color, int, float, list, tuple, dict
+        :type color: Color, int, float, list, tuple, dict, ColorSet
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :param classifier: Calibrated classifier to measure the color with instead of
+                           ColorSensor.color, defaults to None
+        :type classifier: ColorClassifier, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(self._color_condition(_color_not_in, color, classifier), timeout=timeout)
+
+    def _color_condition(self, operator, color, classifier):
+        if classifier is None:
+            return Condition(self, 'color', operator, ColorSet(color))
+        return Condition(self, 'rgb', operator, ColorSet(color), transform=classifier.classify)
+
+    def wait_until_ambient(self, operator, ambient, timeout=None):
+        """Waits until the ambient color matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param ambient: Ambient value to calculate against (ColorSensor.ambient <OP> ambient)
+        :type ambient: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while self.equals(color):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'ambient', operator, ambient),
+                          timeout=timeout)
 
-    def wait_until_ambient(self, operator, ambient):
+    def wait_until_ambient_async(self, operator, ambient, timeout=None):
         """Waits until the ambient color matches certain conditions
 
+        Awaitable version of wait_until_ambient that doesn't block other tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param ambient: Ambient value to calculate against (ColorSensor.ambient <OP> ambient)
         :type ambient: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'ambient', operator, ambient), timeout=timeout)
+
+    def wait_until_reflection(self, operator, reflection, timeout=None):
+        """Waits until the reflection color matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param reflection: Reflection value to calculate against
+                           (ColorSensor.reflection <OP> reflection)
+        :type reflection: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(super(ColorSensorExt, self).ambient(), ambient, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'reflection', operator, reflection),
+                          timeout=timeout)
 
-    def wait_until_reflection(self, operator, reflection):
+    def wait_until_reflection_async(self, operator, reflection, timeout=None):
         """Waits until the reflection color matches certain conditions
 
+        Awaitable version of wait_until_reflection that doesn't block other tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param reflection: Reflection value to calculate against
                            (ColorSensor.reflection <OP> reflection)
         :type reflection: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        while not _operator_calc(super(ColorSensorExt, self).reflection(), reflection, operator):
-            wait(10)
-        return
+        return until(Condition(self, 'reflection', operator, reflection), timeout=timeout)
+
+    def _rgb(self):
+        if self._sampled:
+            return self.latest('rgb')
+        return self.rgb()
 
     def rgb_255(self):
         """Measure the reflection of a surface using a red, green, and then a blue light.
 
+        Calculated with integer maths, each value is rounded to the nearest whole number.
+
         :return: Reflection for red, green, and blue light, each ranging from
-                 0.0 (no reflection) to 255.0 (high reflection).
+                 0 (no reflection) to 255 (high reflection).
         :rtype: tuple
         """
-        rgb = super(ColorSensorExt, self).rgb()
-        base = 255 / 100
-        return (base * rgb[0], base * rgb[1], base * rgb[2])
+        rgb = self._rgb()
+        return ((round(rgb[0] * 255) + 50) // 100,
+                (round(rgb[1] * 255) + 50) // 100,
+                (round(rgb[2] * 255) + 50) // 100)
 
     def hex(self):
         """Measure the color of a surface in the form of a hex string
@@ -523,15 +1149,34 @@ class ColorSensorExt(ColorSensor):
         :return: Color measured in hex value
         :rtype: str
         """
-        return '%02x%02x%02x' & self.rgb_255()
+        return '%02x%02x%02x' % self.rgb_255()
 
     def hsv(self):
         """Measure the color of a surface in the form of Hue, Saturation and Value
 
+        Calculated with integer maths, so whole number rgb readings (as the sensor gives)
+        don't allocate any floats. Fractional readings are rounded to whole numbers first.
+        The hue and saturation are within 1 of hsv_float of the rounded reading (rounded
+        to the nearest whole number) and the value is exact.
+
+        :return: Color measured in the form (h, s, v), h from 0 to 359, s and v from 0 to 100
+        :rtype: tuple
+        """
+        rgb = self._rgb()
+        red = round(rgb[0])
+        green = round(rgb[1])
+        blue = round(rgb[2])
+        high = max(red, green, blue)
+        return (_int_hue(red, green, blue, high), _int_saturation(red, green, blue, high), high)
+
+    def hsv_float(self):
+        """Measure the color of a surface in the form of Hue, Saturation and Value
+        using floating point maths
+
         :return: Color measured in the form (h, s, v)
         :rtype: tuple
         """
-        rgb = super(ColorSensorExt, self).rgb()
+        rgb = self._rgb()
         r, g, b = rgb[0] / 100.0, rgb[1] / 100.0, rgb[2] / 100.0
         mx = max(r, g, b)
         mn = min(r, g, b)
@@ -554,12 +1199,32 @@ class ColorSensorExt(ColorSensor):
     def hue(self):
         """Measure the hue of a surface
 
-        :return: Hue of the surface calculated from ColorSensor.rgb()
-        :rtype: int, float
+        Only the hue is calculated, using integer maths (see hsv)
+
+        :return: Hue of the surface calculated from ColorSensor.rgb(), from 0 to 359
+        :rtype: int
+        """
+        rgb = self._rgb()
+        red = round(rgb[0])
+        green = round(rgb[1])
+        blue = round(rgb[2])
+        return _int_hue(red, green, blue, max(red, green, blue))
+
+    def saturation(self):
+        """Measure the saturation of a surface
+
+        Only the saturation is calculated, using integer maths (see hsv)
+
+        :return: Saturation of the surface calculated from ColorSensor.rgb(), from 0 to 100
+        :rtype: int
         """
-        return self.hsv()[0]
+        rgb = self._rgb()
+        red = round(rgb[0])
+        green = round(rgb[1])
+        blue = round(rgb[2])
+        return _int_saturation(red, green, blue, max(red, green, blue))
 
-class InfraredSensorExt(InfraredSensor):
+class InfraredSensorExt(InfraredSensor, SampledExt):
     """Extension class for the InfraredSensor with helpful methods
 
     Further documentation for the InfraredSensor class can be found
@@ -569,6 +1234,13 @@ class InfraredSensorExt(InfraredSensor):
     :type port: Port
     """
 
+    sample_reading = 'distance'
+
+    def _beacon(self, channel):
+        if self._sampled:
+            return self.latest('beacon', (channel,))
+        return self.beacon(channel)
+
     def beacon_distance(self, channel):
         """Measure the relative distance between the remote and the infrared sensor
 
@@ -577,7 +1249,7 @@ class InfraredSensorExt(InfraredSensor):
         :return: Relative distance between the remote and the infrared sensor
         :rtype: int, float
         """
-        return super(InfraredSensorExt, self).beacon(channel)[0]
+        return self._beacon(channel)[0]
 
     def beacon_angle(self, channel):
         """Measure the relative angle to the remote and the infrared sensor
@@ -587,23 +1259,94 @@ class InfraredSensorExt(InfraredSensor):
         :return: Relative angle to the remote and the infrared sensor
         :rtype: int
         """
-        return super(InfraredSensorExt, self).beacon(channel)[1]
+        return self._beacon(channel)[1]
+
+    def beacons(self, channels=(1, 2, 3, 4)):
+        """Measure the relative distance and angle of several remotes, reading each channel once
+
+        :param channels: Channel numbers of the remotes, defaults to (1, 2, 3, 4)
+        :type channels: tuple, list, optional
+        :return: Readings in the form (distance, angle) keyed by channel number
+        :rtype: dict
+        """
+        readings = {}
+        for channel in channels:
+            readings[channel] = self._beacon(channel)
+        return readings
 
-    def wait_until_distance(self, operator, distance):
+    def tracker(self, channels=(1,), alpha=0.5, window=None):
+        """Creates a tracker that smooths the beacon readings of this sensor
+
+        :param channels: Channel numbers of the remotes to track, defaults to (1,)
+        :type channels: tuple, list, int, optional
+        :param alpha: Weight of each new reading (see BeaconTracker), defaults to 0.5
+        :type alpha: float, optional
+        :param window: Number of readings to average over instead, defaults to None
+        :type window: int, optional
+        :return: Beacon tracker
+        :rtype: BeaconTracker
+        """
+        return BeaconTracker(self, channels, alpha, window)
+
+    def wait_until_distance(self, operator, distance, timeout=None):
+        """Waits until the distance matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param distance: Distance value to calculate against (InfraredSensor.distance <OP> distance)
+        :type distance: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
+        """
+        return wait_until(Condition(self, 'distance', operator, distance),
+                          timeout=timeout)
+
+    def wait_until_distance_async(self, operator, distance, timeout=None):
         """Waits until the distance matches certain conditions
 
+        Awaitable version of wait_until_distance that doesn't block other tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param distance: Distance value to calculate against (InfraredSensor.distance <OP> distance)
         :type distance: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'distance', operator, distance), timeout=timeout)
+
+    def wait_until_beacon_distance(self, operator, beacon_distance, channel, timeout=None):
+        """Waits until the beacon distance matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param beacon_distance: Beacon distance value to calculate against
+                                (InfraredSensorExt.beacon_distance <OP> beacon_distance)
+        :type beacon_distance: int, float
+        :param channel: Channel number of the remote
+        :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(super(InfraredSensorExt, self).distance(), distance, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'beacon', operator, beacon_distance,
+                                    args=(channel,), transform=_first),
+                          timeout=timeout)
 
-    def wait_until_beacon_distance(self, operator, beacon_distance, channel):
+    def wait_until_beacon_distance_async(self, operator, beacon_distance, channel, timeout=None):
         """Waits until the beacon distance matches certain conditions
 
+        Awaitable version of wait_until_beacon_distance that doesn't block other
+        tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param beacon_distance: Beacon distance value to calculate against
@@ -611,12 +1354,17 @@ class InfraredSensorExt(InfraredSensor):
         :type beacon_distance: int, float
         :param channel: Channel number of the remote
         :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        while not _operator_calc(self.beacon_distance(channel), beacon_distance, operator):
-            wait(10)
-        return
+        return until(Condition(self, 'beacon', operator, beacon_distance,
+                               args=(channel,), transform=_first),
+                     timeout=timeout)
 
-    def wait_until_beacon_angle(self, operator, beacon_angle, channel):
+    def wait_until_beacon_angle(self, operator, beacon_angle, channel, timeout=None):
         """Waits until the beacon angle matches certain conditions
 
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
@@ -626,50 +1374,111 @@ class InfraredSensorExt(InfraredSensor):
         :type beacon_angle: int, float
         :param channel: Channel number of the remote
         :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(self.beacon_angle(channel), beacon_angle, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'beacon', operator, beacon_angle,
+                                    args=(channel,), transform=_second),
+                          timeout=timeout)
+
+    def wait_until_beacon_angle_async(self, operator, beacon_angle, channel, timeout=None):
+        """Waits until the beacon angle matches certain conditions
+
+        Awaitable version of wait_until_beacon_angle that doesn't block other tasks, see async_util
 
-    def wait_until_button_pressed(self, button, channel):
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param beacon_angle: Beacon angle value to calculate against
+                             (InfraredSensorExt.beacon_angle <OP> beacon_angle)
+        :type beacon_angle: int, float
+        :param channel: Channel number of the remote
+        :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'beacon', operator, beacon_angle,
+                               args=(channel,), transform=_second),
+                     timeout=timeout)
+
+    def wait_until_button_pressed(self, button, channel, timeout=None):
         """Waits until a specified button has been pressed
 
         :param button: Button or Buttons to wait for
         :type button: Button, list, tuple, dict
         :param channel: Channel number of the remote
         :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        if isinstance(button, (list, tuple, dict)):
-            while True:
-                buttons = super(InfraredSensorExt, self).buttons(channel)
-                for one_button in button:
-                    if one_button in buttons:
-                        return
-                wait(10)
-        else:
-            while button not in super(InfraredSensorExt, self).buttons(channel):
-                wait(10)
-        return
+        return wait_until(Condition(self, 'buttons', _any_pressed, _button_tuple(button),
+                                    args=(channel,)),
+                          timeout=timeout)
+
+    def wait_until_button_pressed_async(self, button, channel, timeout=None):
+        """Waits until a specified button has been pressed
 
-    def wait_until_button_released(self, button, channel):
+        Awaitable version of wait_until_button_pressed that doesn't block other
+        tasks, see async_util
+
+        :param button: Button or Buttons to wait for
+        :type button: Button, list, tuple, dict
+        :param channel: Channel number of the remote
+        :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'buttons', _any_pressed, _button_tuple(button),
+                               args=(channel,)),
+                     timeout=timeout)
+
+    def wait_until_button_released(self, button, channel, timeout=None):
         """Waits until a specified button has been released
 
         :param button: Button or Buttons to wait for
         :type button: Button, list, tuple, dict
         :param channel: Channel number of the remote
         :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        if isinstance(button, (list, tuple, dict)):
-            while True:
-                buttons = super(InfraredSensorExt, self).buttons(channel)
-                for one_button in button:
-                    if one_button not in buttons:
-                        return
-                wait(10)
-        else:
-            while button in super(InfraredSensorExt, self).buttons(channel):
-                wait(10)
-        return
+        return wait_until(Condition(self, 'buttons', _any_released, _button_tuple(button),
+                                    args=(channel,)),
+                          timeout=timeout)
+
+    def wait_until_button_released_async(self, button, channel, timeout=None):
+        """Waits until a specified button has been released
+
+        Awaitable version of wait_until_button_released that doesn't block other
+        tasks, see async_util
+
+        :param button: Button or Buttons to wait for
+        :type button: Button, list, tuple, dict
+        :param channel: Channel number of the remote
+        :type channel: int
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'buttons', _any_released, _button_tuple(button),
+                               args=(channel,)),
+                     timeout=timeout)
 
     def wait_until_button_bumped(self, button, channel, wait_timer=500):
         """Waits until a specified button has been bumped
@@ -695,7 +1504,24 @@ class InfraredSensorExt(InfraredSensor):
                 continue
             return
 
-class UltrasonicSensorExt(UltrasonicSensor):
+    def wait_until_button_bumped_async(self, button, channel, wait_timer=500):
+        """Waits until a specified button has been bumped
+
+        Awaitable version of wait_until_button_bumped that doesn't block other tasks,
+        see async_util
+
+        :param button: Button or Buttons to wait for
+        :type button: Button, list, tuple, dict
+        :param channel: Channel number of the remote
+        :type channel: int
+        :rtype: coroutine
+        """
+        button = _button_tuple(button)
+        return until_bumped(Condition(self, 'buttons', _any_pressed, button, args=(channel,)),
+                            Condition(self, 'buttons', _any_released, button, args=(channel,)),
+                            wait_timer)
+
+class UltrasonicSensorExt(UltrasonicSensor, SampledExt):
     """Extension class for the UltrasonicSensor with helpful methods
 
     Further documentation for the UltrasonicSensor class can be found
@@ -705,7 +1531,9 @@ class UltrasonicSensorExt(UltrasonicSensor):
     :type port: Port
     """
 
-    def wait_until_distance(self, operator, distance):
+    sample_reading = 'distance'
+
+    def wait_until_distance(self, operator, distance, timeout=None):
         """Waits until the distance matches certain conditions
 
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
@@ -713,26 +1541,82 @@ class UltrasonicSensorExt(UltrasonicSensor):
         :param distance: Distance value to calculate against
                          (UltrasonicSensor.distance <OP> distance)
         :type distance: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(super(UltrasonicSensorExt, self).distance(), distance, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'distance', operator, distance),
+                          timeout=timeout)
+
+    def wait_until_distance_async(self, operator, distance, timeout=None):
+        """Waits until the distance matches certain conditions
+
+        Awaitable version of wait_until_distance that doesn't block other tasks, see async_util
 
-    def wait_until_presence(self):
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param distance: Distance value to calculate against
+                         (UltrasonicSensor.distance <OP> distance)
+        :type distance: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        Waits until the UltrasonicSensor detects the presence of another UltrasonicSensor
+        return until(Condition(self, 'distance', operator, distance), timeout=timeout)
+
+    def wait_until_presence(self, timeout=None):
+        """Waits until the UltrasonicSensor detects the presence of another UltrasonicSensor
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not super(UltrasonicSensorExt, self).presence():
-            wait(10)
+        return wait_until(Condition(self, 'presence', '==', True), timeout=timeout)
+
+    def wait_until_presence_async(self, timeout=None):
+        """Waits until the UltrasonicSensor detects the presence of another UltrasonicSensor
+
+        Awaitable version of wait_until_presence that doesn't block other tasks, see async_util
 
-    def wait_until_not_presence(self):
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        Waits until the UltrasonicSensor doesn't detect the presence of another UltrasonicSensor
+        return until(Condition(self, 'presence', '==', True), timeout=timeout)
+
+    def wait_until_not_presence(self, timeout=None):
+        """Waits until the UltrasonicSensor doesn't detect the presence of another UltrasonicSensor
+
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while super(UltrasonicSensorExt, self).presence():
-            wait(10)
+        return wait_until(Condition(self, 'presence', '==', False), timeout=timeout)
+
+    def wait_until_not_presence_async(self, timeout=None):
+        """Waits until the UltrasonicSensor doesn't detect the presence of another UltrasonicSensor
+
+        Awaitable version of wait_until_not_presence that doesn't block other tasks, see async_util
 
-class GyroSensorExt(GyroSensor):
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'presence', '==', False), timeout=timeout)
+
+class GyroSensorExt(GyroSensor, SampledExt):
     """Extension class for the GyroSensor with helpful methods
 
     Further documentation for the GyroSensor class can be found
@@ -742,12 +1626,84 @@ class GyroSensorExt(GyroSensor):
     :type port: Port
     """
 
+    sample_reading = 'angle'
+    heading = None
+
     def __init__(self, port):
         """
         Initiate the GyroSensorExt Object
         """
         super(GyroSensorExt, self).__init__(port)
 
+    def compensate(self, period=10, calibrate=1000, left=None, right=None, wheel_diam=56,
+                   axle_track=None, odometry_weight=0.002):
+        """Starts integrating a drift compensated angle in the background
+
+        Until stop_compensating is called, angle, bearing, angle_rotations and the
+        reset methods use the compensated angle (see HeadingEstimator), which starts
+        from the current angle. Resetting it doesn't reset the sensor, so there is no
+        reset stall.
+
+        :param period: Integration period (milliseconds), defaults to 10
+        :type period: int, optional
+        :param calibrate: Time (milliseconds) to estimate the bias for first, the robot must
+                          be stationary, 0 skips calibrating, defaults to 1000
+        :type calibrate: int, optional
+        :param left: Left drive motor for odometry, defaults to None
+        :type left: MotorExt, optional
+        :param right: Right drive motor for odometry, defaults to None
+        :type right: MotorExt, optional
+        :param wheel_diam: Diameter of the wheels in mm, defaults to 56
+        :type wheel_diam: int, float, optional
+        :param axle_track: Distance between the centres of the wheels in mm, required with
+                           drive motors, defaults to None
+        :type axle_track: int, float, optional
+        :param odometry_weight: Weight of the odometry heading each update, defaults to 0.002
+        :type odometry_weight: float, optional
+        :return: Running heading estimator
+        :rtype: HeadingEstimator
+        """
+        self.stop_compensating()
+        heading = HeadingEstimator(self, period, left, right, wheel_diam, axle_track,
+                                   odometry_weight)
+        if calibrate > 0:
+            heading.calibrate(calibrate)
+        heading.reset_angle(super(GyroSensorExt, self).angle())
+        heading.start()
+        self.heading = heading
+        return heading
+
+    def stop_compensating(self):
+        """
+        Stops the drift compensation, angle goes back to the angle of the sensor
+        """
+        if self.heading is not None:
+            self.heading.kill()
+            self.heading = None
+
+    def angle(self):
+        """Gets the accumulated angle of the sensor, drift compensated while compensate
+        is running
+
+        :return: Rotation angle
+        :rtype: int, float
+        """
+        if self.heading is not None:
+            return self.heading.angle()
+        return super(GyroSensorExt, self).angle()
+
+    def reset_angle(self, angle):
+        """Sets the rotation angle of the sensor, only the compensated angle while
+        compensate is running
+
+        :param angle: Value to set the angle to
+        :type angle: int, float
+        """
+        if self.heading is not None:
+            self.heading.reset_angle(angle)
+        else:
+            super(GyroSensorExt, self).reset_angle(angle)
+
     def speed_rotations(self):
         """Gets the speed (angular velocity) of the sensor in rotations a second
 
@@ -757,12 +1713,17 @@ class GyroSensorExt(GyroSensor):
         return super(GyroSensorExt, self).speed() / 360
 
     def bearing(self):
-        """Gets the current bearing of the sensor
+        """Gets the current bearing of the sensor, drift compensated while compensate
+        is running
 
         :return: Current bearing of the sensor from 0 to 360
-        :rtype: int
+        :rtype: int, float
         """
-        return super(GyroSensorExt, self).angle() % 360
+        if self.heading is not None:
+            return self.heading.bearing()
+        if self._sampled:
+            return self.latest('angle') % 360
+        return self.angle() % 360
 
     def angle_rotations(self):
         """Gets the accumulated angle of the sensor in rotations
@@ -770,7 +1731,7 @@ class GyroSensorExt(GyroSensor):
         :return: Rotation angle
         :rtype: int, float
         """
-        return super(GyroSensorExt, self).angle() / 360
+        return self.angle() / 360
 
     def reset_angle_bearing(self, angle):
         """Sets the rotation angle of the sensor to the bearing of an angle
@@ -778,66 +1739,178 @@ class GyroSensorExt(GyroSensor):
         :param angle: Value to which the beaing should be calculated from
         :type angle: int
         """
-        super(GyroSensorExt, self).reset_angle(angle % 360)
+        self.reset_angle(angle % 360)
 
-    def wait_until_speed(self, operator, speed):
+    def wait_until_speed(self, operator, speed, timeout=None):
         """Waits until the speed matches certain conditions
 
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param speed: Speed value to calculate against (GyroSensor.speed <OP> speed)
         :type speed: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(super(GyroSensorExt, self).speed(), speed, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'speed', operator, speed),
+                          timeout=timeout)
 
-    def wait_until_angle(self, operator, angle):
+    def wait_until_speed_async(self, operator, speed, timeout=None):
+        """Waits until the speed matches certain conditions
+
+        Awaitable version of wait_until_speed that doesn't block other tasks, see async_util
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param speed: Speed value to calculate against (GyroSensor.speed <OP> speed)
+        :type speed: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'speed', operator, speed), timeout=timeout)
+
+    def wait_until_angle(self, operator, angle, timeout=None):
+        """Waits until the angle matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param angle: Angle value to calculate against (GyroSensor.angle <OP> angle)
+        :type angle: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
+        """
+        return wait_until(Condition(self, 'angle', operator, angle),
+                          timeout=timeout)
+
+    def wait_until_angle_async(self, operator, angle, timeout=None):
         """Waits until the angle matches certain conditions
 
+        Awaitable version of wait_until_angle that doesn't block other tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param angle: Angle value to calculate against (GyroSensor.angle <OP> angle)
         :type angle: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'angle', operator, angle), timeout=timeout)
+
+    def wait_until_speed_rotations(self, operator, speed, timeout=None):
+        """Waits until the speed in rotations matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param speed: Speed rotations value to calculate against
+                      (GyroSensorExt.speed_rotations <OP> speed)
+        :type speed: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(super(GyroSensorExt, self).angle(), angle, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'speed', operator, speed, transform=_rotations),
+                          timeout=timeout)
 
-    def wait_until_speed_rotations(self, operator, speed):
+    def wait_until_speed_rotations_async(self, operator, speed, timeout=None):
         """Waits until the speed in rotations matches certain conditions
 
+        Awaitable version of wait_until_speed_rotations that doesn't block other
+        tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param speed: Speed rotations value to calculate against
                       (GyroSensorExt.speed_rotations <OP> speed)
         :type speed: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'speed', operator, speed, transform=_rotations),
+                     timeout=timeout)
+
+    def wait_until_angle_rotations(self, operator, angle, timeout=None):
+        """Waits until the angle in rotations matches certain conditions
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param angle: Angle rotations value to calculate against
+                      (GyroSensorExt.angle_rotations <OP> angle)
+        :type angle: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(self.speed_rotations(), speed, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'angle', operator, angle, transform=_rotations),
+                          timeout=timeout)
 
-    def wait_until_angle_rotations(self, operator, angle):
+    def wait_until_angle_rotations_async(self, operator, angle, timeout=None):
         """Waits until the angle in rotations matches certain conditions
 
+        Awaitable version of wait_until_angle_rotations that doesn't block other
+        tasks, see async_util
+
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param angle: Angle rotations value to calculate against
                       (GyroSensorExt.angle_rotations <OP> angle)
         :type angle: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
         """
-        while not _operator_calc(self.angle_rotations(), angle, operator):
-            wait(10)
-        return
+        return until(Condition(self, 'angle', operator, angle, transform=_rotations),
+                     timeout=timeout)
 
-    def wait_until_bearing(self, operator, bearing):
+    def wait_until_bearing(self, operator, bearing, timeout=None):
         """Waits until the bearing matches certain conditions
 
         :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
         :type operator: str
         :param bearing: Bearing value to calculate against (GyroSensorExt.bearing <OP> bearing)
         :type bearing: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition was met, False if the timeout expired
+        :rtype: bool
         """
-        while not _operator_calc(self.bearing(), bearing, operator):
-            wait(10)
-        return
+        return wait_until(Condition(self, 'angle', operator, bearing, transform=_bearing),
+                          timeout=timeout)
+
+    def wait_until_bearing_async(self, operator, bearing, timeout=None):
+        """Waits until the bearing matches certain conditions
+
+        Awaitable version of wait_until_bearing that doesn't block other tasks, see async_util
+
+        :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+        :type operator: str
+        :param bearing: Bearing value to calculate against (GyroSensorExt.bearing <OP> bearing)
+        :type bearing: int, float
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: Coroutine resolving to True if the condition was met, False if the timeout expired
+        :rtype: coroutine
+        """
+        return until(Condition(self, 'angle', operator, bearing, transform=_bearing),
+                     timeout=timeout)
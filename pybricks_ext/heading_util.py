@@ -0,0 +1,198 @@
+import threading
+
+from pybricks.tools import wait, StopWatch
+
+from sample_util import ExponentialFilter
+from timing_util import Ticker
+
+class HeadingEstimator(threading.Thread):
+    """Drift compensated heading from a gyro, integrated at a fixed rate in the background
+
+    The gyro speed has its bias removed and is integrated with the measured time
+    between readings. The bias is first estimated by calibrate while the robot is
+    stationary, then kept up to date whenever the robot is still again: with drive
+    motors given, still means neither wheel has moved, without them it means the
+    speed is within tolerance of the bias. While still, the heading isn't
+    integrated at all so it can't drift. With drive motors given, the heading can
+    also be pulled towards the heading worked out from the wheel angles
+    (odometry), which doesn't drift over time but suffers from wheel slip.
+
+    The heading follows the gyro's convention, with the left and right motors
+    swapped if the odometry turns the wrong way.
+
+    :param gyro: Gyro sensor to read
+    :type gyro: GyroSensor
+    :param period: Integration period (milliseconds), defaults to 10
+    :type period: int, optional
+    :param left: Left drive motor, defaults to None
+    :type left: Motor, optional
+    :param right: Right drive motor, defaults to None
+    :type right: Motor, optional
+    :param wheel_diam: Diameter of the wheels in mm, defaults to 56
+    :type wheel_diam: int, float, optional
+    :param axle_track: Distance between the centres of the wheels in mm, required with
+                       drive motors, defaults to None
+    :type axle_track: int, float, optional
+    :param odometry_weight: Weight of the odometry heading each update from 0 (gyro only)
+                            to 1 (odometry only), defaults to 0.002
+    :type odometry_weight: float, optional
+    :param bias_alpha: Weight of each still reading in the bias estimate, defaults to 0.01
+    :type bias_alpha: float, optional
+    :param tolerance: Largest difference (degrees a second) between the speed and the bias
+                      to treat the robot as still without drive motors, defaults to 1
+    :type tolerance: int, float, optional
+    :param settle: Time (milliseconds) the robot has to be still before the bias is updated,
+                   defaults to 200
+    :type settle: int, optional
+    """
+
+    def __init__(self, gyro, period=10, left=None, right=None, wheel_diam=56, axle_track=None,
+                 odometry_weight=0.002, bias_alpha=0.01, tolerance=1, settle=200):
+        """
+        Initiate the HeadingEstimator Object
+        """
+        super(HeadingEstimator, self).__init__()
+        if (left is None) != (right is None):
+            raise ValueError('both drive motors are needed for odometry')
+        if left is not None and axle_track is None:
+            raise ValueError('axle_track is needed for odometry')
+        self.gyro = gyro
+        self.period = period
+        self.left = left
+        self.right = right
+        self.wheel_diam = wheel_diam
+        self.axle_track = axle_track
+        self.odometry_weight = odometry_weight
+        self.tolerance = tolerance
+        self.settle = settle
+        self.bias = 0.0
+        self.ticker = None
+        self.stop = False
+        self._bias_filter = ExponentialFilter(bias_alpha)
+        self._lock = threading.Lock()
+        self._watch = StopWatch()
+        self._angle = 0.0
+        self._odometry = 0.0
+        self._rate = 0.0
+        self._last = None
+        self._wheels = None
+        self._still = 0
+
+    def calibrate(self, duration=1000, interval=10, attempts=5):
+        """Estimates the bias of the gyro, the robot must be stationary
+
+        :param duration: Time (milliseconds) to sample the gyro for, defaults to 1000
+        :type duration: int, optional
+        :param interval: Time (milliseconds) between readings, defaults to 10
+        :type interval: int, optional
+        :param attempts: Number of times to start again if the robot moved, defaults to 5
+        :type attempts: int, optional
+        :return: Bias (degrees a second), None if the robot didn't stay still
+        :rtype: float
+        """
+        watch = StopWatch()
+        for _ in range(attempts):
+            readings = []
+            watch.reset()
+            while watch.time() < duration:
+                readings.append(self.gyro.speed())
+                wait(interval)
+            if max(readings) - min(readings) <= 2 * self.tolerance:
+                bias = sum(readings) / len(readings)
+                with self._lock:
+                    self._bias_filter.reset()
+                    self.bias = self._bias_filter.update(bias)
+                    self._still = 0
+                return bias
+        return None
+
+    def _turned(self, wheels, previous):
+        left = wheels[0] - previous[0]
+        right = wheels[1] - previous[1]
+        return (left - right) * self.wheel_diam / (2 * self.axle_track)
+
+    def update(self):
+        """Reads the gyro once and integrates the compensated speed
+
+        This is called every period once the thread is started, programs that don't start
+        the thread can call it from their own fixed rate loop instead.
+
+        :return: Compensated angle
+        :rtype: float
+        """
+        now = self._watch.time()
+        raw = self.gyro.speed()
+        wheels = None
+        if self.left is not None:
+            wheels = (self.left.angle(), self.right.angle())
+        with self._lock:
+            last = self._last
+            self._last = (now, raw)
+            previous = self._wheels
+            self._wheels = wheels
+            if last is None or now <= last[0]:
+                return self._angle
+            elapsed = now - last[0]
+            self._rate = raw - self.bias
+            if wheels is None:
+                still = abs(self._rate) <= self.tolerance
+            else:
+                still = wheels == previous
+                self._odometry += self._turned(wheels, previous)
+            if still:
+                self._still += elapsed
+                if self._still >= self.settle:
+                    self.bias = self._bias_filter.update(raw)
+                    self._rate = 0.0
+                    return self._angle
+            else:
+                self._still = 0
+            self._angle += ((raw + last[1]) / 2 - self.bias) * elapsed / 1000
+            if wheels is not None:
+                self._angle += self.odometry_weight * (self._odometry - self._angle)
+            return self._angle
+
+    def angle(self):
+        """Gets the compensated accumulated angle
+
+        :return: Angle (degrees)
+        :rtype: float
+        """
+        with self._lock:
+            return self._angle
+
+    def bearing(self):
+        """Gets the compensated bearing
+
+        :return: Bearing from 0 to 360
+        :rtype: float
+        """
+        return self.angle() % 360
+
+    def speed(self):
+        """Gets the compensated speed from the last update
+
+        :return: Angular velocity (degrees a second), 0 while the robot is still
+        :rtype: float
+        """
+        with self._lock:
+            return self._rate
+
+    def reset_angle(self, angle):
+        """Sets the compensated angle without resetting the sensor
+
+        :param angle: Value to set the angle to
+        :type angle: int, float
+        """
+        with self._lock:
+            self._angle = float(angle)
+            self._odometry = float(angle)
+
+    def run(self):
+        self.ticker = Ticker(self.period)
+        while not self.stop:
+            self.update()
+            self.ticker.wait()
+
+    def kill(self):
+        self.stop = True
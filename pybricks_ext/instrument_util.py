@@ -0,0 +1,176 @@
+import sys
+
+import tools_ext
+from wait_util import engine
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+_CLASSES = {
+    'ev3devices_ext': ('MotorExt', 'MotorGroupExt', 'TouchSensorExt', 'ColorSensorExt',
+                       'InfraredSensorExt', 'UltrasonicSensorExt', 'GyroSensorExt'),
+    'ev3brick_ext': ('SpeakerExt',),
+    'sample_util': ('SampledExt',),
+}
+
+_FUNCTIONS = {
+    'speed_util': ('float_percent', 'speed_mm', 'speed_deg', 'speed_mm_deg', 'speed_deg_mm',
+                   'get_ratio'),
+    'ev3brick_ext': ('light_pulse', 'light_flash', 'light', 'buttons'),
+}
+
+_stats = {}
+_patches = []
+_INHERITED = object()
+enabled = False
+
+def _timed(name, function):
+    stats = _stats.get(name)
+    if stats is None:
+        stats = [0, 0, 0]
+        _stats[name] = stats
+
+    def wrapper(*args, **kwargs):
+        start = ticks_us()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = ticks_diff(ticks_us(), start)
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+    return wrapper
+
+def _record_wait(waiter):
+    condition = waiter.conditions[0]
+    name = '%s.%s polls' % (type(condition.device).__name__, condition.reading)
+    if len(waiter.conditions) > 1:
+        name = 'wait_util.wait_%s polls' % ('all' if waiter.wait_all else 'any')
+    stats = _stats.get(name)
+    if stats is None:
+        stats = [0, 0, 0]
+        _stats[name] = stats
+    stats[0] += 1
+    stats[1] += waiter.polls
+    if waiter.polls > stats[2]:
+        stats[2] = waiter.polls
+
+def _patch(owner, name, value):
+    _patches.append((owner, name, owner.__dict__.get(name, _INHERITED)))
+    setattr(owner, name, value)
+
+def _methods(cls, classes):
+    """
+    Gets the public methods of an extension class, including the ones inherited from
+    the pybricks classes but not the ones inherited from other instrumented classes
+    """
+    methods = []
+    for name in dir(cls):
+        if name.startswith('_'):
+            continue
+        if name in cls.__dict__:
+            value = cls.__dict__[name]
+        elif any(other is not cls and issubclass(cls, other) and hasattr(other, name)
+                 for other in classes):
+            continue
+        else:
+            value = getattr(cls, name)
+        if callable(value) and not isinstance(value, type):
+            methods.append((name, value))
+    return methods
+
+def enable():
+    """Starts counting calls and latency of every extension method and function
+
+    Methods of the extension classes in ev3devices_ext, ev3brick_ext and sample_util,
+    including the ones they inherit from pybricks (e.g. MotorExt.run and
+    ColorSensorExt.rgb), and the functions of speed_util and ev3brick_ext are replaced
+    with timed versions. Times are inclusive of any other instrumented calls made
+    inside. Only modules that have already been imported are instrumented. The number
+    of polls of every wait_until invocation is recorded by device reading.
+    """
+    global enabled
+    if enabled:
+        return
+    enabled = True
+    classes = []
+    for module_name, class_names in _CLASSES.items():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            classes.extend(getattr(module, class_name) for class_name in class_names)
+    for cls in classes:
+        for name, value in _methods(cls, classes):
+            _patch(cls, name, _timed('%s.%s' % (cls.__name__, name), value))
+    for module_name, names in _FUNCTIONS.items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for name in names:
+            function = getattr(module, name)
+            timed = _timed('%s.%s' % (module_name, name), function)
+            for other in list(sys.modules.values()):
+                if getattr(other, name, None) is function:
+                    _patch(other, name, timed)
+    engine.recorder = _record_wait
+
+def disable():
+    """
+    Restores every original method and function so instrumentation has no cost
+    """
+    global enabled
+    while len(_patches) > 0:
+        owner, name, value = _patches.pop()
+        if value is _INHERITED:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, value)
+    engine.recorder = None
+    enabled = False
+
+def reset():
+    """
+    Clears all of the recorded counters
+    """
+    for stats in _stats.values():
+        stats[0] = 0
+        stats[1] = 0
+        stats[2] = 0
+
+def stats():
+    """Gets the recorded counters
+
+    For timed calls the values are (calls, total microseconds, max microseconds),
+    for wait polls they are (waits, total polls, max polls)
+
+    :return: Counters keyed by name
+    :rtype: dict
+    """
+    return dict((name, tuple(values)) for name, values in _stats.items() if values[0] > 0)
+
+def dump(sort='total'):
+    """Prints a report of the recorded counters through tools_ext.print
+
+    :param sort: Column to sort by, 'total', 'calls', 'max' or 'mean', defaults to 'total'
+    :type sort: str, optional
+    """
+    columns = {'calls': 0, 'total': 1, 'max': 2}
+    rows = []
+    for name, values in stats().items():
+        rows.append((name, values[0], values[1], values[2], values[1] / values[0]))
+    if sort == 'mean':
+        rows.sort(key=lambda row: row[4], reverse=True)
+    else:
+        column = columns.get(sort, 1) + 1
+        rows.sort(key=lambda row: row[column], reverse=True)
+    tools_ext.print('%-44s %8s %12s %10s %10s' % ('name', 'calls', 'total', 'mean', 'max'))
+    for name, calls, total, maximum, mean in rows:
+        tools_ext.print('%-44s %8d %12d %10.1f %10d' % (name, calls, total, mean, maximum))
@@ -0,0 +1,203 @@
+from array import array
+from math import ceil, sqrt
+
+from pybricks.tools import wait, StopWatch
+
+class MotionProfile():
+    """Precomputed velocity profile sampled at a fixed control period
+
+    The speeds are the average speed over each period, scaled so that running
+    every speed for one period covers exactly the requested distance.
+
+    :param speeds: Speed (deg/s) for each control period
+    :type speeds: array.array
+    :param period: Control period (milliseconds)
+    :type period: int
+    """
+
+    def __init__(self, speeds, period):
+        """
+        Initiate the MotionProfile Object
+        """
+        self.speeds = speeds
+        self.period = period
+
+    def __len__(self):
+        return len(self.speeds)
+
+    def duration(self):
+        """Gets the total duration of the profile
+
+        :return: Duration (milliseconds)
+        :rtype: int
+        """
+        return len(self.speeds) * self.period
+
+    def scaled(self, scale):
+        """Gets a copy of the profile with every speed multiplied by a scale
+
+        Used to convert a profile in output gear units to motor units
+
+        :param scale: Value to multiply every speed by
+        :type scale: int, float
+        :return: Scaled profile
+        :rtype: MotionProfile
+        """
+        speeds = array('f', self.speeds)
+        for index, speed in enumerate(speeds):
+            speeds[index] = speed * scale
+        return MotionProfile(speeds, self.period)
+
+def _sample(velocity, total_time, distance, period):
+    """
+    Samples a velocity function at the middle of each period and scales the
+    samples so that they cover the distance exactly
+    """
+    step = period / 1000
+    count = max(1, int(ceil(total_time / step)))
+    speeds = array('f', [0]) * count
+    covered = 0
+    for index in range(count):
+        speed = velocity((index + 0.5) * step)
+        speeds[index] = speed
+        covered += speed * step
+    if covered > 0:
+        scale = abs(distance) / covered
+        if distance < 0:
+            scale = -scale
+        for index in range(count):
+            speeds[index] = speeds[index] * scale
+    return MotionProfile(speeds, period)
+
+def trapezoidal(distance, speed, acceleration, period=10):
+    """Generates an acceleration limited trapezoidal velocity profile
+
+    If the distance is too short to reach the speed a triangular profile is used.
+
+    :param distance: Distance (degrees) to move, negative to move backwards
+    :type distance: int, float
+    :param speed: Maximum speed (deg/s)
+    :type speed: int, float
+    :param acceleration: Acceleration and deceleration (deg/s/s)
+    :type acceleration: int, float
+    :param period: Control period (milliseconds), defaults to 10
+    :type period: int, optional
+    :return: Velocity profile
+    :rtype: MotionProfile
+    """
+    length = abs(distance)
+    speed = abs(speed)
+    acceleration = abs(acceleration)
+    if length == 0 or speed == 0 or acceleration == 0:
+        return MotionProfile(array('f'), period)
+    if length < speed * speed / acceleration:
+        speed = sqrt(length * acceleration)
+    ramp_time = speed / acceleration
+    cruise_time = (length - speed * ramp_time) / speed
+    total_time = 2 * ramp_time + cruise_time
+
+    def velocity(time):
+        if time < ramp_time:
+            return acceleration * time
+        if time < ramp_time + cruise_time:
+            return speed
+        return max(0, acceleration * (total_time - time))
+
+    return _sample(velocity, total_time, distance, period)
+
+def _s_curve_ramp(speed, acceleration, jerk):
+    """
+    Gets the jerk time, constant acceleration time and peak acceleration of an
+    S-curve ramp from standstill to a speed
+    """
+    if acceleration * acceleration / jerk > speed:
+        acceleration = sqrt(speed * jerk)
+    jerk_time = acceleration / jerk
+    constant_time = speed / acceleration - jerk_time
+    return jerk_time, constant_time, acceleration
+
+def s_curve(distance, speed, acceleration, jerk, period=10):
+    """Generates a jerk limited S-curve velocity profile
+
+    If the distance is too short to reach the speed, the highest speed that
+    still fits the distance is used.
+
+    :param distance: Distance (degrees) to move, negative to move backwards
+    :type distance: int, float
+    :param speed: Maximum speed (deg/s)
+    :type speed: int, float
+    :param acceleration: Maximum acceleration and deceleration (deg/s/s)
+    :type acceleration: int, float
+    :param jerk: Maximum jerk (deg/s/s/s)
+    :type jerk: int, float
+    :param period: Control period (milliseconds), defaults to 10
+    :type period: int, optional
+    :return: Velocity profile
+    :rtype: MotionProfile
+    """
+    length = abs(distance)
+    speed = abs(speed)
+    acceleration = abs(acceleration)
+    jerk = abs(jerk)
+    if length == 0 or speed == 0 or acceleration == 0 or jerk == 0:
+        return MotionProfile(array('f'), period)
+    jerk_time, constant_time, peak = _s_curve_ramp(speed, acceleration, jerk)
+    if speed * (2 * jerk_time + constant_time) > length:
+        low = 0
+        high = speed
+        for _ in range(30):
+            speed = (low + high) / 2
+            jerk_time, constant_time, peak = _s_curve_ramp(speed, acceleration, jerk)
+            if speed * (2 * jerk_time + constant_time) > length:
+                high = speed
+            else:
+                low = speed
+        speed = low
+        jerk_time, constant_time, peak = _s_curve_ramp(speed, acceleration, jerk)
+    ramp_time = 2 * jerk_time + constant_time
+    cruise_time = (length - speed * ramp_time) / speed
+    total_time = 2 * ramp_time + cruise_time
+    jerk_speed = jerk * jerk_time * jerk_time / 2
+
+    def ramp(time):
+        if time <= 0:
+            return 0
+        if time < jerk_time:
+            return jerk * time * time / 2
+        if time < jerk_time + constant_time:
+            return jerk_speed + peak * (time - jerk_time)
+        if time < ramp_time:
+            remaining = ramp_time - time
+            return speed - jerk * remaining * remaining / 2
+        return speed
+
+    def velocity(time):
+        if time < ramp_time:
+            return ramp(time)
+        if time < ramp_time + cruise_time:
+            return speed
+        return ramp(total_time - time)
+
+    return _sample(velocity, total_time, distance, period)
+
+def run_profile(motor, profile):
+    """Streams a velocity profile to a motor at the profile control period
+
+    The profile must already be in motor units (deg/s of the motor itself).
+    Deadlines are kept against a StopWatch so the time spent sending each
+    command doesn't accumulate.
+
+    :param motor: Motor to run
+    :type motor: Motor
+    :param profile: Velocity profile in motor units
+    :type profile: MotionProfile
+    """
+    watch = StopWatch()
+    period = profile.period
+    deadline = 0
+    for speed in profile.speeds:
+        motor.run(speed)
+        deadline += period
+        remaining = deadline - watch.time()
+        if remaining > 0:
+            wait(remaining)
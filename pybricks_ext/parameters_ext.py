@@ -1,7 +1,105 @@
+import sys
 from enum import Enum
 
 from pybricks.parameters import Color
 
+_NUMBER_COLORS = (None,
+                  Color.BLACK,
+                  Color.BLUE,
+                  Color.GREEN,
+                  Color.YELLOW,
+                  Color.RED,
+                  Color.WHITE,
+                  Color.BROWN,
+                  Color.ORANGE,
+                  Color.PURPLE)
+
+_COLOR_NUMBERS = dict((color, number) for number, color in enumerate(_NUMBER_COLORS))
+
+
+_COLOR_BITS = {}
+
+
+def _color_bit(color):
+    """
+    Gets the bit of a Color, ColorExt or color number in a ColorSet mask,
+    0 if it isn't a valid color
+    """
+    try:
+        return _COLOR_BITS.get(color, 0)
+    except TypeError:
+        return 0
+
+
+def _color_number(color):
+    """
+    Gets the number of a Color, ColorExt or color number, 0 (None) if it isn't a valid color
+    """
+    try:
+        return _COLOR_NUMBERS.get(color, 0)
+    except TypeError:
+        return 0
+
+
+def _in_colors(color, colors):
+    """
+    Checks whether a list, tuple or dict of colors holds a color in any of its forms
+    """
+    if isinstance(color, Color) and color in colors:
+        return True
+    number = _color_number(color)
+    if number == 0:
+        return any(_color_number(member) == 0 for member in colors)
+    return (_NUMBER_COLORS[number] in colors or _NUMBER_COLOR_EXTS[number] in colors
+            or number in colors)
+
+
+class ColorSet():
+    """Precompiled set of colors that can be checked in constant time
+
+    The colors are stored as a bitmask over the color numbers (see ColorExt.to_number)
+    so checking membership doesn't allocate or scan a list. None (no color) can be
+    included as a member.
+
+    :param colors: Colors in the set
+    :type colors: Color, ColorExt, int, list, tuple, dict, ColorSet
+    """
+
+    def __init__(self, colors):
+        """
+        Initiate the ColorSet Object
+        """
+        mask = 0
+        if isinstance(colors, ColorSet):
+            mask = colors.mask
+        elif isinstance(colors, (list, tuple, dict, set)):
+            for color in colors:
+                mask |= _color_bit(color)
+        else:
+            mask = _color_bit(colors)
+        self.mask = mask
+
+    def __contains__(self, color):
+        return (self.mask & _color_bit(color)) != 0
+
+    def __len__(self):
+        count = 0
+        for number in range(10):
+            if self.mask & (1 << number):
+                count += 1
+        return count
+
+    def __iter__(self):
+        for number in range(10):
+            if self.mask & (1 << number):
+                yield _NUMBER_COLORS[number]
+
+    def __eq__(self, other):
+        return isinstance(other, ColorSet) and other.mask == self.mask
+
+    def __hash__(self):
+        return self.mask
+
 
 class ColorExt(Enum):
     """
@@ -27,27 +125,26 @@ class ColorExt(Enum):
 
         If an invalid color is provided (int, float) then None will be used
 
+        A ColorSet can be used in place of a list, tuple or dict of Colors to check
+        membership in constant time.
+
         :param color_a: Color a to use for comparison
-        :type color_a: Color, int, float, list, tuple, dict
+        :type color_a: Color, ColorExt, int, float, list, tuple, dict, ColorSet
         :param color_b: Color b to use for comparison
-        :type color_b: Color, int, float, list, tuple, dict
+        :type color_b: Color, ColorExt, int, float, list, tuple, dict, ColorSet
         :return: Whether or not the colors are equal or the color set contains the alternate color
         :rtype: bool
         """
-        if isinstance(color_a, (list, tuple, dict)):
-            if not isinstance(color_b, Color):
-                color_b = ColorExt.from_number(color_b)
+        if isinstance(color_a, ColorSet):
             return color_b in color_a
-        elif isinstance(color_b, (list, tuple, dict)):
-            if not isinstance(color_a, Color):
-                color_a = ColorExt.from_number(color_a)
+        elif isinstance(color_b, ColorSet):
             return color_a in color_b
+        elif isinstance(color_a, (list, tuple, dict)):
+            return _in_colors(color_b, color_a)
+        elif isinstance(color_b, (list, tuple, dict)):
+            return _in_colors(color_a, color_b)
         else:
-            if not isinstance(color_a, Color):
-                color_a = ColorExt.from_number(color_a)
-            if not isinstance(color_b, Color):
-                color_b = ColorExt.from_number(color_b)
-            return color_a == color_b
+            return _color_number(color_a) == _color_number(color_b)
 
     @staticmethod
     def to_number(color):
@@ -63,26 +160,17 @@ class ColorExt(Enum):
         Color.RED: 5
         Color.WHITE: 6
         Color.BROWN: 7
+        Color.ORANGE: 8
+        Color.PURPLE: 9
 
         :param color: Color to convert
-        :type color: Color
+        :type color: Color, ColorExt
         :return: Number representation for the Color
         :rtype: int
         """
-        if not isinstance(color, Color) or color is None:
+        if not isinstance(color, (Color, ColorExt)):
             return 0
-        switch = {
-            Color.BLACK: 1,
-            Color.BLUE: 2,
-            Color.GREEN: 3,
-            Color.YELLOW: 4,
-            Color.RED: 5,
-            Color.WHITE: 6,
-            Color.BROWN: 7,
-            Color.ORANGE: 8,
-            Color.PURPLE: 9
-        }
-        return switch.get(color, d=0)
+        return _COLOR_NUMBERS.get(color, 0)
 
     @staticmethod
     def from_number(number):
@@ -98,26 +186,28 @@ class ColorExt(Enum):
         Color.RED: 5
         Color.WHITE: 6
         Color.BROWN: 7
+        Color.ORANGE: 8
+        Color.PURPLE: 9
 
         :param number: Number to convert
         :type number: int
         :return: Color representation for the number
         :rtype: Color
         """
-        if not isinstance(number, (int, float)) or number == 0:
+        if not isinstance(number, (int, float)) or not 0 < number < 10 or int(number) != number:
             return None
-        switch = {
-            1: Color.BLACK,
-            2: Color.BLUE,
-            3: Color.GREEN,
-            4: Color.YELLOW,
-            5: Color.RED,
-            6: Color.WHITE,
-            7: Color.BROWN,
-            8: Color.ORANGE,
-            9: Color.PURPLE
-        }
-        return switch.get(number, d=None)
+        return _NUMBER_COLORS[int(number)]
+
+for _number, _color in enumerate(_NUMBER_COLORS):
+    _COLOR_BITS[_number] = 1 << _number
+    _COLOR_BITS[_color] = 1 << _number
+_NUMBER_COLOR_EXTS = [None] * len(_NUMBER_COLORS)
+for _color in ColorExt:
+    _COLOR_BITS[_color] = 1 << _color.value
+    _COLOR_NUMBERS[_color] = _color.value
+    _NUMBER_COLOR_EXTS[_color.value] = _color
+for _number in range(1, len(_NUMBER_COLORS)):
+    _COLOR_NUMBERS[_number] = _number
 
 class DirectionExt(Enum):
 
@@ -135,157 +225,6 @@ class PortExt(Enum):
     S3 = 51
     S4 = 52
 
-class SoundFileExt(Enum):
-
-    BRAVO = "/usr/share/sounds/ev3dev/communication/bravo.wav"
-    LEGO = "/usr/share/sounds/ev3dev/communication/lego.wav"
-    GENERAL_ALERT = "/usr/share/sounds/ev3dev/system/general_alert.wav"
-    SONAR = "/usr/share/sounds/ev3dev/mechanical/sonar.wav"
-    EIGHT = "/usr/share/sounds/ev3dev/numbers/eight.wav"
-    CAT_PURR = "/usr/share/sounds/ev3dev/animals/cat_purr.wav"
-    ANALYZE = "/usr/share/sounds/ev3dev/information/analyze.wav"
-    UP = "/usr/share/sounds/ev3dev/information/up.wav"
-    FLASHING = "/usr/share/sounds/ev3dev/information/flashing.wav"
-    FOUR = "/usr/share/sounds/ev3dev/numbers/four.wav"
-    MINDSTORMS = "/usr/share/sounds/ev3dev/communication/mindstorms.wav"
-    DOG_GROWL = "/usr/share/sounds/ev3dev/animals/dog_growl.wav"
-    FIVE = "/usr/share/sounds/ev3dev/numbers/five.wav"
-    SEVEN = "/usr/share/sounds/ev3dev/numbers/seven.wav"
-    GREEN = "/usr/share/sounds/ev3dev/colors/green.wav"
-    SHOUTING = "/usr/share/sounds/ev3dev/expressions/shouting.wav"
-    THANK_YOU = "/usr/share/sounds/ev3dev/communication/thank_you.wav"
-    COLOR = "/usr/share/sounds/ev3dev/information/color.wav"
-    EV3 = "/usr/share/sounds/ev3dev/communication/ev3.wav"
-    OVERPOWER = "/usr/share/sounds/ev3dev/system/overpower.wav"
-    SNAKE_HISS = "/usr/share/sounds/ev3dev/animals/snake_hiss.wav"
-    TEN = "/usr/share/sounds/ev3dev/numbers/ten.wav"
-    ERROR_ALARM = "/usr/share/sounds/ev3dev/information/error_alarm.wav"
-    BLACK = "/usr/share/sounds/ev3dev/colors/black.wav"
-    RED = "/usr/share/sounds/ev3dev/colors/red.wav"
-    CLICK = "/usr/share/sounds/ev3dev/system/click.wav"
-    GAME_OVER = "/usr/share/sounds/ev3dev/communication/game_over.wav"
-    SPEED_IDLE = "/usr/share/sounds/ev3dev/movements/speed_idle.wav"
-    WHITE = "/usr/share/sounds/ev3dev/colors/white.wav"
-    OKEY_DOKEY = "/usr/share/sounds/ev3dev/communication/okey-dokey.wav"
-    HI = "/usr/share/sounds/ev3dev/communication/hi.wav"
-    BOING = "/usr/share/sounds/ev3dev/expressions/boing.wav"
-    TOUCH = "/usr/share/sounds/ev3dev/information/touch.wav"
-    MOTOR_STOP = "/usr/share/sounds/ev3dev/mechanical/motor_stop.wav"
-    SIX = "/usr/share/sounds/ev3dev/numbers/six.wav"
-    BLUE = "/usr/share/sounds/ev3dev/colors/blue.wav"
-    DETECTED = "/usr/share/sounds/ev3dev/information/detected.wav"
-    CRYING = "/usr/share/sounds/ev3dev/expressions/crying.wav"
-    GOODBYE = "/usr/share/sounds/ev3dev/communication/goodbye.wav"
-    OBJECT = "/usr/share/sounds/ev3dev/information/object.wav"
-    RATCHET = "/usr/share/sounds/ev3dev/mechanical/ratchet.wav"
-    SNORING = "/usr/share/sounds/ev3dev/expressions/snoring.wav"
-    TURN = "/usr/share/sounds/ev3dev/information/turn.wav"
-    RIGHT = "/usr/share/sounds/ev3dev/information/right.wav"
-    SPEED_UP = "/usr/share/sounds/ev3dev/movements/speed_up.wav"
-    AIRBRAKE = "/usr/share/sounds/ev3dev/mechanical/airbrake.wav"
-    LASER = "/usr/share/sounds/ev3dev/mechanical/laser.wav"
-    DOG_WHINE = "/usr/share/sounds/ev3dev/animals/dog_whine.wav"
-    DOG_SNIFF = "/usr/share/sounds/ev3dev/animals/dog_sniff.wav"
-    AIR_RELEASE = "/usr/share/sounds/ev3dev/mechanical/air_release.wav"
-    UH_OH = "/usr/share/sounds/ev3dev/expressions/uh-oh.wav"
-    YES = "/usr/share/sounds/ev3dev/communication/yes.wav"
-    CRUNCHING = "/usr/share/sounds/ev3dev/expressions/crunching.wav"
-    LAUGHING_1 = "/usr/share/sounds/ev3dev/expressions/laughing_1.wav"
-    SEARCHING = "/usr/share/sounds/ev3dev/information/searching.wav"
-    MORNING = "/usr/share/sounds/ev3dev/communication/morning.wav"
-    LAUGHING_2 = "/usr/share/sounds/ev3dev/expressions/laughing_2.wav"
-    START = "/usr/share/sounds/ev3dev/information/start.wav"
-    ELEPHANT_CALL = "/usr/share/sounds/ev3dev/animals/elephant_call.wav"
-    _BASE_PATH = "/usr/share/sounds/ev3dev/"
-    OKAY = "/usr/share/sounds/ev3dev/communication/okay.wav"
-    ACTIVATE = "/usr/share/sounds/ev3dev/information/activate.wav"
-    FANFARE = "/usr/share/sounds/ev3dev/expressions/fanfare.wav"
-    DOWN = "/usr/share/sounds/ev3dev/information/down.wav"
-    INSECT_CHIRP = "/usr/share/sounds/ev3dev/animals/insect_chirp.wav"
-    ERROR = "/usr/share/sounds/ev3dev/information/error.wav"
-    FANTASTIC = "/usr/share/sounds/ev3dev/communication/fantastic.wav"
-    BOO = "/usr/share/sounds/ev3dev/expressions/boo.wav"
-    HELLO = "/usr/share/sounds/ev3dev/communication/hello.wav"
-    YELLOW = "/usr/share/sounds/ev3dev/colors/yellow.wav"
-    T_REX_ROAR = "/usr/share/sounds/ev3dev/animals/t-rex_roar.wav"
-    INSECT_BUZZ_2 = "/usr/share/sounds/ev3dev/animals/insect_buzz_2.wav"
-    INSECT_BUZZ_1 = "/usr/share/sounds/ev3dev/animals/insect_buzz_1.wav"
-    SNAKE_RATTLE = "/usr/share/sounds/ev3dev/animals/snake_rattle.wav"
-    KUNG_FU = "/usr/share/sounds/ev3dev/expressions/kung_fu.wav"
-    GOOD = "/usr/share/sounds/ev3dev/communication/good.wav"
-    SPEED_DOWN = "/usr/share/sounds/ev3dev/movements/speed_down.wav"
-    STOP = "/usr/share/sounds/ev3dev/information/stop.wav"
-    DOG_BARK_2 = "/usr/share/sounds/ev3dev/animals/dog_bark_2.wav"
-    DOG_BARK_1 = "/usr/share/sounds/ev3dev/animals/dog_bark_1.wav"
-    GOOD_JOB = "/usr/share/sounds/ev3dev/communication/good_job.wav"
-    TICK_TACK = "/usr/share/sounds/ev3dev/mechanical/tick_tack.wav"
-    MOTOR_START = "/usr/share/sounds/ev3dev/mechanical/motor_start.wav"
-    MAGIC_WAND = "/usr/share/sounds/ev3dev/expressions/magic_wand.wav"
-    HORN_1 = "/usr/share/sounds/ev3dev/mechanical/horn_1.wav"
-    OUCH = "/usr/share/sounds/ev3dev/expressions/ouch.wav"
-    GO = "/usr/share/sounds/ev3dev/communication/go.wav"
-    HORN_2 = "/usr/share/sounds/ev3dev/mechanical/horn_2.wav"
-    SMACK = "/usr/share/sounds/ev3dev/expressions/smack.wav"
-    BROWN = "/usr/share/sounds/ev3dev/colors/brown.wav"
-    CHEERING = "/usr/share/sounds/ev3dev/expressions/cheering.wav"
-    NO = "/usr/share/sounds/ev3dev/communication/no.wav"
-    ONE = "/usr/share/sounds/ev3dev/numbers/one.wav"
-    TWO = "/usr/share/sounds/ev3dev/numbers/two.wav"
-    THREE = "/usr/share/sounds/ev3dev/numbers/three.wav"
-    ZERO = "/usr/share/sounds/ev3dev/numbers/zero.wav"
-    MOTOR_IDLE = "/usr/share/sounds/ev3dev/mechanical/motor_idle.wav"
-    NINE = "/usr/share/sounds/ev3dev/numbers/nine.wav"
-    READY = "/usr/share/sounds/ev3dev/system/ready.wav"
-    CONFIRM = "/usr/share/sounds/ev3dev/system/confirm.wav"
-    BACKING_ALERT = "/usr/share/sounds/ev3dev/mechanical/backing_alert.wav"
-    BACKWARDS = "/usr/share/sounds/ev3dev/information/backwards.wav"
-    SORRY = "/usr/share/sounds/ev3dev/communication/sorry.wav"
-    FORWARD = "/usr/share/sounds/ev3dev/information/forward.wav"
-    LEFT = "/usr/share/sounds/ev3dev/information/left.wav"
-    SNEEZING = "/usr/share/sounds/ev3dev/expressions/sneezing.wav"
-
-class ImageFileExt(Enum):
-
-    TIRED_MIDDLE = "/usr/share/images/ev3dev/mono/eyes/tired_middle.png"
-    FORWARD = "/usr/share/images/ev3dev/mono/information/forward.png"
-    TARGET = "/usr/share/images/ev3dev/mono/objects/target.png"
-    MIDDLE_LEFT = "/usr/share/images/ev3dev/mono/eyes/middle_left.png"
-    CRAZY_1 = "/usr/share/images/ev3dev/mono/eyes/crazy_1.png"
-    LEFT = "/usr/share/images/ev3dev/mono/information/left.png"
-    CRAZY_2 = "/usr/share/images/ev3dev/mono/eyes/crazy_2.png"
-    MIDDLE_RIGHT = "/usr/share/images/ev3dev/mono/eyes/middle_right.png"
-    AWAKE = "/usr/share/images/ev3dev/mono/eyes/awake.png"
-    UP = "/usr/share/images/ev3dev/mono/eyes/up.png"
-    PINCHED_RIGHT = "/usr/share/images/ev3dev/mono/eyes/pinched_right.png"
-    RIGHT = "/usr/share/images/ev3dev/mono/information/right.png"
-    BACKWARD = "/usr/share/images/ev3dev/mono/information/backward.png"
-    ANGRY = "/usr/share/images/ev3dev/mono/eyes/angry.png"
-    BOTTOM_LEFT = "/usr/share/images/ev3dev/mono/eyes/bottom_left.png"
-    KNOCKED_OUT = "/usr/share/images/ev3dev/mono/eyes/knocked_out.png"
-    EVIL = "/usr/share/images/ev3dev/mono/eyes/evil.png"
-    DECLINE = "/usr/share/images/ev3dev/mono/information/decline.png"
-    PINCHED_LEFT = "/usr/share/images/ev3dev/mono/eyes/pinched_left.png"
-    TIRED_LEFT = "/usr/share/images/ev3dev/mono/eyes/tired_left.png"
-    NO_GO = "/usr/share/images/ev3dev/mono/information/no_go.png"
-    EV3 = "/usr/share/images/ev3dev/mono/lego/ev3.png"
-    TIRED_RIGHT = "/usr/share/images/ev3dev/mono/eyes/tired_right.png"
-    _BASE_PATH = "/usr/share/images/ev3dev/mono/"
-    BOTTOM_RIGHT = "/usr/share/images/ev3dev/mono/eyes/bottom_right.png"
-    THUMBS_DOWN = "/usr/share/images/ev3dev/mono/information/thumbs_down.png"
-    NEUTRAL = "/usr/share/images/ev3dev/mono/eyes/neutral.png"
-    PINCHED_MIDDLE = "/usr/share/images/ev3dev/mono/eyes/pinched_middle.png"
-    SLEEPING = "/usr/share/images/ev3dev/mono/eyes/sleeping.png"
-    STOP_2 = "/usr/share/images/ev3dev/mono/information/stop_2.png"
-    STOP_1 = "/usr/share/images/ev3dev/mono/information/stop_1.png"
-    QUESTION_MARK = "/usr/share/images/ev3dev/mono/information/question_mark.png"
-    DIZZY = "/usr/share/images/ev3dev/mono/eyes/dizzy.png"
-    WARNING = "/usr/share/images/ev3dev/mono/information/warning.png"
-    EV3_ICON = "/usr/share/images/ev3dev/mono/lego/ev3_icon.png"
-    ACCEPT = "/usr/share/images/ev3dev/mono/information/accept.png"
-    WINKING = "/usr/share/images/ev3dev/mono/eyes/winking.png"
-    THUMBS_UP = "/usr/share/images/ev3dev/mono/information/thumbs_up.png"
-    DOWN = "/usr/share/images/ev3dev/mono/eyes/down.png"
-
 class ButtonExt(Enum):
 
     UP = 256
@@ -316,3 +255,31 @@ class AlignExt(Enum):
     BOTTOM_RIGHT = 3
     RIGHT = 6
     CENTER = 5
+
+_LAZY = {'SoundFileExt': 'files_ext', 'ImageFileExt': 'files_ext'}
+
+def __getattr__(name):
+    """
+    Loads the large path enums (SoundFileExt and ImageFileExt) from files_ext the
+    first time they are used rather than when parameters_ext is imported
+    """
+    if name == '_getattr_probe':
+        return True
+    if name not in _LAZY:
+        raise AttributeError("module 'parameters_ext' has no attribute '%s'" % name)
+    value = getattr(__import__(_LAZY[name]), name)
+    globals()[name] = value
+    return value
+
+def _module_getattr():
+    """
+    Checks whether this module's __getattr__ is used, MicroPython only supports it
+    from 1.12 in builds with MICROPY_MODULE_GETATTR enabled
+    """
+    try:
+        return getattr(sys.modules[__name__], '_getattr_probe') is True
+    except (AttributeError, KeyError):
+        return False
+
+if not _module_getattr():
+    from files_ext import ImageFileExt, SoundFileExt
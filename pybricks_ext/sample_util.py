@@ -0,0 +1,426 @@
+import threading
+from array import array
+
+from pybricks.tools import wait, StopWatch
+
+_buffers = {}
+_NAN = float('nan')
+
+def _to_float(value):
+    if value is None:
+        return _NAN
+    return float(value)
+
+def _from_float(value):
+    if value != value:
+        return None
+    return value
+
+def _typecode(value):
+    """
+    Array typecode to store a reading in, None for readings kept as they are
+    (bools, None, Color and lists)
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return 'l'
+    if isinstance(value, float):
+        return 'f'
+    return None
+
+class RingBuffer():
+    """Fixed size ring buffer of timestamped readings
+
+    Numbers are stored in an array, floats as float32 (None values are stored as
+    NaN and returned as None) and ints as they are. Anything else, such as bools,
+    Color values or lists, is kept as is in a list. If a reading doesn't fit the
+    array (e.g. None from an int reading), the buffer switches to a list. Readings
+    with more than one value (e.g. ColorSensor.rgb) are stored using a width greater than 1.
+
+    :param size: Maximum number of readings to hold
+    :type size: int
+    :param width: Number of values in each reading, defaults to 1
+    :type width: int, optional
+    :param typecode: Array typecode of the values ('f' or 'l'), None stores them in a list,
+                     defaults to 'f'
+    :type typecode: str, optional
+    """
+
+    def __init__(self, size, width=1, typecode='f'):
+        """
+        Initiate the RingBuffer Object
+        """
+        self.size = max(1, size)
+        self.width = max(1, width)
+        self.typecode = typecode
+        if typecode is None:
+            self._values = [None] * (self.size * self.width)
+        else:
+            self._values = array(typecode, [0] * (self.size * self.width))
+        self._times = array('l', [0] * self.size)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        """
+        Removes all readings from the buffer
+        """
+        self._head = 0
+        self._count = 0
+
+    def append(self, timestamp, value):
+        """Adds a reading to the buffer, overwriting the oldest reading when full
+
+        :param timestamp: Time (milliseconds) the reading was taken
+        :type timestamp: int
+        :param value: Reading to add, a tuple or list if the width is greater than 1
+        :type value: int, float, bool, tuple, list
+        """
+        index = self._head
+        try:
+            self._store(index, value)
+        except (TypeError, ValueError, OverflowError):
+            if self.typecode == 'f':
+                self._values = [_from_float(stored) for stored in self._values]
+            else:
+                self._values = list(self._values)
+            self.typecode = None
+            self._store(index, value)
+        self._times[index] = timestamp
+        self._head = (index + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def _store(self, index, value):
+        values = self._values
+        if self.width == 1:
+            if self.typecode == 'f':
+                value = _to_float(value)
+            values[index] = value
+            return
+        offset = index * self.width
+        for inner in range(self.width):
+            item = None if value is None else value[inner]
+            if self.typecode == 'f':
+                item = _to_float(item)
+            values[offset + inner] = item
+
+    def _get(self, index):
+        if self.width == 1:
+            if self.typecode == 'f':
+                return _from_float(self._values[index])
+            return self._values[index]
+        offset = index * self.width
+        if self.typecode == 'f':
+            return tuple(_from_float(self._values[offset + inner]) for inner in range(self.width))
+        return tuple(self._values[offset:offset + self.width])
+
+    def latest(self):
+        """Gets the newest reading in the buffer
+
+        :return: Newest reading, None if the buffer is empty
+        :rtype: int, float, tuple
+        """
+        if self._count == 0:
+            return None
+        return self._get((self._head - 1) % self.size)
+
+    def latest_timed(self):
+        """Gets the newest reading in the buffer along with its timestamp
+
+        :return: Newest reading in the form (timestamp, reading), (None, None) if the
+                 buffer is empty
+        :rtype: tuple
+        """
+        if self._count == 0:
+            return (None, None)
+        index = (self._head - 1) % self.size
+        return (self._times[index], self._get(index))
+
+    def window(self, number):
+        """Gets the newest readings in the buffer from oldest to newest
+
+        :param number: Number of readings to get, limited to the number held
+        :type number: int
+        :return: Readings from oldest to newest
+        :rtype: list
+        """
+        number = min(number, self._count)
+        start = self._head - number
+        return [self._get((start + index) % self.size) for index in range(number)]
+
+    def window_timed(self, number):
+        """Gets the newest readings in the buffer from oldest to newest with their timestamps
+
+        :param number: Number of readings to get, limited to the number held
+        :type number: int
+        :return: Readings from oldest to newest in the form (timestamp, reading)
+        :rtype: list
+        """
+        number = min(number, self._count)
+        start = self._head - number
+        result = []
+        for index in range(number):
+            index = (start + index) % self.size
+            result.append((self._times[index], self._get(index)))
+        return result
+
+class Sampler(threading.Thread):
+    """Background thread that reads registered sensors at a fixed rate into ring buffers
+
+    Only one read is made for each registered reading per sample period, no matter
+    how many parts of the program read the buffer. A reading that raises an error is
+    skipped for that period and counted in errors.
+
+    :param period: Sample period (milliseconds), defaults to 10
+    :type period: int, optional
+    """
+
+    def __init__(self, period=10):
+        """
+        Initiate the Sampler Object
+        """
+        super(Sampler, self).__init__()
+        self.period = period
+        self.stop = False
+        self.errors = 0
+        self._sources = []
+        self._lock = threading.Lock()
+        self._watch = StopWatch()
+
+    def register(self, device, reading=None, size=32, args=()):
+        """Registers a device reading to be sampled
+
+        :param device: Device to sample
+        :type device: object
+        :param reading: Name of the device method to sample, defaults to the
+                        sample_reading of the device
+        :type reading: str, optional
+        :param size: Number of readings to keep, defaults to 32
+        :type size: int, optional
+        :param args: Arguments passed to the reading method, defaults to ()
+        :type args: tuple, optional
+        :return: Buffer the readings are stored in
+        :rtype: RingBuffer
+        """
+        if reading is None:
+            reading = device.sample_reading
+        args = tuple(args)
+        key = (device, reading, args)
+        if key in _buffers:
+            return _buffers[key]
+        method = getattr(device, reading)
+        value = method(*args)
+        width = 1
+        typecode = _typecode(value)
+        if isinstance(value, tuple) and len(value) > 0:
+            width = len(value)
+            typecode = _typecode(value[0])
+            for item in value:
+                if _typecode(item) != typecode:
+                    typecode = None
+        buffer = RingBuffer(size, width, typecode)
+        buffer.append(self._watch.time(), value)
+        with self._lock:
+            self._sources = self._sources + [(method, args, buffer)]
+            _buffers[key] = buffer
+            if isinstance(device, SampledExt):
+                sampled = dict(device._sampled or {})
+                sampled[(reading, args)] = buffer
+                device._sampled = sampled
+        return buffer
+
+    def unregister(self, device, reading=None, args=()):
+        """Stops sampling a device reading
+
+        :param device: Device to stop sampling
+        :type device: object
+        :param reading: Name of the device method, defaults to the sample_reading of the device
+        :type reading: str, optional
+        :param args: Arguments passed to the reading method, defaults to ()
+        :type args: tuple, optional
+        """
+        if reading is None:
+            reading = device.sample_reading
+        args = tuple(args)
+        buffer = _buffers.pop((device, reading, args), None)
+        with self._lock:
+            self._sources = [source for source in self._sources if source[2] is not buffer]
+            if isinstance(device, SampledExt) and device._sampled:
+                sampled = dict(device._sampled)
+                sampled.pop((reading, args), None)
+                device._sampled = sampled
+
+    def run(self):
+        while not self.stop:
+            start = self._watch.time()
+            with self._lock:
+                sources = self._sources
+            for method, args, buffer in sources:
+                try:
+                    buffer.append(self._watch.time(), method(*args))
+                except Exception:
+                    self.errors += 1
+            remaining = self.period - (self._watch.time() - start)
+            if remaining > 0:
+                wait(remaining)
+
+    def kill(self):
+        self.stop = True
+
+def buffer_for(device, reading=None, args=()):
+    """Gets the buffer a device reading is being sampled into
+
+    :param device: Sampled device
+    :type device: object
+    :param reading: Name of the device method, defaults to the sample_reading of the device
+    :type reading: str, optional
+    :param args: Arguments passed to the reading method, defaults to ()
+    :type args: tuple, optional
+    :return: Buffer of readings, None if the reading is not being sampled
+    :rtype: RingBuffer
+    """
+    if reading is None:
+        reading = device.sample_reading
+    return _buffers.get((device, reading, tuple(args)))
+
+class SampledExt():
+    """
+    Mixin for the extension classes that serves readings from a Sampler buffer
+    instead of reading the device
+    """
+
+    sample_reading = None
+    _sampled = None
+
+    def latest(self, reading=None, args=()):
+        """Gets the newest sampled reading, reading the device directly if it is not sampled
+
+        :param reading: Name of the device method, defaults to the sample_reading of the device
+        :type reading: str, optional
+        :param args: Arguments passed to the reading method, defaults to ()
+        :type args: tuple, optional
+        :return: Newest reading
+        :rtype: int, float, tuple
+        """
+        if reading is None:
+            reading = self.sample_reading
+        if self._sampled:
+            buffer = self._sampled.get((reading, tuple(args)))
+            if buffer is not None:
+                return buffer.latest()
+        return getattr(self, reading)(*args)
+
+    def latest_timed(self, reading=None, args=()):
+        """Gets the newest sampled reading along with the time it was sampled
+
+        :param reading: Name of the device method, defaults to the sample_reading of the device
+        :type reading: str, optional
+        :param args: Arguments passed to the reading method, defaults to ()
+        :type args: tuple, optional
+        :return: Newest reading in the form (timestamp, reading), (None, None) if the reading is
+                 not being sampled
+        :rtype: tuple
+        """
+        buffer = buffer_for(self, reading, args)
+        if buffer is None:
+            return (None, None)
+        return buffer.latest_timed()
+
+    def window(self, number, reading=None, args=()):
+        """Gets the newest sampled readings from oldest to newest
+
+        :param number: Number of readings to get
+        :type number: int
+        :param reading: Name of the device method, defaults to the sample_reading of the device
+        :type reading: str, optional
+        :param args: Arguments passed to the reading method, defaults to ()
+        :type args: tuple, optional
+        :return: Readings from oldest to newest, empty if the reading is not being sampled
+        :rtype: list
+        """
+        buffer = buffer_for(self, reading, args)
+        if buffer is None:
+            return []
+        return buffer.window(number)
+
+class ExponentialFilter():
+    """Exponential moving average of a noisy reading
+
+    :param alpha: Weight of each new reading from just over 0 (heavy smoothing)
+                  to 1 (no smoothing), defaults to 0.5
+    :type alpha: float, optional
+    """
+
+    def __init__(self, alpha=0.5):
+        """
+        Initiate the ExponentialFilter Object
+        """
+        self.alpha = alpha
+        self.value = None
+
+    def reset(self):
+        """
+        Forgets the filtered value
+        """
+        self.value = None
+
+    def update(self, value):
+        """Adds a reading to the filter
+
+        :param value: New reading
+        :type value: int, float
+        :return: Filtered value
+        :rtype: float
+        """
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+class MovingAverage():
+    """Average of the last readings added, kept as a running total over a ring of values
+
+    :param size: Number of readings to average over
+    :type size: int
+    """
+
+    def __init__(self, size):
+        """
+        Initiate the MovingAverage Object
+        """
+        self.size = max(1, size)
+        self._values = array('f', [0] * self.size)
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all of the readings
+        """
+        self._head = 0
+        self._count = 0
+        self._total = 0
+        self.value = None
+
+    def update(self, value):
+        """Adds a reading to the average, replacing the oldest reading when full
+
+        :param value: New reading
+        :type value: int, float
+        :return: Average of the held readings
+        :rtype: float
+        """
+        if self._count == self.size:
+            self._total -= self._values[self._head]
+        else:
+            self._count += 1
+        self._values[self._head] = value
+        self._total += self._values[self._head]
+        self._head = (self._head + 1) % self.size
+        self.value = self._total / self._count
+        return self.value
@@ -0,0 +1,555 @@
+"""Simulated pybricks backend for running and benchmarking programs off the brick
+
+Calling install() registers stand-in pybricks, pybricks.ev3devices,
+pybricks.ev3brick, pybricks.parameters, pybricks.tools and uasyncio modules so
+that the extension modules can be imported and run unchanged on a workstation.
+It must be called before any of the extension modules are imported::
+
+    import sim_backend
+    sim_backend.install()
+
+    from ev3devices_ext import MotorExt
+
+All timing goes through a virtual clock. By default every wait() advances the
+clock straight away, which is deterministic and runs as fast as the host allows
+but is only suitable for single threaded programs, including async_util tasks
+(the uasyncio stand-in's sleep_ms advances the clock too). Programs that use
+threads (light patterns, samplers, sound queues) should use a speed factor
+instead, so that virtual time runs that many times faster than real time.
+"""
+import builtins
+import sys
+import threading
+import time
+from enum import Enum
+from math import exp
+
+class VirtualClock():
+    """Virtual clock shared by every simulated device
+
+    :param speed: How many times faster than real time the clock runs, None advances
+                  the clock on every wait instead, defaults to None
+    :type speed: int, float, optional
+    """
+
+    def __init__(self, speed=None):
+        """
+        Initiate the VirtualClock Object
+        """
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._now = 0.0
+        self._real_start = time.perf_counter()
+
+    def time(self):
+        """Gets the virtual time
+
+        :return: Virtual time (milliseconds) since the clock was created
+        :rtype: float
+        """
+        if self.speed is None:
+            return self._now
+        return (time.perf_counter() - self._real_start) * 1000 * self.speed
+
+    def wait(self, duration):
+        """Waits for an amount of virtual time
+
+        :param duration: Virtual time (milliseconds) to wait
+        :type duration: int, float
+        """
+        if duration <= 0:
+            return
+        if self.speed is None:
+            with self._lock:
+                self._now += duration
+        else:
+            time.sleep(duration / 1000 / self.speed)
+
+clock = VirtualClock()
+
+class Port(Enum):
+
+    A = 65
+    B = 66
+    C = 67
+    D = 68
+    S1 = 49
+    S2 = 50
+    S3 = 51
+    S4 = 52
+
+class Direction(Enum):
+
+    CLOCKWISE = 0
+    COUNTERCLOCKWISE = 1
+
+class Stop(Enum):
+
+    COAST = 0
+    BRAKE = 1
+    HOLD = 2
+
+class Color(Enum):
+
+    BLACK = 1
+    BLUE = 2
+    GREEN = 3
+    YELLOW = 4
+    RED = 5
+    WHITE = 6
+    BROWN = 7
+    ORANGE = 8
+    PURPLE = 9
+
+class Button(Enum):
+
+    LEFT_DOWN = 2
+    DOWN = 4
+    RIGHT_DOWN = 8
+    LEFT = 16
+    CENTER = 32
+    RIGHT = 64
+    LEFT_UP = 128
+    UP = 256
+    BEACON = 256
+    RIGHT_UP = 512
+
+class Align(Enum):
+
+    BOTTOM_LEFT = 1
+    BOTTOM = 2
+    BOTTOM_RIGHT = 3
+    LEFT = 4
+    CENTER = 5
+    RIGHT = 6
+    TOP_LEFT = 7
+    TOP = 8
+    TOP_RIGHT = 9
+
+class SoundFile():
+    pass
+
+class ImageFile():
+    pass
+
+def wait(duration):
+    clock.wait(duration)
+
+class StopWatch():
+    """
+    StopWatch running on the virtual clock
+    """
+
+    def __init__(self):
+        """
+        Initiate the StopWatch Object
+        """
+        self._start = clock.time()
+        self._paused = None
+
+    def time(self):
+        if self._paused is not None:
+            return int(self._paused - self._start)
+        return int(clock.time() - self._start)
+
+    def pause(self):
+        if self._paused is None:
+            self._paused = clock.time()
+
+    def resume(self):
+        if self._paused is not None:
+            self._start += clock.time() - self._paused
+            self._paused = None
+
+    def reset(self):
+        now = clock.time()
+        self._start = now
+        if self._paused is not None:
+            self._paused = now
+
+def _gear_ratio(gears):
+    if gears is None or len(gears) == 0:
+        return 1
+    if isinstance(gears[0], (list, tuple)):
+        ratio = 1
+        for train in gears:
+            ratio *= train[-1] / train[0]
+        return ratio
+    return gears[-1] / gears[0]
+
+class _SimDevice():
+    """
+    Base class for simulated devices with settable readings
+
+    Readings can be set to a value or to a callable taking the virtual time
+    (milliseconds) for scripted readings.
+    """
+
+    def __init__(self, port, **values):
+        self.port = port
+        self._values = values
+
+    def set(self, **values):
+        """
+        Sets readings of the device
+        """
+        self._values.update(values)
+
+    def _read(self, name):
+        value = self._values[name]
+        if callable(value):
+            return value(clock.time())
+        return value
+
+class Motor(_SimDevice):
+    """Simulated motor with first order speed dynamics
+
+    The speed approaches the commanded speed with a time constant, the angle is
+    the integral of the speed and the gear ratio is applied like the real Motor.
+
+    :param port: Port to which motor is connected
+    :type port: Port
+    :param direction: Direction of the positive motor speed, defaults to Direction.CLOCKWISE
+    :type direction: Direction, optional
+    :param gears: List of gears linked to the motor, defaults to None
+    :type gears: list, tuple, optional
+    """
+
+    max_speed = 1000
+    time_constant = 40
+    limits = None
+    stall_timeout = 5000
+
+    def __init__(self, port, direction=Direction.CLOCKWISE, gears=None):
+        """
+        Initiate the Motor Object
+        """
+        super(Motor, self).__init__(port)
+        self.direction = direction
+        self.gears = gears
+        self._ratio = _gear_ratio(gears)
+        self._sign = -1 if direction == Direction.COUNTERCLOCKWISE else 1
+        self._angle = 0.0
+        self._speed = 0.0
+        self._target = 0.0
+        self._stop_angle = None
+        self._stop_time = None
+        self._stop_type = Stop.COAST
+        self._stalled = False
+        self._updated = clock.time()
+
+    def _advance(self, duration):
+        if duration <= 0:
+            return
+        decay = exp(-duration / self.time_constant)
+        start = self._angle
+        self._angle += (self._target * duration / 1000
+                        + (self._speed - self._target) * self.time_constant / 1000 * (1 - decay))
+        self._speed = self._target + (self._speed - self._target) * decay
+        if self._stop_angle is not None:
+            crossed = (start - self._stop_angle) * (self._angle - self._stop_angle) <= 0
+            if crossed and self._angle != start:
+                self._angle = self._stop_angle
+                self._finish()
+        if self.limits is not None:
+            low, high = self.limits
+            if self._angle <= low or self._angle >= high:
+                self._angle = min(max(self._angle, low), high)
+                self._speed = 0.0
+                self._stalled = self._target != 0
+
+    def _finish(self):
+        self._target = 0.0
+        self._stop_angle = None
+        self._stop_time = None
+        if self._stop_type != Stop.COAST:
+            self._speed = 0.0
+
+    def _update(self):
+        now = clock.time()
+        if self._stop_time is not None and self._stop_time <= now:
+            self._advance(self._stop_time - self._updated)
+            self._updated = self._stop_time
+            self._finish()
+        self._advance(now - self._updated)
+        self._updated = now
+
+    def _command(self, speed, stop_type=Stop.COAST):
+        self._update()
+        speed = speed * self._ratio * self._sign
+        self._target = max(-self.max_speed, min(self.max_speed, speed))
+        self._stop_angle = None
+        self._stop_time = None
+        self._stop_type = stop_type
+        self._stalled = False
+
+    def _wait_done(self):
+        while self._stop_angle is not None or self._stop_time is not None:
+            clock.wait(1)
+            self._update()
+
+    def angle(self):
+        self._update()
+        return int(self._angle / self._ratio * self._sign)
+
+    def speed(self):
+        self._update()
+        return int(self._speed / self._ratio * self._sign)
+
+    def stalled(self):
+        self._update()
+        return self._stalled
+
+    def reset_angle(self, angle):
+        self._update()
+        self._angle = angle * self._ratio * self._sign
+
+    def stop(self, stop_type=Stop.COAST):
+        self._update()
+        self._stop_type = stop_type
+        self._finish()
+
+    def dc(self, duty):
+        self._command(self.max_speed * duty / 100 / self._ratio * self._sign)
+
+    def run(self, speed):
+        self._command(speed)
+
+    def run_time(self, speed, time, stop_type=Stop.COAST, wait=True):
+        self._command(speed, stop_type)
+        self._stop_time = self._updated + time
+        if wait:
+            self._wait_done()
+
+    def run_angle(self, speed, rotation_angle, stop_type=Stop.COAST, wait=True):
+        if rotation_angle < 0:
+            speed = -abs(speed)
+        else:
+            speed = abs(speed)
+        self._command(speed, stop_type)
+        self._stop_angle = self._angle + rotation_angle * self._ratio * self._sign
+        if wait:
+            self._wait_done()
+
+    def run_target(self, speed, target_angle, stop_type=Stop.COAST, wait=True):
+        self.run_angle(speed, target_angle - self.angle(), stop_type=stop_type, wait=wait)
+
+    def run_until_stalled(self, speed, stop_type=Stop.COAST, duty_limit=None):
+        self._command(speed, stop_type)
+        watch = StopWatch()
+        while not self.stalled() and watch.time() < self.stall_timeout:
+            clock.wait(1)
+        self.stop(stop_type)
+        return self.angle()
+
+    def track_target(self, target_angle):
+        self._command(0)
+        self._angle = target_angle * self._ratio * self._sign
+        self._speed = 0.0
+
+class TouchSensor(_SimDevice):
+
+    def __init__(self, port):
+        super(TouchSensor, self).__init__(port, pressed=False)
+
+    def pressed(self):
+        return self._read('pressed')
+
+class ColorSensor(_SimDevice):
+
+    def __init__(self, port):
+        super(ColorSensor, self).__init__(port, color=None, ambient=0, reflection=0,
+                                          rgb=(0, 0, 0))
+
+    def color(self):
+        return self._read('color')
+
+    def ambient(self):
+        return self._read('ambient')
+
+    def reflection(self):
+        return self._read('reflection')
+
+    def rgb(self):
+        return self._read('rgb')
+
+class InfraredSensor(_SimDevice):
+
+    def __init__(self, port):
+        super(InfraredSensor, self).__init__(port, distance=100, beacon=(None, None),
+                                             buttons=[])
+
+    def distance(self):
+        return self._read('distance')
+
+    def beacon(self, channel):
+        return self._read('beacon')
+
+    def buttons(self, channel):
+        return self._read('buttons')
+
+class UltrasonicSensor(_SimDevice):
+
+    def __init__(self, port):
+        super(UltrasonicSensor, self).__init__(port, distance=2550, presence=False)
+
+    def distance(self, silent=False):
+        return self._read('distance')
+
+    def presence(self):
+        return self._read('presence')
+
+class GyroSensor(_SimDevice):
+    """
+    Simulated gyro whose angle is the integral of its speed plus a constant bias
+    """
+
+    def __init__(self, port):
+        super(GyroSensor, self).__init__(port, speed=0, bias=0)
+        self._angle = 0.0
+        self._updated = clock.time()
+
+    def _update(self):
+        now = clock.time()
+        self._angle += (self._read('speed') + self._read('bias')) * (now - self._updated) / 1000
+        self._updated = now
+
+    def set(self, **values):
+        self._update()
+        super(GyroSensor, self).set(**values)
+
+    def speed(self):
+        self._update()
+        return int(self._read('speed') + self._read('bias'))
+
+    def angle(self):
+        self._update()
+        return int(self._angle)
+
+    def reset_angle(self, angle):
+        self._update()
+        self._angle = float(angle)
+
+class _Sound():
+
+    def __init__(self):
+        self.history = []
+
+    def beep(self, frequency=500, duration=100, volume=30):
+        self.history.append(('beep', frequency, duration, volume))
+        clock.wait(duration)
+
+    def beeps(self, number):
+        self.history.append(('beeps', number))
+        clock.wait(number * 200)
+
+    def file(self, file_name, volume=100):
+        self.history.append(('file', file_name, volume))
+        clock.wait(500)
+
+class _Display():
+
+    def __init__(self):
+        self.history = []
+
+    def clear(self):
+        self.history.append(('clear',))
+
+    def text(self, text, coordinate=None):
+        self.history.append(('text', text, coordinate))
+
+    def image(self, file_name, alignment=Align.CENTER, coordinate=None, clear=True):
+        self.history.append(('image', file_name, alignment, coordinate, clear))
+
+class _Battery():
+
+    def voltage(self):
+        return 7500
+
+    def current(self):
+        return 180
+
+class _Brick():
+
+    def __init__(self):
+        self.light_history = []
+        self.pressed = []
+        self.sound = _Sound()
+        self.display = _Display()
+        self.battery = _Battery()
+
+    def light(self, color):
+        self.light_history.append((clock.time(), color))
+
+    def buttons(self):
+        return list(self.pressed)
+
+brick = _Brick()
+
+class _AsyncioModule(type(sys)):
+    """
+    Stand-in for uasyncio that passes everything through to asyncio, imported the
+    first time it is used, apart from sleep_ms which sleeps on the virtual clock
+    """
+
+    def __init__(self):
+        """
+        Initiate the _AsyncioModule Object
+        """
+        super(_AsyncioModule, self).__init__('uasyncio')
+        self._sleepers = []
+
+    def __getattr__(self, name):
+        import asyncio
+        return getattr(asyncio, name)
+
+    async def sleep_ms(self, duration):
+        import asyncio
+        duration = max(0, duration)
+        if clock.speed is not None:
+            await asyncio.sleep(duration / 1000 / clock.speed)
+            return
+        # Every task sleeps here, so once the others have had a turn the clock can
+        # jump to the earliest wake time and concurrent sleeps overlap
+        wake = clock.time() + duration
+        self._sleepers.append(wake)
+        try:
+            await asyncio.sleep(0)
+            while clock.time() < wake:
+                clock.wait(min(self._sleepers) - clock.time())
+                await asyncio.sleep(0)
+        finally:
+            self._sleepers.remove(wake)
+
+def _module(name, **attributes):
+    module = type(sys)(name)
+    for key, value in attributes.items():
+        setattr(module, key, value)
+    sys.modules[name] = module
+    return module
+
+def install(speed=None):
+    """Registers the simulated pybricks modules
+
+    :param speed: How many times faster than real time the virtual clock runs, None
+                  advances the clock on every wait instead, defaults to None
+    :type speed: int, float, optional
+    :return: The virtual clock
+    :rtype: VirtualClock
+    """
+    clock.speed = speed
+    clock._now = 0.0
+    clock._real_start = time.perf_counter()
+    tools = _module('pybricks.tools', wait=wait, StopWatch=StopWatch, print=builtins.print)
+    parameters = _module('pybricks.parameters', Port=Port, Direction=Direction, Stop=Stop,
+                         Color=Color, Button=Button, Align=Align, SoundFile=SoundFile,
+                         ImageFile=ImageFile)
+    ev3devices = _module('pybricks.ev3devices', Motor=Motor, TouchSensor=TouchSensor,
+                         ColorSensor=ColorSensor, InfraredSensor=InfraredSensor,
+                         UltrasonicSensor=UltrasonicSensor, GyroSensor=GyroSensor)
+    ev3brick = _module('pybricks.ev3brick', light=brick.light, buttons=brick.buttons,
+                       sound=brick.sound, display=brick.display, battery=brick.battery)
+    _module('pybricks', tools=tools, parameters=parameters, ev3devices=ev3devices,
+            ev3brick=ev3brick)
+    sys.modules['uasyncio'] = _AsyncioModule()
+    return clock
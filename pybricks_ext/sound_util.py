@@ -0,0 +1,137 @@
+import os
+import threading
+
+_DIRECTORY = '/dev/shm/pybricks_ext_sounds'
+
+def sound_path(file_name):
+    """Gets the path of a sound file
+
+    :param file_name: Sound file
+    :type file_name: SoundFileExt, SoundFile, str
+    :return: Path of the sound file
+    :rtype: str
+    """
+    return getattr(file_name, 'value', file_name)
+
+class SoundCache():
+    """Least recently used cache of sound files held in memory
+
+    The device can only play sounds from a path, so preloaded files are copied
+    into a RAM backed (tmpfs) directory and played from there instead of being
+    read from the SD card each time. The total size of the copies is capped, the
+    least recently played files are removed to make room for new ones.
+
+    :param max_bytes: Maximum total size (bytes) of the cached files, defaults to 1 MiB
+    :type max_bytes: int, optional
+    :param directory: RAM backed directory to hold the cached files,
+                      defaults to '/dev/shm/pybricks_ext_sounds'
+    :type directory: str, optional
+    """
+
+    def __init__(self, max_bytes=1 << 20, directory=_DIRECTORY):
+        """
+        Initiate the SoundCache Object
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.size = 0
+        self._entries = {}
+        self._order = []
+        self._lock = threading.Lock()
+        try:
+            os.mkdir(directory)
+        except OSError:
+            pass
+
+    def __contains__(self, file_name):
+        return sound_path(file_name) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def preload(self, *file_names):
+        """Loads sound files into the cache, most important first
+
+        :return: Number of files that fit in the cache
+        :rtype: int
+        """
+        loaded = 0
+        for file_name in file_names:
+            if self.load(file_name) is not None:
+                loaded += 1
+        return loaded
+
+    def load(self, file_name):
+        """Loads a sound file into the cache if it isn't already
+
+        :param file_name: Sound file
+        :type file_name: SoundFileExt, SoundFile, str
+        :return: Path of the cached copy, None if the file is too large to cache
+        :rtype: str
+        """
+        source = sound_path(file_name)
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is not None:
+                self._touch(source)
+                return entry[0]
+        with open(source, 'rb') as sound_file:
+            data = sound_file.read()
+        if len(data) > self.max_bytes:
+            return None
+        target = self.directory + '/' + source.strip('/').replace('/', '_')
+        with self._lock:
+            if source in self._entries:
+                self._touch(source)
+                return self._entries[source][0]
+            while self.size + len(data) > self.max_bytes:
+                self._remove(self._order[0])
+            with open(target, 'wb') as cached_file:
+                cached_file.write(data)
+            self._entries[source] = (target, len(data))
+            self._order.append(source)
+            self.size += len(data)
+        return target
+
+    def path(self, file_name):
+        """Gets the path to play a sound file from, the cached copy if there is one
+
+        :param file_name: Sound file
+        :type file_name: SoundFileExt, SoundFile, str
+        :return: Path of the cached copy, or of the original file if it isn't cached
+        :rtype: str
+        """
+        source = sound_path(file_name)
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is None:
+                return source
+            self._touch(source)
+            return entry[0]
+
+    def evict(self, file_name=None):
+        """Removes a sound file from the cache
+
+        :param file_name: Sound file to remove, None removes every file, defaults to None
+        :type file_name: SoundFileExt, SoundFile, str, optional
+        """
+        with self._lock:
+            if file_name is None:
+                for source in list(self._order):
+                    self._remove(source)
+            elif sound_path(file_name) in self._entries:
+                self._remove(sound_path(file_name))
+
+    def _touch(self, source):
+        if self._order[-1] != source:
+            self._order.remove(source)
+            self._order.append(source)
+
+    def _remove(self, source):
+        target, size = self._entries.pop(source)
+        self._order.remove(source)
+        self.size -= size
+        try:
+            os.remove(target)
+        except OSError:
+            pass
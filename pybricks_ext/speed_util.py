@@ -1,3 +1,5 @@
+import sys
+from array import array
 from math import pi
 
 def float_percent(percent, min_percent=-100, max_percent=100):
@@ -152,3 +154,245 @@ def get_ratio(gears, depth=None):
             if current_depth > depth:
                 break
     return ratio
+
+def _numpy():
+    """
+    Gets numpy only if it is already loaded, an ndarray can't be passed in without it
+    being imported so this saves importing it at startup
+    """
+    return sys.modules.get('numpy')
+
+def _is_ndarray(values):
+    numpy = _numpy()
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+def _percent_range(min_percent, max_percent):
+    if min_percent > max_percent:
+        min_percent, max_percent = max_percent, min_percent
+    if min_percent <= 0 and max_percent >= 0:
+        default = 0
+    else:
+        default = (min_percent + max_percent) / 2
+    return min_percent, max_percent, default
+
+def _scaled_percents(percents, scale, min_percent, max_percent):
+    min_percent, max_percent, default = _percent_range(min_percent, max_percent)
+    if min_percent == max_percent:
+        if _is_ndarray(percents):
+            return _numpy().full(len(percents), min_percent * scale)
+        return array('f', [min_percent * scale]) * len(percents)
+    if _is_ndarray(percents):
+        return _numpy().clip(percents, min_percent, max_percent) * (scale / 100)
+    default = default * scale
+    scale = scale / 100
+    result = array('f', [0]) * len(percents)
+    for index, percent in enumerate(percents):
+        if percent is None or not isinstance(percent, (int, float)):
+            result[index] = default
+        elif percent > max_percent:
+            result[index] = max_percent * scale
+        elif percent < min_percent:
+            result[index] = min_percent * scale
+        else:
+            result[index] = percent * scale
+    return result
+
+def _scaled(values, scale):
+    if _is_ndarray(values):
+        return values * scale
+    result = array('f', values)
+    for index, value in enumerate(result):
+        result[index] = value * scale
+    return result
+
+def float_percent_batch(percents, min_percent=-100, max_percent=100):
+    """Converts a sequence of whole percentages to floating point percentages in one pass.
+
+    Works the same as float_percent for every element, NumPy arrays are clamped
+    and converted as a whole when NumPy is available.
+
+    :param percents: The percentages to convert
+    :type percents: list, tuple, array.array, numpy.ndarray
+    :param min_percent: Minimum percentage to accept, defaults to -100
+    :type min_percent: int, float, optional
+    :param max_percent: Maximum percentage to accept, defaults to 100
+    :type max_percent: int, float, optional
+    :return: The floating point percentages
+    :rtype: array.array, numpy.ndarray
+    """
+    return _scaled_percents(percents, 1, min_percent, max_percent)
+
+def speed_mm_batch(percents, rpm=160, wheel_diam=56, min_percent=-100, max_percent=100):
+    """Translates a sequence of speeds in percentage to speeds in mm/s in one pass.
+
+    :param percents: Speeds to get (in %)
+    :type percents: list, tuple, array.array, numpy.ndarray
+    :param rpm: RPM of motor, defaults to 160
+    :type rpm: int, optional
+    :param wheel_diam: Diameter of wheels in mm, defaults to 56
+    :type wheel_diam: int, float, optional
+    :param min_percent: Minimum precentage, defaults to -100
+    :type min_percent: int, float, optional
+    :param max_percent: Maximum percentage, defaults to 100
+    :type max_percent: int, float, optional
+    :return: Speeds in mm/s
+    :rtype: array.array, numpy.ndarray
+    """
+    return SpeedConverter(rpm, wheel_diam, min_percent, max_percent).mm_batch(percents)
+
+def speed_deg_batch(percents, rpm=240, min_percent=-100, max_percent=100):
+    """Translates a sequence of speeds in percentage to speeds in deg/s in one pass.
+
+    :param percents: Speeds to get (in %)
+    :type percents: list, tuple, array.array, numpy.ndarray
+    :param rpm: RPM of motor, defaults to 240
+    :type rpm: int, optional
+    :param min_percent: Minimum precentage, defaults to -100
+    :type min_percent: int, float, optional
+    :param max_percent: Maximum percentage, defaults to 100
+    :type max_percent: int, float, optional
+    :return: Speeds in deg/s
+    :rtype: array.array, numpy.ndarray
+    """
+    return SpeedConverter(rpm, min_percent=min_percent, max_percent=max_percent).deg_batch(percents)
+
+def speed_mm_deg_batch(speeds, wheel_diam=56):
+    """Translates a sequence of speeds in mm/s to speeds in deg/s in one pass
+
+    :param speeds: Speeds to translate (in mm/s)
+    :type speeds: list, tuple, array.array, numpy.ndarray
+    :param wheel_diam: Diameter of the wheels in MM, defaults to 56
+    :type wheel_diam: int, float, optional
+    :return: Speeds in deg/s
+    :rtype: array.array, numpy.ndarray
+    """
+    return _scaled(speeds, 360 / (wheel_diam * pi))
+
+def speed_deg_mm_batch(speeds, wheel_diam=56):
+    """Translates a sequence of speeds in deg/s to speeds in mm/s in one pass
+
+    :param speeds: Speeds to translate (in deg/s)
+    :type speeds: list, tuple, array.array, numpy.ndarray
+    :param wheel_diam: Diameter of the wheels in MM, defaults to 56
+    :type wheel_diam: int, float, optional
+    :return: Speeds in mm/s
+    :rtype: array.array, numpy.ndarray
+    """
+    return _scaled(speeds, (wheel_diam * pi) / 360)
+
+class SpeedConverter():
+    """Speed converter that calculates the motor and wheel constants once
+
+    Gives the same results as speed_mm, speed_deg, speed_mm_deg and speed_deg_mm
+    without redoing the constant maths on every call, along with batch versions
+    of each conversion.
+
+    Medium Motor    - 240 RPM
+    Large Motor     - 160 RPM
+    Lego EV3 Wheels - 56 MM
+
+    :param rpm: RPM of motor, defaults to 160
+    :type rpm: int, optional
+    :param wheel_diam: Diameter of wheels in mm, defaults to 56
+    :type wheel_diam: int, float, optional
+    :param min_percent: Minimum precentage, defaults to -100
+    :type min_percent: int, float, optional
+    :param max_percent: Maximum percentage, defaults to 100
+    :type max_percent: int, float, optional
+    """
+
+    def __init__(self, rpm=160, wheel_diam=56, min_percent=-100, max_percent=100):
+        """
+        Initiate the SpeedConverter Object
+        """
+        self.rpm = rpm
+        self.wheel_diam = wheel_diam
+        self.min_percent = min_percent
+        self.max_percent = max_percent
+        self.max_mm = (rpm / 60) * (wheel_diam * pi)
+        self.max_deg = (rpm / 60) * 360
+        self.mm_per_deg = (wheel_diam * pi) / 360
+        self.deg_per_mm = 360 / (wheel_diam * pi)
+
+    def mm(self, percent):
+        """Translates speed in percentage to speed in mm/s
+
+        :param percent: Speed to get (in %)
+        :type percent: int, float
+        :return: Speed in mm/s
+        :rtype: int, float
+        """
+        return self.max_mm * float_percent(percent, self.min_percent, self.max_percent)
+
+    def deg(self, percent):
+        """Translates speed in percentage to speed in deg/s
+
+        :param percent: Speed to get (in %)
+        :type percent: int, float
+        :return: Speed in deg/s
+        :rtype: int, float
+        """
+        return self.max_deg * float_percent(percent, self.min_percent, self.max_percent)
+
+    def mm_deg(self, speed):
+        """Translates speed in mm/s to speed in deg/s
+
+        :param speed: Speed to translate (in mm/s)
+        :type speed: int, float
+        :return: Speed in deg/s
+        :rtype: int, float
+        """
+        return speed * self.deg_per_mm
+
+    def deg_mm(self, speed):
+        """Translates speed in deg/s to speed in mm/s
+
+        :param speed: Speed to translate (in deg/s)
+        :type speed: int, float
+        :return: Speed in mm/s
+        :rtype: int, float
+        """
+        return speed * self.mm_per_deg
+
+    def mm_batch(self, percents):
+        """Translates a sequence of speeds in percentage to speeds in mm/s in one pass
+
+        :param percents: Speeds to get (in %)
+        :type percents: list, tuple, array.array, numpy.ndarray
+        :return: Speeds in mm/s
+        :rtype: array.array, numpy.ndarray
+        """
+        return self._percent_batch(percents, self.max_mm)
+
+    def deg_batch(self, percents):
+        """Translates a sequence of speeds in percentage to speeds in deg/s in one pass
+
+        :param percents: Speeds to get (in %)
+        :type percents: list, tuple, array.array, numpy.ndarray
+        :return: Speeds in deg/s
+        :rtype: array.array, numpy.ndarray
+        """
+        return self._percent_batch(percents, self.max_deg)
+
+    def mm_deg_batch(self, speeds):
+        """Translates a sequence of speeds in mm/s to speeds in deg/s in one pass
+
+        :param speeds: Speeds to translate (in mm/s)
+        :type speeds: list, tuple, array.array, numpy.ndarray
+        :return: Speeds in deg/s
+        :rtype: array.array, numpy.ndarray
+        """
+        return _scaled(speeds, self.deg_per_mm)
+
+    def deg_mm_batch(self, speeds):
+        """Translates a sequence of speeds in deg/s to speeds in mm/s in one pass
+
+        :param speeds: Speeds to translate (in deg/s)
+        :type speeds: list, tuple, array.array, numpy.ndarray
+        :return: Speeds in mm/s
+        :rtype: array.array, numpy.ndarray
+        """
+        return _scaled(speeds, self.mm_per_deg)
+
+    def _percent_batch(self, percents, max_speed):
+        return _scaled_percents(percents, max_speed, self.min_percent, self.max_percent)
@@ -0,0 +1,100 @@
+"""Reads telemetry logs written by telemetry_util.TelemetryLogger
+
+This module doesn't depend on pybricks so that logs can be copied off the
+brick and analysed on a desktop. The log format is a header followed by fixed
+size little endian records:
+
+    header   b'TLM1', channel count (uint16), then for each channel the name
+             length (uint8) and UTF-8 name
+    record   time in milliseconds (uint32) followed by each channel value (float32)
+"""
+import struct
+
+MAGIC = b'TLM1'
+
+def record_format(count):
+    """Gets the struct format of a record
+
+    :param count: Number of channels
+    :type count: int
+    :return: struct format string
+    :rtype: str
+    """
+    return '<I' + 'f' * count
+
+def pack_header(names):
+    """Packs the header of a log
+
+    :param names: Name of each channel
+    :type names: list, tuple
+    :return: Header bytes
+    :rtype: bytes
+    """
+    header = bytearray(MAGIC)
+    header.extend(struct.pack('<H', len(names)))
+    for name in names:
+        encoded = name.encode('utf-8')[:255]
+        header.append(len(encoded))
+        header.extend(encoded)
+    return bytes(header)
+
+def read_header(path):
+    """Reads the header of a log
+
+    :param path: Path of the log
+    :type path: str
+    :return: Channel names and the size of the header (bytes) in the form (names, size)
+    :rtype: tuple
+    """
+    with open(path, 'rb') as log_file:
+        data = log_file.read(6)
+        if data[:4] != MAGIC:
+            raise ValueError('not a telemetry log')
+        names = []
+        size = 6
+        for _ in range(struct.unpack('<H', data[4:6])[0]):
+            length = log_file.read(1)[0]
+            names.append(log_file.read(length).decode('utf-8'))
+            size += 1 + length
+    return names, size
+
+def iter_records(path):
+    """Iterates over the records of a log without loading it all into memory
+
+    :param path: Path of the log
+    :type path: str
+    :return: Records in the form (time, value, value, ...)
+    :rtype: generator
+    """
+    names, offset = read_header(path)
+    record = record_format(len(names))
+    size = struct.calcsize(record)
+    with open(path, 'rb') as log_file:
+        log_file.seek(offset)
+        while True:
+            data = log_file.read(size)
+            if len(data) < size:
+                return
+            yield struct.unpack(record, data)
+
+def load(path):
+    """Loads a log as a read only memory mapped numpy structured array
+
+    Each channel is a field named after the channel, along with a 'time' field, e.g.
+    ``log = load('run.tlm'); plot(log['time'], log['GyroSensorExt.angle'])``.
+    Requires numpy.
+
+    :param path: Path of the log
+    :type path: str
+    :return: Records of the log
+    :rtype: numpy.memmap
+    """
+    import numpy
+    names, offset = read_header(path)
+    dtype = numpy.dtype([('time', '<u4')] + [(name, '<f4') for name in names])
+    with open(path, 'rb') as log_file:
+        log_file.seek(0, 2)
+        count = (log_file.tell() - offset) // dtype.itemsize
+    if count == 0:
+        return numpy.zeros(0, dtype=dtype)
+    return numpy.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
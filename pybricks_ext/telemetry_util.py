@@ -0,0 +1,282 @@
+import struct
+import threading
+
+from pybricks.tools import wait, StopWatch
+
+from sample_util import SampledExt, buffer_for
+from telemetry_reader import pack_header, record_format
+
+_NAN = float('nan')
+
+class Channel():
+    """One value recorded in every telemetry record
+
+    :param device: Device to read, None if reading is a function
+    :type device: object
+    :param reading: Name of the device method to read (e.g. 'angle'), or a function
+                    taking no arguments
+    :type reading: str, function
+    :param name: Name of the channel in the log, defaults to '<device class>.<reading>'
+    :type name: str, optional
+    :param args: Arguments passed to the reading method, defaults to ()
+    :type args: tuple, optional
+    :param index: Element to record if the reading is a tuple (e.g. 0 for the red value of rgb),
+                  defaults to None
+    :type index: int, optional
+    """
+
+    def __init__(self, device, reading, name=None, args=(), index=None):
+        """
+        Initiate the Channel Object
+        """
+        self.device = device
+        self.reading = reading
+        self.args = tuple(args)
+        self.index = index
+        if name is None:
+            if callable(reading):
+                name = getattr(reading, '__name__', 'value')
+            else:
+                name = '%s.%s' % (type(device).__name__, reading)
+            if index is not None:
+                name = '%s[%d]' % (name, index)
+        self.name = name
+
+    def reader(self):
+        """Gets a function that takes the reading, using the Sampler buffer if the
+        device reading is being sampled
+
+        :return: Function taking no arguments that returns the value
+        :rtype: function
+        """
+        if callable(self.reading):
+            read = self.reading
+        else:
+            buffer = None
+            if isinstance(self.device, SampledExt):
+                buffer = buffer_for(self.device, self.reading, self.args)
+            if buffer is not None:
+                read = buffer.latest
+            elif len(self.args) > 0:
+                method = getattr(self.device, self.reading)
+                args = self.args
+
+                def read():
+                    return method(*args)
+            else:
+                read = getattr(self.device, self.reading)
+        if self.index is None:
+            return read
+        index = self.index
+
+        def element():
+            value = read()
+            if value is None:
+                return None
+            return value[index]
+        return element
+
+class TelemetryLogger(threading.Thread):
+    """Records device readings into a binary log file without slowing the control loop
+
+    Each call to sample reads every channel once and packs the values with a
+    timestamp into a fixed size record in a preallocated block of memory. Full
+    blocks are written to the file in one go by this background thread, so a
+    sample costs microseconds and never waits on the SD card. If the writer falls
+    behind and every block is full, samples are dropped (and counted) rather than
+    blocking. Logs can be read on a desktop with telemetry_reader.
+
+    e.g.::
+
+        logger = TelemetryLogger('run.tlm')
+        logger.add_channel(left, 'angle')
+        logger.add_channel(gyro, 'angle')
+        logger.start()
+        while driving:
+            logger.sample()
+            ...
+        logger.close()
+
+    :param path: Path of the log file, overwritten if it exists
+    :type path: str
+    :param channels: Channels to record, either Channel objects or tuples of Channel
+                     arguments (device, reading, name, args, index), defaults to ()
+    :type channels: list, tuple, optional
+    :param block_records: Number of records in each block written to the file, defaults to 512
+    :type block_records: int, optional
+    :param blocks: Number of blocks to fill while earlier blocks are written, defaults to 4
+    :type blocks: int, optional
+    :param interval: Time (milliseconds) between checks for full blocks, defaults to 50
+    :type interval: int, optional
+    """
+
+    def __init__(self, path, channels=(), block_records=512, blocks=4, interval=50):
+        """
+        Initiate the TelemetryLogger Object
+        """
+        super(TelemetryLogger, self).__init__()
+        self.path = path
+        self.block_records = max(1, block_records)
+        self.blocks = max(2, blocks)
+        self.interval = interval
+        self.channels = []
+        self.stop = False
+        self.records = 0
+        self.dropped = 0
+        self._watch = StopWatch()
+        self._file = None
+        self._lock = threading.Lock()
+        self._free = []
+        self._full = []
+        self._block = None
+        self._offset = 0
+        self._reads = []
+        self._values = []
+        self._format = None
+        self._size = 0
+        for channel in channels:
+            if not isinstance(channel, Channel):
+                channel = Channel(*channel)
+            self._add(channel)
+
+    def _add(self, channel):
+        if self._file is not None:
+            raise RuntimeError('channels must be added before the logger is started')
+        names = [existing.name for existing in self.channels]
+        name = channel.name
+        number = 2
+        while name in names:
+            name = '%s_%d' % (channel.name, number)
+            number += 1
+        channel.name = name
+        self.channels.append(channel)
+
+    def add_channel(self, device, reading, name=None, args=(), index=None):
+        """Adds a value to record, channels can only be added before the logger is started
+
+        :param device: Device to read, None if reading is a function
+        :type device: object
+        :param reading: Name of the device method to read (e.g. 'angle'), or a function
+                        taking no arguments
+        :type reading: str, function
+        :param name: Name of the channel in the log, defaults to '<device class>.<reading>'
+        :type name: str, optional
+        :param args: Arguments passed to the reading method, defaults to ()
+        :type args: tuple, optional
+        :param index: Element to record if the reading is a tuple, defaults to None
+        :type index: int, optional
+        :return: Channel that was added
+        :rtype: Channel
+        """
+        channel = Channel(device, reading, name, args, index)
+        self._add(channel)
+        return channel
+
+    def open(self):
+        """
+        Creates the log file and allocates the blocks, start does this if it hasn't been done
+        """
+        self._format = record_format(len(self.channels))
+        self._size = struct.calcsize(self._format)
+        self._reads = [channel.reader() for channel in self.channels]
+        self._values = [0.0] * len(self.channels)
+        self._free = [bytearray(self._size * self.block_records) for _ in range(self.blocks)]
+        self._block = self._free.pop()
+        self._offset = 0
+        self._file = open(self.path, 'wb')
+        self._file.write(pack_header([channel.name for channel in self.channels]))
+        self._watch.reset()
+
+    def start(self):
+        """
+        Starts the writer thread, creating the log file first if needed
+        """
+        if self._file is None:
+            self.open()
+        super(TelemetryLogger, self).start()
+
+    def time(self):
+        """Gets the time recorded in the next sample
+
+        :return: Time since the logger was started (milliseconds)
+        :rtype: int
+        """
+        return int(self._watch.time())
+
+    def sample(self):
+        """Reads every channel once and records the values, None values are recorded as NaN
+
+        :return: Whether the sample was recorded, False if it was dropped
+        :rtype: bool
+        """
+        block = self._block
+        if block is None:
+            block = self._next_block()
+            if block is None:
+                self.dropped += 1
+                return False
+        values = self._values
+        index = 0
+        for read in self._reads:
+            value = read()
+            values[index] = _NAN if value is None else value
+            index += 1
+        struct.pack_into(self._format, block, self._offset, int(self._watch.time()), *values)
+        self._offset += self._size
+        self.records += 1
+        if self._offset >= len(block):
+            with self._lock:
+                self._full.append((block, self._offset))
+            self._block = None
+        return True
+
+    def _next_block(self):
+        with self._lock:
+            if len(self._free) == 0:
+                return None
+            self._block = self._free.pop()
+        self._offset = 0
+        return self._block
+
+    def flush(self):
+        """
+        Hands the records sampled so far to the writer thread, even if their block isn't full
+        """
+        if self._block is not None and self._offset > 0:
+            with self._lock:
+                self._full.append((self._block, self._offset))
+            self._block = None
+
+    def write(self):
+        """
+        Writes every full block to the log file now, which the writer thread does every
+        interval. Programs that don't start the thread can call this when they have time
+        """
+        while True:
+            with self._lock:
+                if len(self._full) == 0:
+                    return
+                block, length = self._full.pop(0)
+            self._file.write(memoryview(block)[:length])
+            with self._lock:
+                self._free.append(block)
+
+    def run(self):
+        while not self.stop:
+            self.write()
+            wait(self.interval)
+
+    def kill(self):
+        self.stop = True
+
+    def close(self):
+        """
+        Writes every remaining record, stops the writer thread and closes the log file
+        """
+        self.flush()
+        self.kill()
+        if self.is_alive():
+            self.join()
+        if self._file is not None:
+            self.write()
+            self._file.close()
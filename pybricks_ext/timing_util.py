@@ -0,0 +1,192 @@
+from pybricks.tools import wait, StopWatch
+
+_SPIN_CHECKS = 2000
+
+def sleep_until(watch, deadline, spin=1):
+    """Sleeps until the time of a StopWatch reaches a value, then checks continuously
+    for the last part so the value isn't overshot by the coarseness of wait. If the
+    time doesn't move while checking (a paused StopWatch or a simulated clock) the rest
+    of the time is slept instead
+
+    :param watch: StopWatch to check
+    :type watch: StopWatch
+    :param deadline: Time value of the StopWatch to wait for
+    :type deadline: int, float
+    :param spin: Time (milliseconds) before the deadline to stop sleeping, defaults to 1
+    :type spin: int, optional
+    :return: Time (milliseconds) the deadline was passed by
+    :rtype: int, float
+    """
+    remaining = deadline - watch.time()
+    if remaining > spin:
+        wait(int(remaining - spin))
+    now = watch.time()
+    checks = 0
+    while now < deadline:
+        last = now
+        now = watch.time()
+        if now != last:
+            checks = 0
+        elif checks < _SPIN_CHECKS:
+            checks += 1
+        else:
+            wait(int(deadline - now) + 1)
+            now = watch.time()
+    return now - deadline
+
+class LoopStats():
+    """
+    Statistics of the measured period of a fixed rate loop
+    """
+
+    def __init__(self):
+        """
+        Initiate the LoopStats Object
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all of the statistics
+        """
+        self.count = 0
+        self.total = 0
+        self.total_squares = 0
+        self.min_period = None
+        self.max_period = None
+        self.overruns = 0
+
+    def add(self, period, target):
+        """Records the measured period of one iteration
+
+        :param period: Measured period (milliseconds)
+        :type period: int, float
+        :param target: Target period (milliseconds)
+        :type target: int, float
+        """
+        self.count += 1
+        self.total += period
+        self.total_squares += period * period
+        if self.min_period is None or period < self.min_period:
+            self.min_period = period
+        if self.max_period is None or period > self.max_period:
+            self.max_period = period
+        if period > target:
+            self.overruns += 1
+
+    def mean(self):
+        """Gets the mean period
+
+        :return: Mean period (milliseconds), None if nothing has been recorded
+        :rtype: float
+        """
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def jitter(self):
+        """Gets the standard deviation of the period
+
+        :return: Standard deviation (milliseconds), None if nothing has been recorded
+        :rtype: float
+        """
+        if self.count == 0:
+            return None
+        mean = self.total / self.count
+        return max(0, self.total_squares / self.count - mean * mean) ** 0.5
+
+class Ticker():
+    """Periodic timer for fixed rate loops that doesn't drift
+
+    Each wait sleeps until the next absolute deadline (a whole number of periods
+    after the ticker was reset) rather than for a fixed time, so the time spent
+    in the loop doesn't add to the period, and spins for the final millisecond
+    so the deadline isn't overshot. If the loop overruns by a whole period or
+    more, the missed ticks are skipped (and counted) instead of running in a
+    burst to catch up. The measured period of every tick is recorded in stats.
+
+    e.g.::
+
+        ticker = Ticker(10)
+        while True:
+            control()
+            ticker.wait()
+
+    :param period: Period (milliseconds)
+    :type period: int, float
+    :param spin: Time (milliseconds) before each deadline to stop sleeping and check
+                 continuously, defaults to 1
+    :type spin: int, optional
+    """
+
+    def __init__(self, period, spin=1):
+        """
+        Initiate the Ticker Object
+        """
+        self.period = period
+        self.spin = spin
+        self.stats = LoopStats()
+        self._watch = StopWatch()
+        self.reset()
+
+    def reset(self):
+        """
+        Starts counting periods again from now and clears the statistics
+        """
+        self._watch.reset()
+        self._watch.resume()
+        self.deadline = self.period
+        self.missed = 0
+        self.late = 0
+        self._last = 0
+        self.stats.reset()
+
+    def time(self):
+        """Gets the time since the ticker was reset
+
+        :return: Time (milliseconds)
+        :rtype: int
+        """
+        return self._watch.time()
+
+    def wait(self):
+        """Sleeps until the next tick
+
+        :return: Time (milliseconds) the tick was late by, 0 unless the loop overran
+        :rtype: int, float
+        """
+        late = sleep_until(self._watch, self.deadline, self.spin)
+        now = self.deadline + late
+        self.stats.add(now - self._last, self.period)
+        self._last = now
+        self.late = late
+        if late >= self.period:
+            skipped = late // self.period
+            self.missed += int(skipped)
+            self.deadline += skipped * self.period
+        self.deadline += self.period
+        return late
+
+class Rate(Ticker):
+    """Ticker given as a frequency
+
+    :param frequency: Number of ticks per second
+    :type frequency: int, float
+    :param spin: Time (milliseconds) before each deadline to stop sleeping and check
+                 continuously, defaults to 1
+    :type spin: int, optional
+    """
+
+    def __init__(self, frequency, spin=1):
+        """
+        Initiate the Rate Object
+        """
+        super(Rate, self).__init__(1000 / frequency, spin)
+
+    def sleep(self):
+        """Sleeps until the next tick
+
+        :return: Time (milliseconds) the tick was late by, 0 unless the loop overran
+        :rtype: int, float
+        """
+        return self.wait()
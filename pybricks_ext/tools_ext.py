@@ -1,10 +1,237 @@
 import sys
+import threading
 
 import pybricks
 from pybricks.tools import StopWatch
 
-def print(*value, sep=' ', end='\n', file=sys.stdout, flush=False):
-    pybricks.tools.print(value, sep=sep, end=end, file=file, flush=flush)
+from async_util import until_time_passes
+from timing_util import sleep_until
+# Re-exported so programs written before timing_util existed keep importing them from here
+from timing_util import LoopStats, Rate, Ticker  # pylint: disable=unused-import
+
+_console = None
+
+def _call_site(value, depth):
+    """
+    Key identifying where print was called from, the calling line where frames can be
+    inspected and the first printed value (usually a fixed label) where they can't
+    """
+    if hasattr(sys, '_getframe'):
+        frame = sys._getframe(depth)
+        return (frame.f_code, frame.f_lineno)
+    if len(value) > 0 and isinstance(value[0], str):
+        return value[0]
+    return None
+
+class Console(threading.Thread):
+    """Console output that keeps printing from slowing down the program
+
+    Lines from the same call site can be rate limited, anything over the limit is
+    skipped and counted in suppressed. While buffering (once the thread is started),
+    printed lines are held in memory and written to the console in batches by this
+    background thread, so print only formats the line. When the buffer is full new
+    lines are dropped and counted in dropped, and a note of how many were lost is
+    written with the next batch.
+
+    :param size: Maximum number of lines waiting to be written, defaults to 64
+    :type size: int, optional
+    :param interval: Time (milliseconds) between batches, defaults to 100
+    :type interval: int, optional
+    :param rate: Maximum number of lines per second from each call site, None is unlimited,
+                 defaults to None
+    :type rate: int, float, optional
+    """
+
+    def __init__(self, size=64, interval=100, rate=None):
+        """
+        Initiate the Console Object
+        """
+        super(Console, self).__init__()
+        self.size = max(1, size)
+        self.interval = interval
+        self.rate = rate
+        self.stop = False
+        self.buffering = False
+        self.dropped = 0
+        self.suppressed = 0
+        self._reported = 0
+        self._lines = []
+        self._last = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._watch = StopWatch()
+
+    def allow(self, key, rate=None):
+        """Checks if a call site is under its rate limit, counting it as printed if it is
+
+        :param key: Call site
+        :type key: object
+        :param rate: Maximum number of lines per second, defaults to the rate of the console
+        :type rate: int, float, optional
+        :return: Whether the line should be printed
+        :rtype: bool
+        """
+        if rate is None:
+            rate = self.rate
+        if rate is None:
+            return True
+        now = self._watch.time()
+        last = self._last.get(key)
+        if last is not None and (now - last) * rate < 1000:
+            self.suppressed += 1
+            return False
+        self._last[key] = now
+        return True
+
+    def print(self, *value, sep=' ', end='\n', file=sys.stdout, flush=False, rate=None, key=None):
+        """Prints values, buffered if the console has been started
+
+        :param rate: Maximum number of lines per second from this call site, defaults to the
+                     rate of the console
+        :type rate: int, float, optional
+        :param key: Call site to rate limit by, defaults to the line print was called from
+        :type key: object, optional
+        :return: Whether the line was printed (or buffered)
+        :rtype: bool
+        """
+        if rate is not None or self.rate is not None:
+            if key is None:
+                key = _call_site(value, 2)
+            if not self.allow(key, rate):
+                return False
+        if not self.buffering:
+            pybricks.tools.print(*value, sep=sep, end=end, file=file, flush=flush)
+            return True
+        queued = self.write(sep.join([str(item) for item in value]) + end, file)
+        if flush:
+            self.flush()
+        return queued
+
+    def write(self, text, file=sys.stdout):
+        """Adds text to the buffer without formatting or rate limiting
+
+        :param text: Text to write
+        :type text: str
+        :param file: File to write to, defaults to sys.stdout
+        :type file: object, optional
+        :return: Whether the text was buffered, False if it was dropped
+        :rtype: bool
+        """
+        with self._lock:
+            if len(self._lines) >= self.size:
+                self.dropped += 1
+                return False
+            self._lines.append((file, text))
+        return True
+
+    def pending(self):
+        """Gets the number of lines waiting to be written
+
+        :return: Number of lines
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._lines)
+
+    def flush(self):
+        """
+        Writes every buffered line now, from the calling thread
+        """
+        with self._write_lock:
+            with self._lock:
+                lines = self._lines
+                self._lines = []
+                dropped = self.dropped - self._reported
+                self._reported = self.dropped
+            start = 0
+            while start < len(lines):
+                file = lines[start][0]
+                stop = start + 1
+                while stop < len(lines) and lines[stop][0] is file:
+                    stop += 1
+                pybricks.tools.print(''.join([line[1] for line in lines[start:stop]]),
+                                     end='', file=file)
+                start = stop
+            if dropped > 0:
+                pybricks.tools.print('[console] %d lines dropped' % dropped)
+
+    def start(self):
+        """
+        Starts buffering printed lines and writing them in the background
+        """
+        self.buffering = True
+        super(Console, self).start()
+
+    def run(self):
+        while not self.stop:
+            self.flush()
+            wait(self.interval)
+        self.buffering = False
+        self.flush()
+
+    def kill(self):
+        self.stop = True
+
+def console():
+    """Gets the shared console used by print
+
+    :return: Shared console
+    :rtype: Console
+    """
+    global _console
+    if _console is None or _console.stop:
+        _console = Console()
+    return _console
+
+def buffer_output(size=64, interval=100, rate=None):
+    """Buffers everything printed with print, writing it in the background in batches
+
+    :param size: Maximum number of lines waiting to be written, defaults to 64
+    :type size: int, optional
+    :param interval: Time (milliseconds) between batches, defaults to 100
+    :type interval: int, optional
+    :param rate: Maximum number of lines per second from each call site, None is unlimited,
+                 defaults to None
+    :type rate: int, float, optional
+    :return: Running console
+    :rtype: Console
+    """
+    global _console
+    if _console is not None and _console.buffering:
+        _console.kill()
+        _console.join()
+    _console = Console(size, interval, rate)
+    _console.start()
+    return _console
+
+def unbuffer_output():
+    """
+    Writes any buffered lines and goes back to printing straight to the console
+    """
+    if _console is not None and _console.buffering:
+        _console.kill()
+        _console.join()
+
+def print(*value, sep=' ', end='\n', file=sys.stdout, flush=False, rate=None, key=None):
+    """Prints values to the console, through the shared console so that it is buffered
+    after buffer_output is called
+
+    e.g. print('speed', motor.speed(), rate=2) prints at most twice a second from that line
+
+    :param rate: Maximum number of lines per second from this call site, defaults to the
+                 rate of the console
+    :type rate: int, float, optional
+    :param key: Call site to rate limit by, defaults to the line print was called from
+    :type key: object, optional
+    :return: Whether the line was printed (or buffered)
+    :rtype: bool
+    """
+    shared = _console
+    if shared is None:
+        shared = console()
+    if key is None and (rate is not None or shared.rate is not None):
+        key = _call_site(value, 2)
+    return shared.print(*value, sep=sep, end=end, file=file, flush=flush, rate=rate, key=key)
 
 def wait(time):
     pybricks.tools.wait(time)
@@ -14,14 +241,28 @@ class StopWatchExt(StopWatch):
     Extension class for the StopWatch Object
     """
 
-    def wait_until_time_passes(self, time):
+    def wait_until_time_passes(self, time, spin=1):
         """Waits until the time counter passes a specified value.
         If the StopWatch is paused, it will be resumed
 
         :param time: Time value to pass before continuing
         :type time: int
+        :param spin: Time (milliseconds) before the value to stop sleeping and check
+                     continuously, defaults to 1
+        :type spin: int, optional
         """
         super(StopWatchExt, self).resume()
-        while super(StopWatchExt, self).time() < time:
-            wait(10)
-        return
+        sleep_until(self, time, spin)
+
+    def wait_until_time_passes_async(self, time):
+        """Waits until the time counter passes a specified value.
+        If the StopWatch is paused, it will be resumed
+
+        Awaitable version of wait_until_time_passes that doesn't block other tasks,
+        see async_util
+
+        :param time: Time value to pass before continuing
+        :type time: int
+        :rtype: coroutine
+        """
+        return until_time_passes(self, time)
@@ -0,0 +1,348 @@
+import threading
+from operator import eq, ge, gt, le, lt, ne
+
+from pybricks.tools import wait, StopWatch
+
+_OPERATORS = {'>': gt,
+              '<': lt,
+              '>=': ge,
+              '<=': le,
+              '==': eq,
+              '!=': ne}
+
+def _operator_calc(val_a, val_b, operator):
+    return _OPERATORS[operator](val_a, val_b)
+
+class Condition():
+    """A single device/operator/threshold condition that can be waited on
+
+    The reading is taken by calling the method named ``reading`` on the device
+    (with ``args``), so every condition that shares the same device, reading and
+    args is evaluated against the same sample within a tick.
+
+    :param device: Device to read from
+    :type device: object
+    :param reading: Name of the device method that returns the reading (e.g. 'speed')
+    :type reading: str
+    :param operator: Operator to be used for the calculation (>, <, <=, >=, ==, !=)
+                     or a callable taking (reading, value) and returning a bool
+    :type operator: str, callable
+    :param value: Value to calculate against (reading <OP> value), defaults to None
+    :type value: object, optional
+    :param args: Arguments passed to the reading method, defaults to ()
+    :type args: tuple, optional
+    :param transform: Callable applied to the raw reading before comparing, defaults to None
+    :type transform: callable, optional
+    """
+
+    def __init__(self, device, reading, operator, value=None, args=(), transform=None):
+        """
+        Initiate the Condition Object
+        """
+        self.device = device
+        self.reading = reading
+        self.value = value
+        self.args = tuple(args)
+        self.transform = transform
+        if callable(operator):
+            self.test = operator
+        else:
+            self.test = _OPERATORS[operator]
+
+    def key(self):
+        """Gets the key of the reading source this condition is evaluated against
+
+        :return: Source key in the form (device, reading, args)
+        :rtype: tuple
+        """
+        return (self.device, self.reading, self.args)
+
+    def evaluate(self, raw):
+        """Evaluates the condition against an already taken reading
+
+        :param raw: Raw reading from the device
+        :type raw: object
+        :return: Whether or not the condition holds
+        :rtype: bool
+        """
+        if self.transform is not None:
+            raw = self.transform(raw)
+        return bool(self.test(raw, self.value))
+
+    def check(self):
+        """Reads the device and evaluates the condition
+
+        :return: Whether or not the condition holds
+        :rtype: bool
+        """
+        return self.evaluate(getattr(self.device, self.reading)(*self.args))
+
+class _Source():
+
+    def __init__(self, device, reading, args):
+        self.device = device
+        self.method = getattr(device, reading)
+        self.args = args
+        self.value = None
+        self.next_poll = None
+        self.users = 0
+
+def _as_condition(condition):
+    if isinstance(condition, Condition):
+        return condition
+    return Condition(*condition)
+
+class _Waiter():
+
+    def __init__(self, conditions, wait_all, deadline):
+        self.conditions = conditions
+        self.wait_all = wait_all
+        self.deadline = deadline
+        self.done = False
+        self.result = None
+        self.polls = 0
+
+    def keys(self):
+        keys = []
+        for condition in self.conditions:
+            key = condition.key()
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    def evaluate(self, sources):
+        for condition in self.conditions:
+            if condition.evaluate(sources[condition.key()].value):
+                if not self.wait_all:
+                    return condition
+            elif self.wait_all:
+                return None
+        if self.wait_all:
+            return self.conditions
+        return None
+
+class WaitEngine():
+    """Central condition wait engine shared by all of the wait_until methods
+
+    Every tick the engine reads each reading source that is due exactly once,
+    evaluates every registered condition against that reading and wakes the
+    waiters whose condition holds (or whose timeout has expired). Each waiting
+    thread works out when it next has to poll under the engine lock, then sleeps
+    without holding it, so a slow device or a long wait in one thread never holds
+    up the others.
+
+    If recorder is set to a callable, it is called with every finished waiter
+    (see instrument_util).
+
+    :param interval: Default poll interval (milliseconds) for devices, defaults to 10
+    :type interval: int, optional
+    """
+
+    def __init__(self, interval=10):
+        """
+        Initiate the WaitEngine Object
+        """
+        self.interval = interval
+        self._intervals = {}
+        self._sources = {}
+        self._waiters = []
+        self._lock = threading.Lock()
+        self._watch = StopWatch()
+        self.recorder = None
+
+    def set_poll_interval(self, device, interval=None):
+        """Sets the poll interval of a device
+
+        :param device: Device to set the poll interval for
+        :type device: object
+        :param interval: Poll interval (milliseconds), None resets it to the default,
+                         defaults to None
+        :type interval: int, optional
+        """
+        if interval is None:
+            self._intervals.pop(device, None)
+        else:
+            self._intervals[device] = max(0, interval)
+
+    def poll_interval(self, device):
+        """Gets the poll interval of a device
+
+        :param device: Device to get the poll interval for
+        :type device: object
+        :return: Poll interval (milliseconds)
+        :rtype: int
+        """
+        return self._intervals.get(device, self.interval)
+
+    def wait(self, condition, timeout=None):
+        """Waits until a condition holds
+
+        :param condition: Condition to wait for
+        :type condition: Condition
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if the condition holds, False if the timeout expired
+        :rtype: bool
+        """
+        return self._wait((_as_condition(condition),), False, timeout) is not None
+
+    def wait_any(self, conditions, timeout=None):
+        """Waits until any one of several conditions holds
+
+        Each device reading is taken once per tick and shared between all of the
+        conditions that use it.
+
+        :param conditions: Conditions to wait for, either Condition objects or tuples of
+                           Condition arguments (device, reading, operator, value)
+        :type conditions: list, tuple
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: The condition that fired, None if the timeout expired or there are
+                 no conditions
+        :rtype: Condition
+        """
+        conditions = tuple(_as_condition(c) for c in conditions)
+        if len(conditions) == 0:
+            return None
+        return self._wait(conditions, False, timeout)
+
+    def wait_all(self, conditions, timeout=None):
+        """Waits until all of several conditions hold at the same time
+
+        Each device reading is taken once per tick and shared between all of the
+        conditions that use it.
+
+        :param conditions: Conditions to wait for, either Condition objects or tuples of
+                           Condition arguments (device, reading, operator, value)
+        :type conditions: list, tuple
+        :param timeout: Maximum time to wait (milliseconds), None waits forever,
+                        defaults to None
+        :type timeout: int, optional
+        :return: True if all of the conditions hold (or there are none), False if the
+                 timeout expired
+        :rtype: bool
+        """
+        conditions = tuple(_as_condition(c) for c in conditions)
+        if len(conditions) == 0:
+            return True
+        return self._wait(conditions, True, timeout) is not None
+
+    def _wait(self, conditions, wait_all, timeout):
+        deadline = None
+        if timeout is not None:
+            deadline = self._watch.time() + timeout
+        waiter = _Waiter(conditions, wait_all, deadline)
+        self._register(waiter)
+        try:
+            while True:
+                with self._lock:
+                    if waiter.done:
+                        break
+                    now = self._watch.time()
+                    wake = self._wake(waiter, now)
+                    if wake <= now:
+                        self._poll(now)
+                        continue
+                wait(wake - now)
+        finally:
+            self._unregister(waiter)
+            if self.recorder is not None:
+                self.recorder(waiter)
+        return waiter.result
+
+    def _register(self, waiter):
+        with self._lock:
+            for key in waiter.keys():
+                source = self._sources.get(key)
+                if source is None:
+                    source = _Source(*key)
+                    self._sources[key] = source
+                source.users += 1
+            self._waiters.append(waiter)
+
+    def _unregister(self, waiter):
+        with self._lock:
+            self._waiters.remove(waiter)
+            for key in waiter.keys():
+                source = self._sources[key]
+                source.users -= 1
+                if source.users <= 0:
+                    del self._sources[key]
+
+    def _wake(self, waiter, now):
+        """
+        Time the calling waiter should next poll at, the earliest poll due or its own deadline
+        """
+        wake = None
+        for source in self._sources.values():
+            if source.next_poll is None:
+                return now
+            if wake is None or source.next_poll < wake:
+                wake = source.next_poll
+        if waiter.deadline is not None and (wake is None or waiter.deadline < wake):
+            wake = waiter.deadline
+        if wake is None:
+            return now + self.interval
+        return wake
+
+    def _poll(self, now):
+        for source in self._sources.values():
+            if source.next_poll is None or source.next_poll <= now:
+                source.value = source.method(*source.args)
+                source.next_poll = now + self.poll_interval(source.device)
+        for waiter in self._waiters:
+            if waiter.done:
+                continue
+            waiter.polls += 1
+            result = waiter.evaluate(self._sources)
+            if result is not None:
+                waiter.result = result
+                waiter.done = True
+            elif waiter.deadline is not None and waiter.deadline <= now:
+                waiter.done = True
+
+engine = WaitEngine()
+
+def wait_until(condition, timeout=None):
+    """Waits until a condition holds using the shared wait engine
+
+    :param condition: Condition to wait for
+    :type condition: Condition
+    :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+    :type timeout: int, optional
+    :return: True if the condition holds, False if the timeout expired
+    :rtype: bool
+    """
+    return engine.wait(condition, timeout=timeout)
+
+def wait_any(conditions, timeout=None):
+    """Waits until any one of several conditions holds using the shared wait engine
+
+    e.g. wait_any([Condition(touch, 'pressed', '==', True),
+    Condition(ultrasonic, 'distance', '<', 100)], timeout=5000)
+
+    :param conditions: Conditions to wait for, either Condition objects or tuples of
+                       Condition arguments (device, reading, operator, value)
+    :type conditions: list, tuple
+    :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+    :type timeout: int, optional
+    :return: The condition that fired, None if the timeout expired or there are no conditions
+    :rtype: Condition
+    """
+    return engine.wait_any(conditions, timeout=timeout)
+
+def wait_all(conditions, timeout=None):
+    """Waits until all of several conditions hold using the shared wait engine
+
+    :param conditions: Conditions to wait for, either Condition objects or tuples of
+                       Condition arguments (device, reading, operator, value)
+    :type conditions: list, tuple
+    :param timeout: Maximum time to wait (milliseconds), None waits forever, defaults to None
+    :type timeout: int, optional
+    :return: True if all of the conditions hold (or there are none), False if the timeout
+             expired
+    :rtype: bool
+    """
+    return engine.wait_all(conditions, timeout=timeout)